@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark du découpage en chunks sur des textes de plusieurs Mo
+
+Compare l'ancien découpage (avancée d'un caractère possible quand la seule
+coupure est en début de fenêtre) et le découpage actuel (coupure naturelle
+cherchée seulement après le chevauchement) sur deux textes synthétiques :
+  - prose : phrases courtes, le cas normal (résultat identique attendu) ;
+  - tableau : cellules séparées par des tabulations, sans espace, avec un
+    point de loin en loin, comme un tableau extrait d'un PDF.
+
+Usage:
+    python benchmarks/bench_chunker.py
+    python benchmarks/bench_chunker.py --sizes 1 4 16 --chunk-size 1000 --overlap 200
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Ajouter le répertoire du projet au path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from chunker import split_text_into_chunks
+
+WORDS = ("le contrat de prestation est conclu entre les parties pour une durée "
+         "déterminée et peut être résilié par lettre recommandée avec accusé de réception").split()
+
+
+def legacy_split(text: str, chunk_size: int, overlap: int):
+    """Ancien découpage, recopié pour comparaison"""
+    if len(text) <= chunk_size:
+        return [text]
+    
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+        if end < len(text):
+            last_sentence_end = max(text.rfind('.', start, end), text.rfind('!', start, end),
+                                    text.rfind('?', start, end))
+            if last_sentence_end > start:
+                end = last_sentence_end + 1
+            else:
+                last_space = text.rfind(' ', start, end)
+                if last_space > start:
+                    end = last_space
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= len(text):
+            break
+        start = max(start + 1, end - overlap)
+    return chunks
+
+
+def make_prose(size: int, rng: random.Random) -> str:
+    """Phrases de 5 à 30 mots"""
+    parts = []
+    length = 0
+    while length < size:
+        sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 30))).capitalize() + ". "
+        parts.append(sentence)
+        length += len(sentence)
+    return "".join(parts)[:size]
+
+
+def make_table(size: int, rng: random.Random) -> str:
+    """Cellules séparées par des tabulations et des retours à la ligne, un point tous les ~1100 caractères"""
+    parts = []
+    length = 0
+    since_dot = 0
+    while length < size:
+        cell = f"REF{rng.randint(0, 99999):05d}" + ("\t" if rng.random() < 0.8 else "\n")
+        since_dot += len(cell)
+        if since_dot > 1100:
+            cell = "Total." + cell
+            since_dot = 0
+        parts.append(cell)
+        length += len(cell)
+    return "".join(parts)[:size]
+
+
+def measure(function, text, chunk_size, overlap):
+    start = time.perf_counter()
+    chunks = function(text, chunk_size, overlap)
+    return chunks, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark du découpage en chunks")
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 4],
+                        help="Tailles des textes en millions de caractères (défaut: 1 4)")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--overlap", type=int, default=200)
+    args = parser.parse_args()
+    
+    rng = random.Random(0)
+    print(f"\nchunk_size={args.chunk_size}, overlap={args.overlap}")
+    print(f"\n{'texte':>8} | {'Mcar.':>5} | {'ancien (s)':>10} | {'chunks':>8} | {'actuel (s)':>10} | "
+          f"{'chunks':>8} | {'accél.':>7} | identique")
+    print("-" * 88)
+    
+    for size in args.sizes:
+        for name, make in (("prose", make_prose), ("tableau", make_table)):
+            text = make(int(size * 1_000_000), rng)
+            legacy, legacy_time = measure(legacy_split, text, args.chunk_size, args.overlap)
+            current, current_time = measure(split_text_into_chunks, text, args.chunk_size, args.overlap)
+            print(f"{name:>8} | {size:5.1f} | {legacy_time:10.3f} | {len(legacy):>8} | {current_time:10.3f} | "
+                  f"{len(current):>8} | x{legacy_time / current_time:6.1f} | {'oui' if legacy == current else 'non'}")
+
+
+if __name__ == "__main__":
+    main()
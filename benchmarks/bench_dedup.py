@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Regroupement des chunks quasi-identiques : embeddings évités et coût
+
+Découpe et pré-traite le corpus (données de test par défaut), éventuellement
+répliqué avec de légères retouches pour simuler des documents presque
+identiques, puis mesure pour plusieurs seuils la part des chunks regroupés
+(embeddings évités), la durée du regroupement et la durée d'encodage des
+chunks évités (estimée sur un échantillon).
+
+Usage:
+    python benchmarks/bench_dedup.py
+    python benchmarks/bench_dedup.py --prod --thresholds 0.8 0.9 0.95
+    python benchmarks/bench_dedup.py --copies 3 --edits 2
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Ajouter le répertoire du projet au path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import config
+from chunker import process_documents_chunks
+from dedup import deduplicate_chunks
+from embedder import encode_texts
+from loader import load_all_documents
+from preprocessor import preprocess_text
+
+
+def edited_copy(chunk, edits, rng):
+    """Copie d'un chunk dont `edits` mots ont été remplacés"""
+    words = chunk['preprocessed_content'].split()
+    for _ in range(min(edits, len(words))):
+        words[rng.randrange(len(words))] = rng.choice(words)
+    return dict(chunk, source=chunk['source'] + ".copie", preprocessed_content=" ".join(words))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la déduplication des chunks")
+    parser.add_argument("--prod", action="store_true", help="Utiliser les données de production")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.8, 0.9, 0.95])
+    parser.add_argument("--copies", type=int, default=1,
+                        help="Copies retouchées de chaque chunk ajoutées au corpus (défaut: 1)")
+    parser.add_argument("--edits", type=int, default=1, help="Mots remplacés par copie (défaut: 1)")
+    parser.add_argument("--sample", type=int, default=256,
+                        help="Chunks encodés pour estimer la durée d'un embedding (défaut: 256)")
+    args = parser.parse_args()
+    
+    config.test_mode = not args.prod
+    chunks = process_documents_chunks(load_all_documents(workers=1), config.chunk_size, config.chunk_overlap)
+    for chunk in chunks:
+        chunk['preprocessed_content'] = preprocess_text(chunk['content'])
+    
+    rng = random.Random(0)
+    chunks += [edited_copy(chunk, args.edits, rng) for chunk in chunks for _ in range(args.copies)]
+    
+    texts = [chunk['preprocessed_content'] for chunk in chunks[:args.sample]]
+    start = time.perf_counter()
+    encode_texts(texts, show_progress=False)
+    per_chunk = (time.perf_counter() - start) / max(1, len(texts))
+    
+    print(f"\n📊 {len(chunks)} chunks ({args.copies} copie(s) retouchée(s) de {args.edits} mot(s) par chunk), "
+          f"encodage ≈ {per_chunk * 1000:.1f} ms/chunk")
+    print(f"\n{'seuil':>6} | {'regroupés':>9} | {'groupes':>7} | {'évités':>7} | {'dédup. (s)':>10} | "
+          f"{'chunks/s':>9} | {'encodage évité (s)':>18}")
+    print("-" * 84)
+    for threshold in args.thresholds:
+        start = time.perf_counter()
+        _, stats = deduplicate_chunks([dict(chunk) for chunk in chunks], threshold)
+        elapsed = time.perf_counter() - start
+        print(f"{threshold:6.2f} | {stats.duplicates:>9} | {stats.clusters:>7} | {stats.saved_ratio:6.1%} | "
+              f"{elapsed:10.2f} | {len(chunks) / elapsed:9.0f} | {stats.duplicates * per_chunk:18.1f}")
+
+
+if __name__ == "__main__":
+    main()
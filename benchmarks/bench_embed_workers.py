@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark de passage à l'échelle de l'encodage multi-processus
+
+Le corpus de test (./data_test) est découpé, pré-traité puis répliqué pour
+atteindre une taille réaliste. Le débit (chunks/s) est mesuré pour chaque
+nombre de processus ; 1 correspond à l'encodage dans le processus courant.
+
+Usage:
+    python benchmarks/bench_embed_workers.py
+    python benchmarks/bench_embed_workers.py --replicate 20 --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ["TEST_MODE"] = "true"
+
+# Ajouter le répertoire du projet au path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from loader import load_all_documents
+from chunker import process_documents_chunks
+from preprocessor import preprocess_text
+from embedder import encode_texts, encode_texts_parallel
+
+
+def load_corpus_texts(replicate: int) -> list:
+    """Retourne les textes prétraités des chunks du corpus de test, répliqués"""
+    documents = [doc for doc in load_all_documents() if isinstance(doc['content'], str)]
+    chunks = process_documents_chunks(documents)
+    texts = [preprocess_text(chunk['content']) for chunk in chunks]
+    return [text for text in texts if text] * replicate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'encodage multi-processus")
+    parser.add_argument("--replicate", type=int, default=20,
+                        help="Nombre de copies du corpus de test (défaut: 20)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="Nombres de processus à tester (défaut: 1 2 4 8)")
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="Taille des lots (défaut: EMBEDDING_BATCH_SIZE)")
+    args = parser.parse_args()
+    
+    texts = load_corpus_texts(args.replicate)
+    print(f"\n📊 {len(texts)} chunks, {os.cpu_count()} cœurs")
+    print(f"{'processus':>10} | {'durée (s)':>9} | {'chunks/s':>9} | {'scaling':>7}")
+    print("-" * 46)
+    
+    baseline = None
+    for workers in args.workers:
+        start = time.perf_counter()
+        if workers == 1:
+            encode_texts(texts, batch_size=args.batch_size, show_progress=False)
+        else:
+            # Inclut le démarrage des processus et le chargement des modèles
+            encode_texts_parallel(texts, workers, batch_size=args.batch_size, show_progress=False)
+        elapsed = time.perf_counter() - start
+        rate = len(texts) / elapsed
+        baseline = baseline or rate
+        print(f"{workers:>10} | {elapsed:9.1f} | {rate:9.1f} | {rate / baseline:6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark des backends d'inférence : vitesse et fidélité par rapport à fp32
+
+Encode les chunks prétraités du corpus de test (./data_test) avec chaque
+backend (torch fp32, torch-int8, onnx) et rapporte :
+  - le débit (chunks/s) et l'accélération par rapport à torch fp32 ;
+  - la similarité cosinus entre les vecteurs du backend et ceux de fp32
+    (moyenne et minimum sur le corpus) ;
+  - le recouvrement des top-5 voisins pour des requêtes prises dans le corpus.
+
+Usage:
+    python benchmarks/bench_embedding_backends.py
+    python benchmarks/bench_embedding_backends.py --backends torch torch-int8 --replicate 3
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ["TEST_MODE"] = "true"
+
+# Ajouter le répertoire du projet au path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from loader import load_all_documents
+from chunker import process_documents_chunks
+from preprocessor import preprocess_text
+from model_registry import BACKENDS, get_model
+
+
+def load_corpus_texts(replicate: int) -> list:
+    """Retourne les textes prétraités des chunks du corpus de test"""
+    documents = [doc for doc in load_all_documents() if isinstance(doc['content'], str)]
+    chunks = process_documents_chunks(documents)
+    texts = [preprocess_text(chunk['content']) for chunk in chunks]
+    return [text for text in texts if text] * replicate
+
+
+def encode(backend: str, texts: list, batch_size: int):
+    """Encode les textes avec un backend et retourne (embeddings normalisés, durée)"""
+    model = get_model(backend=backend)
+    model.encode(texts[:batch_size], batch_size=batch_size)
+    
+    start = time.perf_counter()
+    embeddings = model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+    elapsed = time.perf_counter() - start
+    
+    embeddings = embeddings.astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings, elapsed
+
+
+def top_k_overlap(reference: np.ndarray, candidate: np.ndarray, k: int = 5) -> float:
+    """Recouvrement moyen des k plus proches voisins de chaque vecteur"""
+    ref_top = np.argsort(-(reference @ reference.T), axis=1)[:, 1:k + 1]
+    cand_top = np.argsort(-(candidate @ candidate.T), axis=1)[:, 1:k + 1]
+    return float(np.mean([len(set(r) & set(c)) / k for r, c in zip(ref_top, cand_top)]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des backends d'inférence")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS,
+                        help="Backends à comparer (défaut: tous)")
+    parser.add_argument("--replicate", type=int, default=1,
+                        help="Nombre de copies du corpus de test (défaut: 1)")
+    parser.add_argument("--batch-size", type=int, default=32,
+                        help="Taille des lots (défaut: 32)")
+    args = parser.parse_args()
+    
+    texts = load_corpus_texts(args.replicate)
+    print(f"\n📊 {len(texts)} chunks")
+    
+    reference, reference_time = encode("torch", texts, args.batch_size)
+    unique = len(texts) // args.replicate
+    
+    print(f"\n{'backend':>11} | {'chunks/s':>9} | {'speedup':>7} | {'cos moyen':>9} | {'cos min':>8} | {'top-5':>6}")
+    print("-" * 66)
+    
+    for backend in args.backends:
+        if backend == "torch":
+            embeddings, elapsed = reference, reference_time
+        else:
+            try:
+                embeddings, elapsed = encode(backend, texts, args.batch_size)
+            except ImportError as e:
+                print(f"{backend:>11} | ignoré : {e}")
+                continue
+        
+        cosines = np.sum(embeddings * reference, axis=1)
+        overlap = top_k_overlap(reference[:unique], embeddings[:unique])
+        print(f"{backend:>11} | {len(texts) / elapsed:9.1f} | {reference_time / elapsed:6.2f}x | "
+              f"{cosines.mean():9.5f} | {cosines.min():8.5f} | {overlap:6.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark du débit d'embedding sur CPU : boucle chunk par chunk vs lots triés
+
+Charge et découpe le corpus de test (./data_test), applique le pré-traitement
+puis mesure le débit (chunks/s) de :
+  - l'ancienne boucle : un appel model.encode par chunk ;
+  - encode_texts : lots triés par longueur en tokens, pour plusieurs tailles de lot.
+
+Usage:
+    python benchmarks/bench_embedding_batch.py
+    python benchmarks/bench_embedding_batch.py --replicate 4 --batch-sizes 16 32 64
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ["TEST_MODE"] = "true"
+
+# Ajouter le répertoire du projet au path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from loader import load_all_documents
+from chunker import process_documents_chunks
+from preprocessor import preprocess_text
+from config import config
+from embedder import encode_texts
+from model_registry import get_model
+
+
+def load_corpus_texts(replicate: int) -> list:
+    """Retourne les textes prétraités des chunks du corpus de test"""
+    documents = [doc for doc in load_all_documents() if isinstance(doc['content'], str)]
+    chunks = process_documents_chunks(documents)
+    texts = [preprocess_text(chunk['content']) for chunk in chunks]
+    return [text for text in texts if text] * replicate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du débit d'embedding")
+    parser.add_argument("--replicate", type=int, default=1,
+                        help="Nombre de copies du corpus de test (défaut: 1)")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[8, 32, 64],
+                        help="Tailles de lot à tester (défaut: 8 32 64)")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="Nombre de threads torch (défaut: valeur de torch)")
+    args = parser.parse_args()
+    
+    if args.threads:
+        import torch
+        torch.set_num_threads(args.threads)
+    
+    texts = load_corpus_texts(args.replicate)
+    print(f"\n📊 {len(texts)} chunks, modèle {config.embedding_model}")
+    
+    # Préchauffage pour exclure le chargement du modèle et l'initialisation de torch
+    model = get_model()
+    model.encode(texts[:8])
+    
+    start = time.perf_counter()
+    reference = np.array([model.encode(text) for text in texts])
+    loop_time = time.perf_counter() - start
+    loop_rate = len(texts) / loop_time
+    
+    print(f"\n{'méthode':>20} | {'chunks/s':>9} | {'speedup':>7} | {'écart max':>9}")
+    print("-" * 56)
+    print(f"{'boucle par chunk':>20} | {loop_rate:9.1f} | {'1.0x':>7} | {'-':>9}")
+    
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        embeddings = encode_texts(texts, batch_size=batch_size, show_progress=False)
+        elapsed = time.perf_counter() - start
+        rate = len(texts) / elapsed
+        # Le padding peut introduire d'infimes écarts numériques
+        deviation = float(np.abs(embeddings - reference).max())
+        print(f"{f'lots de {batch_size}':>20} | {rate:9.1f} | {rate / loop_rate:6.1f}x | {deviation:9.2e}")
+
+
+if __name__ == "__main__":
+    main()
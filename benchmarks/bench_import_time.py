@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Durée d'import des points d'entrée et part due au pré-traitement (NLTK)
+
+Importe chaque module dans un nouvel interpréteur avec `python -X importtime`
+et relève la durée totale de l'import, la part de preprocessor et de nltk, et
+si NLTK a été importé. Les durées sont les médianes de plusieurs lancements.
+
+mongo.py ne se connecte à MongoDB qu'au premier accès à la base : la durée de
+connexion n'est pas comprise dans le total de pipeline et rag.
+
+Usage:
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --modules preprocessor pipeline --runs 5
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+
+def import_times(module: str) -> dict:
+    """Durées cumulées d'import (s) de chaque module importé, relevées par -X importtime"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=PROJECT_DIR, capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    
+    times = {}
+    for line in result.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        # Premier import uniquement (les lignes suivantes sont des imports imbriqués d'un même nom)
+        times.setdefault(name, int(cumulative) / 1e6)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Durée d'import des points d'entrée")
+    parser.add_argument("--modules", nargs="+", default=["preprocessor", "pipeline", "search", "rag"],
+                        help="Modules à importer (défaut: preprocessor pipeline search rag)")
+    parser.add_argument("--runs", type=int, default=3, help="Lancements par module (défaut: 3)")
+    args = parser.parse_args()
+    
+    print(f"\n{'module':>14} | {'total (s)':>9} | {'preprocessor (s)':>16} | {'nltk (s)':>8} | nltk importé")
+    print("-" * 72)
+    for module in args.modules:
+        try:
+            runs = [import_times(module) for _ in range(args.runs)]
+        except RuntimeError as e:
+            print(f"{module:>14} | ❌ import impossible: {e}")
+            continue
+        total = statistics.median(times[module] for times in runs)
+        preprocessing = statistics.median(times.get("preprocessor", 0.0) for times in runs)
+        nltk = statistics.median(times.get("nltk", 0.0) for times in runs)
+        print(f"{module:>14} | {total:9.2f} | {preprocessing:16.2f} | {nltk:8.2f} | "
+              f"{'oui' if 'nltk' in runs[0] else 'non'}")
+
+
+if __name__ == "__main__":
+    main()
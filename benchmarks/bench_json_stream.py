@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la lecture de l'export JSON des appels d'offres
+
+Génère un export synthétique au format de all_aos.json (enregistrements du
+fichier de test répliqués) puis compare json.load et la lecture incrémentale
+(json_stream.iter_json_records) : durée et pic d'allocation Python mesuré
+avec tracemalloc.
+
+Usage:
+    python benchmarks/bench_json_stream.py
+    python benchmarks/bench_json_stream.py --records 200000
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# Ajouter le répertoire du projet au path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from json_stream import iter_json_records
+
+SAMPLE_PATH = Path(__file__).resolve().parent.parent / "data_test" / "all_aos_sample.json"
+
+
+def write_export(path: str, records: int):
+    """Écrit un export indenté de `records` appels d'offres"""
+    with open(SAMPLE_PATH, encoding="utf-8") as f:
+        samples = json.load(f)[0]["content"]
+    
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('[\n    {\n        "content": [\n')
+        for i in range(records):
+            record = dict(samples[i % len(samples)], id=i + 1)
+            if i:
+                f.write(",\n")
+            f.write(json.dumps(record, ensure_ascii=False, indent=4))
+        f.write("\n        ]\n    }\n]\n")
+
+
+def measure(function):
+    """Exécute une fonction et retourne (résultat, durée, pic d'allocation en Mo)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la lecture incrémentale du JSON")
+    parser.add_argument("--records", type=int, default=100_000,
+                        help="Nombre d'appels d'offres dans l'export synthétique (défaut: 100000)")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "all_aos.json")
+        write_export(path, args.records)
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        print(f"\n📊 Export synthétique: {args.records} appels d'offres, {size_mb:.1f} Mo")
+        
+        def load_whole():
+            with open(path, encoding="utf-8") as f:
+                return sum(len(block["content"]) for block in json.load(f))
+        
+        def stream():
+            return sum(1 for _ in iter_json_records(path))
+        
+        print(f"\n{'méthode':>12} | {'enreg.':>8} | {'durée (s)':>9} | {'pic (Mo)':>9}")
+        print("-" * 48)
+        for name, function in (("json.load", load_whole), ("streaming", stream)):
+            count, elapsed, peak = measure(function)
+            print(f"{name:>12} | {count:>8} | {elapsed:9.2f} | {peak:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la récupération en deux phases contre la lecture complète
+
+Mesure, sur la collection configurée (utiliser --test pour la base de test),
+les octets BSON transférés et la latence de :
+  - l'ancien comportement : collection.find() de tous les champs puis scoring ;
+  - la matérialisation tardive : phase 1 ('_id' + 'embedding'), scoring,
+    puis phase 2 ($in sur les k gagnants pour 'content', 'source', 'chunk_index').
+
+Usage:
+    python benchmarks/bench_late_materialization.py --test
+    python benchmarks/bench_late_materialization.py --top-k 50 --repeat 5
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Vérifier l'argument --test avant l'import de la configuration
+if "--test" in sys.argv:
+    os.environ["TEST_MODE"] = "true"
+
+# Ajouter le répertoire du projet au path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+
+import mongo
+from vector_index import VectorIndex, DEFAULT_FETCH_FIELDS
+
+
+class ByteCounter:
+    """Compte les octets BSON des documents renvoyés par un curseur"""
+    
+    def __init__(self):
+        self.bytes = 0
+        self.documents = 0
+    
+    def wrap(self, cursor):
+        for raw in cursor:
+            self.bytes += len(raw.raw)
+            self.documents += 1
+            yield raw
+
+
+def full_scan(raw_collection, query, top_k, counter):
+    """Ancien comportement : tous les champs de tous les documents"""
+    docs = list(counter.wrap(raw_collection.find()))
+    index = VectorIndex.from_documents(docs)
+    positions, _ = index.search(query, top_k)
+    return [docs[position]['content'] for position in positions]
+
+
+def two_phase(raw_collection, query, top_k, counter):
+    """Matérialisation tardive : embeddings seuls, puis contenu des gagnants"""
+    index = VectorIndex.from_documents(counter.wrap(raw_collection.find({}, {"embedding": 1})))
+    positions, _ = index.search(query, top_k)
+    
+    ids = [index.ids[position] for position in positions]
+    projection = {field: 1 for field in DEFAULT_FETCH_FIELDS}
+    by_id = {doc['_id']: doc for doc in counter.wrap(raw_collection.find({"_id": {"$in": ids}}, projection))}
+    return [by_id[doc_id]['content'] for doc_id in ids if doc_id in by_id]
+
+
+def measure(strategy, raw_collection, queries, top_k):
+    """Retourne (octets par requête, latence médiane en ms)"""
+    timings = []
+    counter = ByteCounter()
+    for query in queries:
+        start = time.perf_counter()
+        strategy(raw_collection, query, top_k, counter)
+        timings.append((time.perf_counter() - start) * 1000)
+    return counter.bytes / len(queries), float(np.median(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la matérialisation tardive")
+    parser.add_argument("--test", action="store_true", help="Utiliser la base de test")
+    parser.add_argument("--top-k", type=int, default=50, help="Nombre de résultats (défaut: 50)")
+    parser.add_argument("--repeat", type=int, default=5, help="Nombre de requêtes mesurées (défaut: 5)")
+    args = parser.parse_args()
+    
+    mongo.ensure_connection()
+    raw_collection = mongo.collection.with_options(
+        codec_options=CodecOptions(document_class=RawBSONDocument)
+    )
+    total = mongo.count_documents()
+    if total == 0:
+        print("⚠️  Collection vide, lancer d'abord la pipeline")
+        return
+    
+    sample = mongo.collection.find_one({}, {"embedding": 1})
+    dim = len(VectorIndex.from_documents([sample]).matrix[0])
+    rng = np.random.default_rng(0)
+    queries = rng.standard_normal((args.repeat, dim)).astype(np.float32)
+    
+    print(f"📊 {total} documents, top_k={args.top_k}, {args.repeat} requêtes")
+    print(f"{'stratégie':>14} | {'Mo / requête':>12} | {'latence (ms)':>12}")
+    print("-" * 46)
+    
+    results = {}
+    for name, strategy in (("find() complet", full_scan), ("deux phases", two_phase)):
+        transferred, latency = measure(strategy, raw_collection, queries, args.top_k)
+        results[name] = (transferred, latency)
+        print(f"{name:>14} | {transferred / 1e6:12.2f} | {latency:12.1f}")
+    
+    before, after = results["find() complet"], results["deux phases"]
+    print(f"\nOctets transférés: -{(1 - after[0] / before[0]) * 100:.0f}%, "
+          f"latence: x{before[1] / after[1]:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'extraction du texte des fichiers markdown
+
+Compare sur le corpus kiwiXlegal le rendu HTML complet (markdown.markdown,
+ancienne extraction) et la conversion directe en texte brut
+(markdown_text.markdown_to_text) : débit et nombre de caractères produits,
+c'est-à-dire à découper, pré-traiter et encoder. La relecture d'une entrée
+du cache texte (JSON compressé) est mesurée à titre de comparaison.
+
+Usage:
+    python benchmarks/bench_markdown_text.py
+    python benchmarks/bench_markdown_text.py --dir ./data/kiwiXlegal --repeat 20
+"""
+
+import argparse
+import gzip
+import json
+import sys
+import time
+from pathlib import Path
+
+import markdown
+
+# Ajouter le répertoire du projet au path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import config
+from markdown_text import markdown_to_text
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+
+def find_corpus() -> Path:
+    """Dossier markdown des données de production, à défaut des données de test"""
+    for data_dir in (config.data_dir, config.test_data_dir):
+        base = PROJECT_DIR / data_dir
+        if not base.is_dir():
+            continue
+        for entry in sorted(base.iterdir()):
+            # Le nom du dossier varie en casse selon les exports (kiwiXlegal / kiwiXLegal)
+            if entry.is_dir() and entry.name.lower() == config.markdown_subdir.lower():
+                return entry
+    raise SystemExit(f"Aucun dossier {config.markdown_subdir} trouvé, utiliser --dir")
+
+
+def measure(function, texts, repeat):
+    """Applique une fonction à tous les textes `repeat` fois ; retourne (durée, caractères produits)"""
+    produced = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        produced = sum(len(function(text)) for text in texts)
+    return time.perf_counter() - start, produced
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark markdown → texte")
+    parser.add_argument("--dir", type=str, default=None,
+                        help="Dossier des fichiers markdown (défaut: kiwiXlegal des données)")
+    parser.add_argument("--repeat", type=int, default=10,
+                        help="Nombre de passes sur le corpus (défaut: 10)")
+    args = parser.parse_args()
+    
+    corpus = Path(args.dir) if args.dir else find_corpus()
+    paths = sorted(corpus.glob("*.md"))
+    if not paths:
+        raise SystemExit(f"Aucun fichier markdown dans {corpus}")
+    
+    texts = [path.read_text(encoding="utf-8") for path in paths]
+    size_mb = sum(len(text.encode("utf-8")) for text in texts) / (1024 * 1024)
+    source_chars = sum(len(text) for text in texts)
+    print(f"\n📊 Corpus: {corpus} ({len(texts)} fichiers, {size_mb:.2f} Mo, {args.repeat} passes)")
+    
+    # Entrées du cache texte : texte et titres sérialisés en JSON, compressés
+    compressed = []
+    for text in texts:
+        plain, headings = markdown_to_text(text)
+        entry = json.dumps({"text": plain, "headings": headings}, ensure_ascii=False)
+        compressed.append(gzip.compress(entry.encode("utf-8"), compresslevel=6))
+    
+    methods = (
+        ("markdown.markdown", markdown.markdown, texts),
+        ("markdown_to_text", lambda text: markdown_to_text(text)[0], texts),
+        ("lecture cache texte", lambda data: json.loads(gzip.decompress(data))["text"], compressed),
+    )
+    
+    print(f"\n{'méthode':>20} | {'fichiers/s':>10} | {'Mo/s':>7} | {'caractères':>10} | {'vs source':>9}")
+    print("-" * 70)
+    baseline = None
+    for name, function, inputs in methods:
+        elapsed, produced = measure(function, inputs, args.repeat)
+        files_per_s = len(inputs) * args.repeat / elapsed
+        mb_per_s = size_mb * args.repeat / elapsed
+        print(f"{name:>20} | {files_per_s:10.0f} | {mb_per_s:7.1f} | {produced:>10} | "
+              f"{produced / source_chars:8.1%}")
+        if baseline is None:
+            baseline = elapsed
+        elif name == "markdown_to_text":
+            print(f"{'':>20}   accélération x{baseline / elapsed:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Caches de formes du préprocesseur : coût du stemming et taux de succès
+
+Pré-traite les chunks du corpus de test, répliqué, avec et sans stemming, en
+désactivant puis en activant les caches de stems et de stop words
+(PREPROCESS_CACHE_SIZE). Vérifie que le texte produit est identique et affiche
+le débit, le surcoût du stemming et le taux de succès de chaque cache.
+
+Usage:
+    python benchmarks/bench_preprocess_cache.py
+    python benchmarks/bench_preprocess_cache.py --replicate 20 --cache-sizes 0 1024 65536 --fast
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ["TEST_MODE"] = "true"
+
+# Ajouter le répertoire du projet au path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from loader import load_all_documents
+from chunker import process_documents_chunks
+from preprocessor import TextPreprocessor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Caches de formes du préprocesseur")
+    parser.add_argument("--replicate", type=int, default=20,
+                        help="Nombre de copies du corpus de test (défaut: 20)")
+    parser.add_argument("--cache-sizes", type=int, nargs="+", default=[0, 1024, 65536],
+                        help="Tailles de cache à tester, 0 = sans cache (défaut: 0 1024 65536)")
+    parser.add_argument("--fast", action="store_true", help="Utiliser l'implémentation rapide")
+    args = parser.parse_args()
+    
+    texts = [chunk['content'] for chunk in process_documents_chunks(load_all_documents())] * args.replicate
+    print(f"\n📊 {len(texts)} chunks")
+    print(f"\n{'cache':>7} | {'stemming':>8} | {'durée (s)':>9} | {'chunks/s':>9} | {'stems':>7} | "
+          f"{'stop words':>10} | identique")
+    print("-" * 78)
+    
+    references = {}
+    durations = {}
+    for cache_size in args.cache_sizes:
+        for stemming in (False, True):
+            preprocessor = TextPreprocessor(fast=args.fast, cache_size=cache_size)
+            start = time.perf_counter()
+            result = [preprocessor.preprocess_text(text, apply_stemming=stemming) for text in texts]
+            elapsed = time.perf_counter() - start
+            durations[cache_size, stemming] = elapsed
+            identical = references.setdefault(stemming, result) == result
+            
+            stats = preprocessor.cache_stats()
+            stems = f"{stats['stems']['hit_rate']:.1%}" if stemming else "-"
+            print(f"{cache_size:>7} | {'oui' if stemming else 'non':>8} | {elapsed:9.2f} | "
+                  f"{len(texts) / elapsed:9.0f} | {stems:>7} | {stats['stop_words']['hit_rate']:10.1%} | "
+                  f"{'oui' if identical else 'non'}")
+    
+    print()
+    for cache_size in args.cache_sizes:
+        print(f"Surcoût du stemming (cache {cache_size}) : "
+              f"x{durations[cache_size, True] / durations[cache_size, False]:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark de passage à l'échelle du pré-traitement multi-processus
+
+Le corpus de test (./data_test) est découpé puis répliqué pour atteindre une
+taille réaliste. Le débit (chunks/s) de TextPreprocessor.preprocess_batch est
+mesuré pour chaque nombre de processus ; 1 correspond au pré-traitement dans
+le processus courant. Le résultat est comparé à celui du traitement séquentiel.
+
+Usage:
+    python benchmarks/bench_preprocess_workers.py
+    python benchmarks/bench_preprocess_workers.py --replicate 50 --workers 1 2 4 8 --batch-size 128
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ["TEST_MODE"] = "true"
+
+# Ajouter le répertoire du projet au path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from loader import load_all_documents
+from chunker import process_documents_chunks
+from preprocessor import default_preprocessor
+
+
+def load_corpus_texts(replicate: int) -> list:
+    """Retourne le contenu des chunks du corpus de test, répliqué"""
+    chunks = process_documents_chunks(load_all_documents())
+    return [chunk['content'] for chunk in chunks] * replicate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du pré-traitement multi-processus")
+    parser.add_argument("--replicate", type=int, default=50,
+                        help="Nombre de copies du corpus de test (défaut: 50)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="Nombres de processus à tester (défaut: 1 2 4 8)")
+    parser.add_argument("--batch-size", type=int, default=256,
+                        help="Textes par tâche envoyée à un processus (défaut: 256)")
+    args = parser.parse_args()
+
+    texts = load_corpus_texts(args.replicate)
+    print(f"\n📊 {len(texts)} chunks, {os.cpu_count()} cœurs")
+    print(f"{'processus':>10} | {'durée (s)':>9} | {'chunks/s':>9} | {'scaling':>7} | identique")
+    print("-" * 58)
+
+    baseline = None
+    reference = None
+    for workers in args.workers:
+        # Inclut le démarrage des processus et l'initialisation de leurs préprocesseurs
+        start = time.perf_counter()
+        result = default_preprocessor.preprocess_batch(texts, workers=workers, batch_size=args.batch_size)
+        elapsed = time.perf_counter() - start
+        rate = len(texts) / elapsed
+        baseline = baseline or rate
+        reference = reference or result
+        print(f"{workers:>10} | {elapsed:9.2f} | {rate:9.0f} | {rate / baseline:6.2f}x | "
+              f"{'oui' if result == reference else 'non'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Pré-traitement rapide : accélération par rapport à l'implémentation de référence
+
+Mesure le débit de TextPreprocessor(fast=True) et de l'implémentation de
+référence sur les chunks du corpus de test, étape par étape. L'équivalence des
+deux implémentations est vérifiée par tests/test_preprocessor_fast.py.
+
+Usage:
+    python benchmarks/bench_preprocessor_fast.py
+    python benchmarks/bench_preprocessor_fast.py --repeat 20
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ["TEST_MODE"] = "true"
+
+# Ajouter le répertoire du projet au path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from loader import load_all_documents
+from chunker import process_documents_chunks
+from preprocessor import TextPreprocessor
+
+def measure(function, texts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            function(text)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pré-traitement rapide : accélération")
+    parser.add_argument("--repeat", type=int, default=10, help="Passes sur le corpus (défaut: 10)")
+    args = parser.parse_args()
+    
+    texts = [chunk['content'] for chunk in process_documents_chunks(load_all_documents())]
+    reference = TextPreprocessor()
+    fast = TextPreprocessor(fast=True)
+    
+    cleaned = [reference.clean_text(text) for text in texts]
+    unaccented = [reference.remove_accents(text) for text in cleaned]
+    steps = (
+        ("nettoyage", reference.clean_text, fast._clean_text_fast, texts),
+        ("accents", reference.remove_accents, fast._remove_accents_fast, cleaned),
+        ("tokenisation", reference.tokenize, fast._tokenize_fast, unaccented),
+        ("preprocess_text", reference.preprocess_text, fast.preprocess_text, texts),
+    )
+    
+    size = len(texts) * args.repeat
+    print(f"\n{'étape':>16} | {'référence (s)':>13} | {'rapide (s)':>10} | {'chunks/s rapide':>15} | {'accél.':>7}")
+    print("-" * 74)
+    for name, slow_function, fast_function, inputs in steps:
+        slow_time = measure(slow_function, inputs, args.repeat)
+        fast_time = measure(fast_function, inputs, args.repeat)
+        print(f"{name:>16} | {slow_time:13.3f} | {fast_time:10.3f} | {size / fast_time:15.0f} | "
+              f"x{slow_time / fast_time:6.1f}")
+
+
+if __name__ == "__main__":
+    main()
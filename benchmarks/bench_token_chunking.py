@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Découpage en caractères vs découpage en tokens du modèle d'embedding
+
+Sur le corpus (données de test par défaut), compare le découpage actuel en
+caractères et le découpage en tokens (chunks remplissant la fenêtre du modèle) :
+nombre de chunks, chunks dont le texte encodé (pré-traité) dépasse la fenêtre
+et est donc tronqué par le modèle, remplissage moyen de la fenêtre et durée du
+découpage.
+
+Usage:
+    python benchmarks/bench_token_chunking.py
+    python benchmarks/bench_token_chunking.py --prod --chunk-size 1500 --overlap 300
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Ajouter le répertoire du projet au path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import config
+from chunker import process_documents_chunks
+from embedder import get_tokenizer, model_token_window
+from loader import list_source_files, load_documents
+from preprocessor import preprocess_text
+
+
+def encoded_lengths(texts, batch_size=1024):
+    """Longueur en tokens (sans troncature) de chaque texte"""
+    tokenizer = get_tokenizer()[0]
+    lengths = []
+    for start in range(0, len(texts), batch_size):
+        encoded = tokenizer(texts[start:start + batch_size], add_special_tokens=False,
+                            return_attention_mask=False, return_token_type_ids=False, verbose=False)
+        lengths.extend(len(ids) for ids in encoded['input_ids'])
+    return lengths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Découpage en caractères vs en tokens")
+    parser.add_argument("--prod", action="store_true", help="Utiliser les données de production")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Mode caractères (défaut: 1000)")
+    parser.add_argument("--overlap", type=int, default=200, help="Mode caractères (défaut: 200)")
+    parser.add_argument("--max-tokens", type=int, default=0, help="Mode tokens (défaut: fenêtre du modèle)")
+    parser.add_argument("--overlap-tokens", type=int, default=config.chunk_overlap_tokens,
+                        help=f"Mode tokens (défaut: {config.chunk_overlap_tokens})")
+    args = parser.parse_args()
+    
+    config.test_mode = not args.prod
+    window = model_token_window()
+    max_tokens = min(args.max_tokens or window, window)
+    documents = load_documents(list_source_files())
+    print(f"\n📊 {len(documents)} documents, fenêtre du modèle {config.embedding_model}: {window} tokens")
+    
+    modes = (
+        (f"chars {args.chunk_size}/{args.overlap}", args.chunk_size, args.overlap, "chars"),
+        (f"tokens {max_tokens}/{args.overlap_tokens}", max_tokens, args.overlap_tokens, "tokens"),
+    )
+    
+    print(f"\n{'mode':>18} | {'chunks':>7} | {'tronqués':>8} | {'tokens moy.':>11} | {'remplissage':>11} | {'durée (s)':>9}")
+    print("-" * 80)
+    for name, chunk_size, overlap, unit in modes:
+        start = time.perf_counter()
+        chunks = process_documents_chunks(documents, chunk_size, overlap, unit)
+        elapsed = time.perf_counter() - start
+        
+        lengths = encoded_lengths([preprocess_text(chunk['content']) for chunk in chunks])
+        truncated = sum(1 for length in lengths if length > window)
+        mean = sum(lengths) / len(lengths) if lengths else 0.0
+        # Part de la fenêtre réellement encodée
+        fill = sum(min(length, window) for length in lengths) / (window * len(lengths)) if lengths else 0.0
+        print(f"{name:>18} | {len(chunks):>7} | {truncated:>8} | {mean:11.1f} | {fill:10.1%} | {elapsed:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la recherche vectorielle : boucle cosine_similarity vs index résident
+
+Compare, sur des embeddings synthétiques de dimension 384, la latence d'une
+requête avec l'ancienne implémentation de SemanticSearch.search_mongodb
+(un appel sklearn par document puis tri complet) et avec VectorIndex
+(produit matrice-vecteur + argpartition).
+
+Usage:
+    python benchmarks/bench_vector_index.py
+    python benchmarks/bench_vector_index.py --sizes 10000 100000 1000000 --legacy-max 100000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Ajouter le répertoire du projet au path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from vector_index import VectorIndex
+
+
+def legacy_search(query_embedding, docs, top_k):
+    """Reproduit l'ancienne boucle de SemanticSearch.search_mongodb"""
+    from sklearn.metrics.pairwise import cosine_similarity
+    
+    similarities = []
+    query_vector = np.array(query_embedding).reshape(1, -1)
+    for doc in docs:
+        doc_vector = np.array(doc['embedding']).reshape(1, -1)
+        similarity = cosine_similarity(query_vector, doc_vector)[0][0]
+        similarities.append({'id': doc['_id'], 'similarity': similarity})
+    similarities.sort(key=lambda x: x['similarity'], reverse=True)
+    return similarities[:top_k]
+
+
+def time_queries(search, queries) -> float:
+    """Retourne la latence médiane (en ms) d'une fonction de recherche"""
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+def run(sizes, dim, top_k, n_queries, legacy_max, seed):
+    rng = np.random.default_rng(seed)
+    queries = rng.standard_normal((n_queries, dim)).astype(np.float32)
+    
+    print(f"{'chunks':>10} | {'build (s)':>10} | {'index (ms)':>10} | {'legacy (ms)':>11} | {'speedup':>8}")
+    print("-" * 62)
+    
+    for size in sizes:
+        embeddings = rng.standard_normal((size, dim)).astype(np.float32)
+        
+        start = time.perf_counter()
+        index = VectorIndex(embeddings, list(range(size)))
+        build_time = time.perf_counter() - start
+        
+        index_ms = time_queries(lambda q: index.search(q, top_k), queries)
+        
+        if size <= legacy_max:
+            # Les documents MongoDB contiennent des listes Python de flottants
+            docs = [{'_id': i, 'embedding': row.tolist()} for i, row in enumerate(embeddings)]
+            legacy_ms = time_queries(lambda q: legacy_search(q.tolist(), docs, top_k), queries[:3])
+            legacy_text = f"{legacy_ms:11.1f}"
+            speedup_text = f"{legacy_ms / index_ms:7.0f}x"
+            del docs
+        else:
+            legacy_text = f"{'ignoré':>11}"
+            speedup_text = f"{'-':>8}"
+        
+        print(f"{size:>10} | {build_time:10.2f} | {index_ms:10.2f} | {legacy_text} | {speedup_text}")
+        del embeddings, index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'index vectoriel résident")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+                        help="Nombres de chunks à tester (défaut: 10k 100k 1M)")
+    parser.add_argument("--dim", type=int, default=384,
+                        help="Dimension des embeddings (défaut: 384)")
+    parser.add_argument("--top-k", type=int, default=5,
+                        help="Nombre de résultats par requête (défaut: 5)")
+    parser.add_argument("--queries", type=int, default=20,
+                        help="Nombre de requêtes mesurées (défaut: 20)")
+    parser.add_argument("--legacy-max", type=int, default=10_000,
+                        help="Taille maximale pour mesurer l'ancienne boucle (défaut: 10000)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    run(args.sizes, args.dim, args.top_k, args.queries, args.legacy_max, args.seed)
+
+
+if __name__ == "__main__":
+    main()
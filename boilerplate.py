@@ -0,0 +1,276 @@
+"""
+Nettoyage des PDF avant découpage : en-têtes/pieds de page répétés et césures
+
+Les documents officiels répètent le même en-tête, le même pied de page et le
+numéro de page sur chaque page ; une fois les pages jointes, ces lignes se
+retrouvent dans presque tous les chunks. Les lignes situées en bord de page
+(premières et dernières lignes non vides) sont comparées d'une page à l'autre
+après normalisation (casse, espaces, chiffres remplacés par '#', de sorte que
+"Page 3 / 12" et "Page 4 / 12" coïncident) ; celles qui se répètent sur une
+part suffisante des pages sont retirées. Les mots coupés en fin de ligne
+("juri-\\ndique") sont recollés si le mot entier apparaît ailleurs dans le
+document (dans les pages lues jusque-là) ; sinon le trait d'union est conservé
+("peut-\\nêtre" → "peut-être").
+
+Les pages sont traitées au fil de l'eau : les lignes répétées sont apprises sur
+les premières pages du document puis appliquées aux suivantes. Le nombre de
+pages est conservé (une page vidée reste une page vide), si bien que les
+numéros de page des chunks restent valables.
+"""
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, fields
+from itertools import tee
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+from chunker import split_pages_into_chunks
+
+# Version du nettoyage (fait partie des paramètres d'ingestion du manifeste)
+CLEANUP_VERSION = "2"
+
+# Nombre de lignes non vides examinées en haut et en bas de chaque page
+EDGE_LINES = 3
+# Pages lues avant de décider quelles lignes sont répétées
+SAMPLE_PAGES = 20
+# Part minimale des pages sur lesquelles une ligne doit apparaître
+MIN_PAGE_RATIO = 0.5
+# En dessous de ce nombre de pages, aucune ligne n'est considérée comme répétée
+MIN_PAGES = 3
+
+_DIGITS = re.compile(r"\d+")
+# Ligne porteuse d'information (les puces ou filets isolés ne sont pas des en-têtes)
+_MEANINGFUL = re.compile(r"[^\W\d_]|#")
+# Trait d'union en fin de ligne entre deux lettres minuscules, avec les deux fragments du mot
+_HYPHEN_BREAK = re.compile(r"([^\W\d_]*[a-zà-öø-ÿœ])-[ \t]*\n[ \t]*([a-zà-öø-ÿœ][^\W\d_]*)")
+_WORD = re.compile(r"[^\W\d_]+")
+
+
+@dataclass
+class CleanupStats:
+    """Compteurs du nettoyage, cumulables d'un document à l'autre"""
+    
+    documents: int = 0
+    pages: int = 0
+    lines_removed: int = 0
+    hyphens_joined: int = 0
+    chars_before: int = 0
+    chars_after: int = 0
+    chunks_before: int = 0
+    chunks_after: int = 0
+    
+    @property
+    def chars_saved(self) -> int:
+        return self.chars_before - self.chars_after
+    
+    @property
+    def chunks_saved(self) -> int:
+        return self.chunks_before - self.chunks_after
+    
+    def add(self, other: "CleanupStats"):
+        """Ajoute les compteurs d'un autre document"""
+        for f in fields(self):
+            setattr(self, f.name, getattr(self, f.name) + getattr(other, f.name))
+    
+    def as_dict(self) -> Dict:
+        stats = {f.name: getattr(self, f.name) for f in fields(self)}
+        stats.update(chars_saved=self.chars_saved, chunks_saved=self.chunks_saved)
+        return stats
+
+
+def line_key(line: str) -> str:
+    """Forme normalisée d'une ligne pour la détection des répétitions"""
+    return _DIGITS.sub("#", " ".join(line.split()).lower())
+
+
+def _edge_indices(lines: List[str], edge_lines: int) -> List[int]:
+    """Indices des premières et dernières lignes non vides d'une page"""
+    filled = [i for i, line in enumerate(lines) if line.strip()]
+    if len(filled) <= 2 * edge_lines:
+        return filled
+    return filled[:edge_lines] + filled[-edge_lines:]
+
+
+def _edge_keys(page: str, edge_lines: int) -> Set[str]:
+    lines = page.split("\n")
+    keys = {line_key(lines[i]) for i in _edge_indices(lines, edge_lines)}
+    return {key for key in keys if _MEANINGFUL.search(key)}
+
+
+def find_repeated_lines(pages: List[str], edge_lines: int = EDGE_LINES,
+                        min_ratio: float = MIN_PAGE_RATIO) -> Set[str]:
+    """
+    Détermine les lignes de bord de page répétées d'une page à l'autre
+    
+    Args:
+        pages: Texte des pages
+        edge_lines: Nombre de lignes non vides examinées en haut et en bas de page
+        min_ratio: Part minimale des pages où la ligne doit apparaître
+    
+    Returns:
+        Ensemble des lignes répétées (forme normalisée, voir line_key)
+    """
+    if len(pages) < MIN_PAGES:
+        return set()
+    
+    counts = Counter()
+    for page in pages:
+        counts.update(_edge_keys(page, edge_lines))
+    
+    threshold = max(2, math.ceil(min_ratio * len(pages)))
+    return {key for key, count in counts.items() if count >= threshold}
+
+
+def document_words(text: str) -> Set[str]:
+    """Mots (en minuscules) d'un texte, pour décider du recollage des césures"""
+    return set(_WORD.findall(text.lower()))
+
+
+def join_hyphen_breaks(page: str, vocabulary: Set[str], stats: CleanupStats) -> str:
+    """
+    Supprime les retours à la ligne qui suivent un trait d'union
+    
+    Le mot est recollé ("juri-\\ndique" → "juridique") seulement si sa forme sans
+    trait d'union figure dans `vocabulary` ; sinon c'est un mot composé et le
+    trait d'union est conservé ("porte-\\nmonnaie" → "porte-monnaie").
+    """
+    def join(match: re.Match) -> str:
+        word = match.group(1) + match.group(2)
+        if word.lower() in vocabulary:
+            stats.hyphens_joined += 1
+            return word
+        return match.group(1) + "-" + match.group(2)
+    
+    return _HYPHEN_BREAK.sub(join, page)
+
+
+def strip_page(page: str, repeated: Set[str], stats: CleanupStats, vocabulary: Set[str],
+               edge_lines: int = EDGE_LINES) -> str:
+    """
+    Retire d'une page les lignes répétées situées en bord de page et recolle les césures
+    
+    Args:
+        page: Texte de la page
+        repeated: Lignes répétées (forme normalisée)
+        stats: Compteurs mis à jour
+        vocabulary: Mots du document (voir join_hyphen_breaks)
+        edge_lines: Nombre de lignes non vides examinées en haut et en bas de page
+    
+    Returns:
+        Texte nettoyé de la page
+    """
+    if repeated:
+        lines = page.split("\n")
+        removed = {i for i in _edge_indices(lines, edge_lines) if line_key(lines[i]) in repeated}
+        if removed:
+            stats.lines_removed += len(removed)
+            page = "\n".join(line for i, line in enumerate(lines) if i not in removed)
+    
+    return join_hyphen_breaks(page, vocabulary, stats)
+
+
+def _count_chunks(pages: Iterable[str], chunk_size: int, overlap: int, stats: CleanupStats,
+                  field: str) -> Iterator[str]:
+    """
+    Transmet les pages en comptant au même rythme les chunks qu'elles produiront
+    
+    Le comptage avance page par page avec le consommateur : seul le tampon du
+    découpage est conservé, jamais le document entier.
+    """
+    pages, shadow = tee(pages)
+    consumed = 0
+    shadow_consumed = 0
+    
+    def shadow_pages():
+        nonlocal shadow_consumed
+        for page in shadow:
+            shadow_consumed += 1
+            yield page
+    
+    chunks = split_pages_into_chunks(shadow_pages(), chunk_size, overlap)
+    
+    def advance() -> bool:
+        if next(chunks, None) is None:
+            return False
+        setattr(stats, field, getattr(stats, field) + 1)
+        return True
+    
+    for page in pages:
+        consumed += 1
+        yield page
+        while shadow_consumed < consumed and advance():
+            pass
+    
+    while advance():
+        pass
+
+
+def clean_pages(pages: Iterable[str], stats: Optional[CleanupStats] = None,
+                chunk_size: Optional[int] = None, overlap: Optional[int] = None,
+                sample_pages: int = SAMPLE_PAGES) -> Iterator[str]:
+    """
+    Nettoie les pages d'un document au fil de l'eau
+    
+    Si chunk_size est fourni, les chunks produits avant et après nettoyage sont
+    comptés (stats.chunks_before / stats.chunks_after).
+    
+    Les mots qui décident du recollage des césures sont ceux des pages lues
+    jusque-là (l'échantillon entier pour ses propres pages) : le résultat est le
+    même que le document soit chargé en entier ou lu page par page.
+    
+    Args:
+        pages: Texte des pages, produit paresseusement
+        stats: Compteurs mis à jour (optionnel)
+        chunk_size: Taille des chunks pour le comptage (optionnel)
+        overlap: Chevauchement des chunks pour le comptage
+        sample_pages: Nombre de pages lues avant de décider des lignes répétées
+    
+    Yields:
+        Texte nettoyé de chaque page
+    """
+    stats = stats if stats is not None else CleanupStats()
+    stats.documents += 1
+    
+    def measured(pages: Iterable[str], field: str) -> Iterator[str]:
+        for page in pages:
+            setattr(stats, field, getattr(stats, field) + len(page))
+            yield page
+    
+    def cleaned(pages: Iterable[str]) -> Iterator[str]:
+        pages = iter(pages)
+        sample = []
+        for page in pages:
+            sample.append(page)
+            if len(sample) >= sample_pages:
+                break
+        
+        repeated = find_repeated_lines(sample)
+        words = document_words("\n".join(sample))
+        for page in sample:
+            yield strip_page(page, repeated, stats, words)
+        for page in pages:
+            words.update(document_words(page))
+            yield strip_page(page, repeated, stats, words)
+    
+    raw = measured(pages, "chars_before")
+    if chunk_size is not None:
+        raw = _count_chunks(raw, chunk_size, overlap, stats, "chunks_before")
+    
+    result = measured(cleaned(raw), "chars_after")
+    if chunk_size is not None:
+        result = _count_chunks(result, chunk_size, overlap, stats, "chunks_after")
+    
+    for page in result:
+        stats.pages += 1
+        yield page
+
+
+def format_stats(stats: CleanupStats) -> str:
+    """Résumé du nettoyage pour l'affichage"""
+    ratio = stats.chars_saved / stats.chars_before if stats.chars_before else 0.0
+    summary = (f"🧹 Nettoyage PDF: {stats.chars_saved} caractères retirés ({ratio:.1%}) sur "
+               f"{stats.documents} documents, {stats.lines_removed} lignes répétées, "
+               f"{stats.hyphens_joined} césures")
+    if stats.chunks_before:
+        summary += f", chunks {stats.chunks_before} → {stats.chunks_after} (-{stats.chunks_saved})"
+    return summary
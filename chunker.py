@@ -1,9 +1,28 @@
 import re
-from typing import List, Dict
+from bisect import bisect_left, bisect_right
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Tuple
 
-def split_text_into_chunks(text: str, chunk_size: int = 1000, overlap: int = 200) -> List[str]:
+# Séparateur des pages d'un PDF dans le texte du document
+PAGE_JOIN = "\n"
+
+# Version du découpage (fait partie des paramètres d'ingestion du manifeste)
+CHUNKER_VERSION = "2"
+
+def _min_step(chunk_size: int, overlap: int) -> int:
+    """Avancée entre deux débuts de chunk quand le chevauchement ne permet pas d'avancer"""
+    return max(1, max(chunk_size - overlap, chunk_size // 4) // 2)
+
+def _next_start(start: int, end: int, overlap: int, step: int) -> int:
+    """Début du chunk suivant : `overlap` avant la fin, ou `start + step` si cela ne fait pas avancer"""
+    return end - overlap if end - overlap > start else start + step
+
+def split_text_into_spans(text: str, chunk_size: int = 1000, overlap: int = 200) -> List[Tuple[int, int]]:
     """
-    Découpe un texte en chunks avec un chevauchement
+    Calcule les bornes des chunks d'un texte (avant suppression des espaces)
+    
+    Une coupure naturelle n'est cherchée qu'après les `overlap` premiers
+    caractères du chunk : le chunk suivant commence toujours après le début du
+    précédent, et le découpage reste linéaire en la taille du texte.
     
     Args:
         text: Le texte à découper
@@ -11,13 +30,11 @@ def split_text_into_chunks(text: str, chunk_size: int = 1000, overlap: int = 200
         overlap: Nombre de caractères de chevauchement entre les chunks
     
     Returns:
-        Liste des chunks de texte
+        Liste de couples (début, fin) dans le texte
     """
-    if len(text) <= chunk_size:
-        return [text]
-    
-    chunks = []
+    spans = []
     start = 0
+    step = _min_step(chunk_size, overlap)
     
     while start < len(text):
         # Calculer la fin du chunk
@@ -25,62 +42,387 @@ def split_text_into_chunks(text: str, chunk_size: int = 1000, overlap: int = 200
         
         # Si ce n'est pas le dernier chunk, essayer de couper à un point naturel
         if end < len(text):
-            # Chercher le dernier point, point d'exclamation ou point d'interrogation
-            last_sentence_end = max(
-                text.rfind('.', start, end),
-                text.rfind('!', start, end),
-                text.rfind('?', start, end)
-            )
-            
-            # Si on trouve un point de coupure naturel, l'utiliser
-            if last_sentence_end > start:
-                end = last_sentence_end + 1
-            else:
-                # Sinon, chercher le dernier espace
-                last_space = text.rfind(' ', start, end)
-                if last_space > start:
-                    end = last_space
+            end = _natural_end(text, start + overlap + 1, end)
+        
+        spans.append((start, end))
         
+        # Calculer le prochain point de départ avec chevauchement
+        if end >= len(text):
+            break
+        
+        start = _next_start(start, end, overlap, step)
+    
+    return spans
+
+def _natural_end(text: str, floor: int, end: int) -> int:
+    """
+    Recule la fin d'un chunk jusqu'à la dernière fin de phrase, ou à défaut le
+    dernier espace, situé(e) à partir de la position `floor`
+    """
+    # Chercher le dernier point, point d'exclamation ou point d'interrogation
+    last_sentence_end = max(
+        text.rfind('.', floor, end),
+        text.rfind('!', floor, end),
+        text.rfind('?', floor, end)
+    )
+    
+    # Si on trouve un point de coupure naturel, l'utiliser
+    if last_sentence_end >= floor:
+        return last_sentence_end + 1
+    
+    # Sinon, chercher le dernier espace
+    last_space = text.rfind(' ', floor, end)
+    if last_space >= floor:
+        return last_space
+    return end
+
+def split_text_into_chunks(text: str, chunk_size: int = 1000, overlap: int = 200) -> List[str]:
+    """
+    Découpe un texte en chunks avec un chevauchement
+    
+    Args:
+        text: Le texte à découper
+        chunk_size: Taille maximale de chaque chunk en caractères
+        overlap: Nombre de caractères de chevauchement entre les chunks
+    
+    Returns:
+        Liste des chunks de texte
+    """
+    if len(text) <= chunk_size:
+        return [text]
+    
+    chunks = []
+    for start, end in split_text_into_spans(text, chunk_size, overlap):
         # Extraire le chunk
         chunk = text[start:end].strip()
         if chunk:
             chunks.append(chunk)
+    
+    return chunks
+
+def _stripped_span(text: str, start: int, end: int) -> Tuple[int, int]:
+    """Bornes d'un extrait une fois les espaces de début et de fin retirés"""
+    segment = text[start:end]
+    stripped = segment.strip()
+    if not stripped:
+        return start, end
+    offset = start + len(segment) - len(segment.lstrip())
+    return offset, offset + len(stripped)
+
+def _page_range(page_starts: List[int], start: int, end: int) -> Tuple[int, int]:
+    """Pages (numérotées à partir de 1) couvertes par l'intervalle [start, end) du texte"""
+    return bisect_right(page_starts, start), bisect_right(page_starts, max(start, end - 1))
+
+def split_pages_into_chunks(pages: Iterable[str], chunk_size: int = 1000,
+                            overlap: int = 200) -> Iterator[Tuple[str, int, int]]:
+    """
+    Découpe un document fourni page par page, sans jamais le charger en entier
+    
+    Produit exactement les chunks de split_text_into_chunks sur les pages jointes
+    par PAGE_JOIN ; seul un tampon d'environ chunk_size caractères plus une page
+    est conservé en mémoire.
+    
+    Args:
+        pages: Texte des pages, produit paresseusement
+        chunk_size: Taille maximale de chaque chunk en caractères
+        overlap: Nombre de caractères de chevauchement entre les chunks
+    
+    Yields:
+        Triplets (texte du chunk, page de début, page de fin)
+    """
+    pages = iter(pages)
+    step = _min_step(chunk_size, overlap)
+    buffer = ""        # Texte à partir de la position `base` du document
+    base = 0
+    page_starts = []   # Position de début de chaque page (numéro de page = indice + 1)
+    exhausted = False
+    
+    def fill(size: int):
+        """Lit des pages jusqu'à ce que le tampon contienne au moins `size` caractères"""
+        nonlocal buffer, exhausted
+        while not exhausted and len(buffer) < size:
+            page = next(pages, None)
+            if page is None:
+                exhausted = True
+                break
+            if page_starts:
+                buffer += PAGE_JOIN
+            page_starts.append(base + len(buffer))
+            buffer += page
+    
+    fill(chunk_size + 1)
+    if not buffer:
+        return
+    
+    # Document court : un seul chunk, non nettoyé (comme split_text_into_chunks)
+    if exhausted and len(buffer) <= chunk_size:
+        yield (buffer, *_page_range(page_starts, *_stripped_span(buffer, 0, len(buffer))))
+        return
+    
+    start = 0
+    while True:
+        fill(start - base + chunk_size + 1)
+        length = base + len(buffer)
+        end = min(start + chunk_size, length)
         
-        # Calculer le prochain point de départ avec chevauchement
-        if end >= len(text):
+        if end < length:
+            end = base + _natural_end(buffer, start - base + overlap + 1, end - base)
+        
+        chunk = buffer[start - base:end - base].strip()
+        if chunk:
+            span = _stripped_span(buffer, start - base, end - base)
+            yield (chunk, *_page_range(page_starts, span[0] + base, span[1] + base))
+        
+        if exhausted and end >= length:
             break
-            
-        start = max(start + 1, end - overlap)
+        
+        start = _next_start(start, end, overlap, step)
+        
+        # Oublier le texte déjà dépassé
+        buffer = buffer[start - base:]
+        base = start
+
+# Taille maximale des segments passés au tokenizer (une page très longue est
+# découpée aux espaces pour borner la mémoire d'un appel)
+TOKENIZE_SEGMENT = 1 << 16
+
+def _segments(text: str, size: int = TOKENIZE_SEGMENT) -> List[Tuple[int, str]]:
+    """Découpe un texte aux espaces en segments d'au plus `size` caractères ; retourne (position, segment)"""
+    segments = []
+    start = 0
+    while len(text) - start > size:
+        cut = max(text.rfind(' ', start, start + size), text.rfind('\n', start, start + size))
+        if cut <= start:
+            cut = start + size
+        segments.append((start, text[start:cut]))
+        start = cut
+    segments.append((start, text[start:]))
+    return segments
+
+def _default_tokenize(texts: List[str]) -> List[List[Tuple[int, int]]]:
+    # Import différé : le découpage en caractères ne charge ni torch ni le modèle
+    from embedder import token_offsets
+    return token_offsets(texts)
+
+def split_pages_into_token_spans(pages: Iterable[str], max_tokens: int, overlap_tokens: int = 64,
+                                 page_starts: Optional[List[int]] = None,
+                                 tokenize: Optional[Callable[[List[str]], List[List[Tuple[int, int]]]]] = None
+                                 ) -> Iterator[Tuple[str, int, int]]:
+    """
+    Découpe un document page par page en chunks d'au plus `max_tokens` tokens du modèle
     
-    return chunks
+    Chaque page est tokenisée une fois (appel par lots du tokenizer rapide) et
+    la position de chaque token dans le texte est conservée : la fenêtre d'un
+    chunk s'arrête à la fin de son max_tokens-ième token, puis recule jusqu'à la
+    dernière fin de phrase ou le dernier espace, comme en mode caractères. Le
+    chunk suivant reprend `overlap_tokens` tokens avant la coupure.
+    
+    Args:
+        pages: Texte des pages (jointes par PAGE_JOIN), produit paresseusement
+        max_tokens: Nombre maximal de tokens par chunk (hors tokens spéciaux)
+        overlap_tokens: Chevauchement entre chunks en tokens
+        page_starts: Liste complétée avec la position de début de chaque page lue (optionnel)
+        tokenize: Fonction (textes) -> positions (début, fin) des tokens de chaque texte
+            (défaut: tokenizer du modèle d'embedding, voir embedder.token_offsets)
+    
+    Yields:
+        Triplets (texte du chunk, début, fin) ; début et fin sont les positions du
+        chunk (sans les espaces de bord) dans le document
+    """
+    pages = iter(pages)
+    tokenize = tokenize or _default_tokenize
+    page_starts = page_starts if page_starts is not None else []
+    step = _min_step(max_tokens, overlap_tokens)
+    buffer = ""        # Texte à partir de la position `base` du document
+    base = 0
+    starts = []        # Positions (dans le document) des tokens lus, à partir du premier token du chunk courant
+    ends = []
+    exhausted = False
+    
+    def fill(count: int):
+        """Lit et tokenise des pages jusqu'à disposer d'au moins `count` tokens"""
+        nonlocal buffer, exhausted
+        while not exhausted and len(starts) < count:
+            page = next(pages, None)
+            if page is None:
+                exhausted = True
+                break
+            if page_starts:
+                buffer += PAGE_JOIN
+            offset = base + len(buffer)
+            page_starts.append(offset)
+            buffer += page
+            segments = _segments(page)
+            for (position, _), offsets in zip(segments, tokenize([segment for _, segment in segments])):
+                shift = offset + position
+                starts.extend([token_start + shift for token_start, _ in offsets])
+                ends.extend([token_end + shift for _, token_end in offsets])
+    
+    first = 0          # Premier token du chunk courant (indice dans starts/ends)
+    start = 0
+    while True:
+        fill(first + max_tokens + 1)
+        length = base + len(buffer)
+        if exhausted and first + max_tokens >= len(starts):
+            # Les tokens restants tiennent dans un chunk
+            end = length
+        else:
+            limit = ends[first + max_tokens - 1]
+            # Couper après les `overlap_tokens` premiers tokens : le chunk suivant avance
+            floor = ends[first + min(overlap_tokens, max_tokens - 1)]
+            end = base + _natural_end(buffer, floor - base, limit - base)
+        
+        chunk = buffer[start - base:end - base].strip()
+        if chunk:
+            span = _stripped_span(buffer, start - base, end - base)
+            yield (chunk, span[0] + base, span[1] + base)
+        
+        if exhausted and end >= length:
+            break
+        
+        first = _next_start(first, bisect_left(starts, end, first), overlap_tokens, step)
+        fill(first + 1)
+        if first >= len(starts):
+            break
+        start = starts[first]
+        
+        # Oublier le texte et les tokens déjà dépassés, par blocs (une page peut
+        # contenir tout un document : pas de copie du tampon à chaque chunk)
+        if first > len(starts) // 2:
+            buffer = buffer[start - base:]
+            base = start
+            del starts[:first], ends[:first]
+            first = 0
+
+def _section_paths(headings: List[Dict]) -> Tuple[List[int], List[List[str]]]:
+    """Position de chaque titre et chemin des titres (du plus général au plus précis) qu'il ouvre"""
+    offsets = []
+    paths = []
+    stack = []
+    for heading in headings:
+        while stack and stack[-1]['level'] >= heading['level']:
+            stack.pop()
+        stack.append(heading)
+        offsets.append(heading['offset'])
+        paths.append([entry['title'] for entry in stack])
+    return offsets, paths
+
+def _section_at(sections: Tuple[List[int], List[List[str]]], position: int) -> Optional[List[str]]:
+    """Chemin des titres de la section contenant une position du texte"""
+    offsets, paths = sections
+    index = bisect_right(offsets, position) - 1
+    return paths[index] if index >= 0 else None
+
+def _chunk_document(document: Dict, index: int, content: str, total: Optional[int],
+                    pages: Optional[Tuple[int, int]] = None, section: Optional[List[str]] = None) -> Dict:
+    """Construit le dictionnaire d'un chunk avec ses métadonnées"""
+    chunk_doc = {
+        'source': document['source'],
+        'content': content,
+        'chunk_index': index,
+        'total_chunks': total
+    }
+    # Pages couvertes par le chunk (PDF)
+    if pages is not None:
+        chunk_doc['page_start'], chunk_doc['page_end'] = pages
+    # Titres de la section où commence le chunk (markdown)
+    if section is not None:
+        chunk_doc['section'] = section
+    # Métadonnées structurées (appels d'offres) recopiées dans chaque chunk
+    if 'metadata' in document:
+        chunk_doc['metadata'] = document['metadata']
+    return chunk_doc
+
+def _document_pages(text: str, page_starts: Optional[List[int]]) -> List[str]:
+    """Texte des pages d'un document chargé en entier (une seule page sans page_starts)"""
+    if not page_starts:
+        return [text]
+    ends = [position - len(PAGE_JOIN) for position in page_starts[1:]] + [len(text)]
+    return [text[start:end] for start, end in zip(page_starts, ends)]
 
-def split_document_into_chunks(document: Dict, chunk_size: int = 1000, overlap: int = 200) -> List[Dict]:
+def split_document_into_chunks(document: Dict, chunk_size: int = 1000, overlap: int = 200,
+                               unit: str = "chars") -> List[Dict]:
     """
     Découpe un document en chunks
     
     Args:
-        document: Document avec 'source' et 'content'
+        document: Document avec 'source' et 'content' (et 'page_starts' pour un PDF,
+            'headings' pour un fichier markdown)
         chunk_size: Taille maximale de chaque chunk
         overlap: Chevauchement entre chunks
+        unit: Unité de chunk_size et overlap : "chars" (caractères) ou "tokens"
+            (tokens du modèle d'embedding, voir split_pages_into_token_spans)
     
     Returns:
         Liste de chunks avec métadonnées
     """
-    chunks = split_text_into_chunks(document['content'], chunk_size, overlap)
+    text = document['content']
+    page_starts = document.get('page_starts')
+    sections = _section_paths(document['headings']) if document.get('headings') else None
+    
+    if unit == "tokens":
+        spans = [(chunk, (start, end)) for chunk, start, end in
+                 split_pages_into_token_spans(_document_pages(text, page_starts), chunk_size, overlap)]
+    elif page_starts is None and sections is None:
+        spans = [(chunk, None) for chunk in split_text_into_chunks(text, chunk_size, overlap)]
+    # Positions des chunks dans le texte, pour les pages et les sections
+    elif len(text) <= chunk_size:
+        spans = [(text, _stripped_span(text, 0, len(text)))]
+    else:
+        spans = []
+        for start, end in split_text_into_spans(text, chunk_size, overlap):
+            chunk = text[start:end].strip()
+            if chunk:
+                spans.append((chunk, _stripped_span(text, start, end)))
+    
+    chunks = [
+        (chunk,
+         _page_range(page_starts, *span) if page_starts is not None else None,
+         _section_at(sections, span[0]) if sections is not None else None)
+        for chunk, span in spans
+    ]
     
     result = []
-    for i, chunk_text in enumerate(chunks):
-        chunk_doc = {
-            'source': document['source'],
-            'content': chunk_text,
-            'chunk_index': i,
-            'total_chunks': len(chunks)
-        }
-        result.append(chunk_doc)
+    for i, (chunk_text, pages, section) in enumerate(chunks):
+        result.append(_chunk_document(document, i, chunk_text, len(chunks), pages, section))
     
     return result
 
-def process_documents_chunks(documents: List[Dict], chunk_size: int = 1000, overlap: int = 200) -> List[Dict]:
+def iter_document_chunks(document: Dict, chunk_size: int = 1000, overlap: int = 200,
+                         unit: str = "chars") -> Iterator[Dict]:
+    """
+    Découpe un document en chunks au fil de l'eau (mode streaming)
+    
+    Un document paresseux ('pages' : itérable des pages d'un PDF) est découpé
+    sans être chargé en entier ; son nombre total de chunks n'est connu qu'à la
+    fin, 'total_chunks' vaut donc None pour ses chunks.
+    
+    Args:
+        document: Document avec 'source' et 'content', ou 'source' et 'pages'
+        chunk_size: Taille maximale de chaque chunk
+        overlap: Chevauchement entre chunks
+        unit: Unité de chunk_size et overlap : "chars" ou "tokens"
+    
+    Yields:
+        Chunks avec métadonnées
+    """
+    if 'pages' not in document:
+        yield from split_document_into_chunks(document, chunk_size, overlap, unit)
+        return
+    
+    if unit == "tokens":
+        page_starts = []
+        for i, (chunk_text, start, end) in enumerate(
+                split_pages_into_token_spans(document['pages'], chunk_size, overlap, page_starts)):
+            yield _chunk_document(document, i, chunk_text, None, _page_range(page_starts, start, end))
+        return
+    
+    for i, (chunk_text, page_start, page_end) in enumerate(
+            split_pages_into_chunks(document['pages'], chunk_size, overlap)):
+        yield _chunk_document(document, i, chunk_text, None, (page_start, page_end))
+
+def process_documents_chunks(documents: List[Dict], chunk_size: int = 1000, overlap: int = 200,
+                             unit: str = "chars") -> List[Dict]:
     """
     Traite une liste de documents et les découpe en chunks
     
@@ -88,6 +430,7 @@ def process_documents_chunks(documents: List[Dict], chunk_size: int = 1000, over
         documents: Liste de documents
         chunk_size: Taille maximale de chaque chunk
         overlap: Chevauchement entre chunks
+        unit: Unité de chunk_size et overlap : "chars" ou "tokens"
     
     Returns:
         Liste de tous les chunks de tous les documents
@@ -97,7 +440,7 @@ def process_documents_chunks(documents: List[Dict], chunk_size: int = 1000, over
     print(f"Découpage de {len(documents)} documents en chunks...")
     
     for doc in documents:
-        doc_chunks = split_document_into_chunks(doc, chunk_size, overlap)
+        doc_chunks = split_document_into_chunks(doc, chunk_size, overlap, unit)
         all_chunks.extend(doc_chunks)
     
     print(f"✓ {len(all_chunks)} chunks créés")
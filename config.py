@@ -20,6 +20,11 @@ class VectorizationConfig:
     # Paramètres de chunking
     chunk_size: int = 1000
     chunk_overlap: int = 200
+    # Unité du découpage : "chars" (chunk_size/chunk_overlap) ou "tokens" du modèle d'embedding
+    chunk_unit: str = "chars"
+    # Mode tokens : tokens par chunk (0 = fenêtre du modèle) et chevauchement en tokens
+    chunk_max_tokens: int = 0
+    chunk_overlap_tokens: int = 64
     
     # Configuration MongoDB
     mongo_uri: str = ""
@@ -45,12 +50,66 @@ class VectorizationConfig:
     test_data_dir: str = "./data_test"
     test_json_filename: str = "all_aos_sample.json"
     
+    # Processus d'extraction des fichiers PDF/markdown (0 = nombre de cœurs, 1 = séquentiel)
+    loader_workers: int = 0
+    
+    # Cache disque du texte extrait des PDF/markdown (clé : empreinte du fichier)
+    text_cache_enabled: bool = True
+    text_cache_dir: str = "./.cache/text"
+    
+    # Nettoyage des PDF avant découpage (en-têtes/pieds de page répétés, césures)
+    pdf_cleanup: bool = True
+    
+    # Regroupement des chunks quasi-identiques avant l'encodage (MinHash/LSH, voir dedup.py)
+    chunk_dedup: bool = False
+    dedup_threshold: float = 0.9
+    
     # Configuration du modèle d'embedding
     embedding_model: str = "intfloat/multilingual-e5-small"
     
+    # Backend d'inférence : "torch" (fp32), "torch-int8" (quantification dynamique) ou "onnx"
+    embedding_backend: str = "torch"
+    # Répertoire de l'export ONNX du modèle (créé au premier usage du backend "onnx")
+    onnx_cache_dir: str = "./.cache/onnx"
+    
+    # Taille des lots pour l'encodage des embeddings
+    embedding_batch_size: int = 32
+    
+    # Implémentation rapide du pré-traitement (même texte produit, voir benchmarks/bench_preprocessor_fast.py)
+    preprocess_fast: bool = False
+    # Pré-traitement multi-processus des chunks (1 = dans le processus courant, 0 = nombre de cœurs)
+    preprocess_workers: int = 1
+    # Stemming des chunks encodés (change le texte produit, donc la version du pré-traitement)
+    preprocess_stemming: bool = False
+    # Taille des caches de formes du préprocesseur (stems, test des stop words ; 0 = désactivés)
+    preprocess_cache_size: int = 65536
+    # Ne jamais télécharger de ressource NLTK (hôtes sans accès réseau)
+    nltk_offline: bool = False
+    
+    # Encodage multi-processus (1 = dans le processus courant)
+    embedding_workers: int = 1
+    # Threads torch par processus d'encodage (0 = cœurs disponibles / nombre de processus)
+    embedding_torch_threads: int = 0
+    
+    # Cache persistant des embeddings (clé : modèle et backend, version du pré-traitement, texte)
+    embedding_cache_enabled: bool = True
+    embedding_cache_path: str = "./.cache/embeddings.sqlite"
+    embedding_cache_max_mb: int = 1024
+    
+    # Format de stockage des embeddings : "array" (doubles BSON), "float32" ou "float16" (Binary)
+    embedding_storage: str = "array"
+    
+    # Cache LRU des embeddings de requêtes (0 désactive le cache, TTL 0 = sans expiration)
+    query_cache_size: int = 1024
+    query_cache_ttl: float = 0
+    
     # Taille des lots pour l'insertion MongoDB
     batch_size: int = 500
     
+    # Mode streaming : chunks par lot d'encodage/insertion et éléments en attente entre deux étapes
+    stream_batch_size: int = 256
+    stream_queue_size: int = 4
+    
     def get_data_dir(self) -> str:
         """Retourne le répertoire de données selon le mode"""
         return self.test_data_dir if self.test_mode else self.data_dir
@@ -79,13 +138,16 @@ class VectorizationConfig:
             return f"mongodb://{self.mongo_user}:{self.mongo_password}@{self.mongo_host}:{self.mongo_port}"
         else:
             return f"mongodb://{self.mongo_host}:{self.mongo_port}"
-
+    
     @classmethod
     def from_env(cls):
         """Crée une configuration à partir des variables d'environnement"""
         return cls(
             chunk_size=int(os.getenv("CHUNK_SIZE", "1000")),
             chunk_overlap=int(os.getenv("CHUNK_OVERLAP", "200")),
+            chunk_unit=os.getenv("CHUNK_UNIT", "chars"),
+            chunk_max_tokens=int(os.getenv("CHUNK_MAX_TOKENS", "0")),
+            chunk_overlap_tokens=int(os.getenv("CHUNK_OVERLAP_TOKENS", "64")),
             mongo_uri=os.getenv("MONGO_URI", ""),
             mongo_host=os.getenv("MONGO_HOST", "localhost"),
             mongo_port=int(os.getenv("MONGO_PORT", "27017")),
@@ -101,8 +163,32 @@ class VectorizationConfig:
             pdf_subdir=os.getenv("PDF_SUBDIR", "root"),
             test_data_dir=os.getenv("TEST_DATA_DIR", "./data_test"),
             test_json_filename=os.getenv("TEST_JSON_FILENAME", "all_aos_sample.json"),
+            loader_workers=int(os.getenv("LOADER_WORKERS", "0")),
+            text_cache_enabled=os.getenv("TEXT_CACHE", "true").lower() in ["true", "1", "yes"],
+            text_cache_dir=os.getenv("TEXT_CACHE_DIR", "./.cache/text"),
+            pdf_cleanup=os.getenv("PDF_CLEANUP", "true").lower() in ["true", "1", "yes"],
+            chunk_dedup=os.getenv("CHUNK_DEDUP", "false").lower() in ["true", "1", "yes"],
+            dedup_threshold=float(os.getenv("DEDUP_THRESHOLD", "0.9")),
             embedding_model=os.getenv("EMBEDDING_MODEL", "intfloat/multilingual-e5-small"),
-            batch_size=int(os.getenv("BATCH_SIZE", "500"))
+            embedding_backend=os.getenv("EMBEDDING_BACKEND", "torch"),
+            onnx_cache_dir=os.getenv("ONNX_CACHE_DIR", "./.cache/onnx"),
+            embedding_batch_size=int(os.getenv("EMBEDDING_BATCH_SIZE", "32")),
+            preprocess_fast=os.getenv("PREPROCESS_FAST", "false").lower() in ["true", "1", "yes"],
+            preprocess_workers=int(os.getenv("PREPROCESS_WORKERS", "1")),
+            preprocess_stemming=os.getenv("PREPROCESS_STEMMING", "false").lower() in ["true", "1", "yes"],
+            preprocess_cache_size=int(os.getenv("PREPROCESS_CACHE_SIZE", "65536")),
+            nltk_offline=os.getenv("NLTK_OFFLINE", "false").lower() in ["true", "1", "yes"],
+            embedding_workers=int(os.getenv("EMBEDDING_WORKERS", "1")),
+            embedding_torch_threads=int(os.getenv("EMBEDDING_TORCH_THREADS", "0")),
+            embedding_cache_enabled=os.getenv("EMBEDDING_CACHE", "true").lower() in ["true", "1", "yes"],
+            embedding_cache_path=os.getenv("EMBEDDING_CACHE_PATH", "./.cache/embeddings.sqlite"),
+            embedding_cache_max_mb=int(os.getenv("EMBEDDING_CACHE_MAX_MB", "1024")),
+            embedding_storage=os.getenv("EMBEDDING_STORAGE", "array"),
+            query_cache_size=int(os.getenv("QUERY_CACHE_SIZE", "1024")),
+            query_cache_ttl=float(os.getenv("QUERY_CACHE_TTL", "0")),
+            batch_size=int(os.getenv("BATCH_SIZE", "500")),
+            stream_batch_size=int(os.getenv("STREAM_BATCH_SIZE", "256")),
+            stream_queue_size=int(os.getenv("STREAM_QUEUE_SIZE", "4"))
         )
 
 # Configuration globale
@@ -0,0 +1,186 @@
+"""
+Détection des chunks quasi-identiques avant l'encodage (MinHash / LSH)
+
+Les articles construits sur un même modèle, les courriers officiels presque
+identiques et les documents présents en plusieurs exemplaires produisent des
+chunks dont le texte ne diffère que de quelques mots. Chacun était encodé,
+stocké puis renvoyé par la recherche.
+
+Le texte pré-traité de chaque chunk (celui qui est encodé) est réduit à
+l'ensemble de ses n-grammes de mots, résumé par une signature MinHash. Les
+signatures sont découpées en bandes indexées (LSH) : seuls les chunks partageant
+au moins une bande sont comparés, et la similarité de Jaccard est estimée par la
+part des composantes communes de leurs signatures.
+
+Les chunks sont regroupés autour d'un représentant : le premier chunk d'un
+groupe est conservé et encodé, les suivants (similarité avec le représentant
+au moins égale au seuil) ne sont pas encodés ni stockés ; leurs références
+(source, position, pages, section, métadonnées) sont ajoutées à la liste
+'duplicates' du représentant.
+"""
+
+import zlib
+from dataclasses import dataclass, fields
+from typing import Dict, Hashable, List, Optional, Tuple
+import numpy as np
+
+# Nombre de fonctions de hachage de la signature et nombre de bandes du LSH
+# (16 bandes de 8 lignes : un couple de similarité 0,85 est comparé avec une probabilité de 99 %)
+NUM_PERM = 128
+BANDS = 16
+# Taille des n-grammes de mots comparés
+SHINGLE_WORDS = 3
+
+# Champs d'un chunk recopiés dans la référence d'un quasi-doublon
+REFERENCE_FIELDS = ('source', 'chunk_index', 'page_start', 'page_end', 'section', 'metadata')
+
+_PRIME = (1 << 61) - 1
+# Coefficients fixes : les signatures sont identiques d'une exécution à l'autre
+_random = np.random.RandomState(20240501)
+_A = _random.randint(1, 1 << 32, NUM_PERM, dtype=np.uint64)
+_B = _random.randint(0, 1 << 32, NUM_PERM, dtype=np.uint64)
+
+
+@dataclass
+class DedupStats:
+    """Compteurs de la déduplication"""
+    
+    chunks: int = 0
+    clusters: int = 0
+    duplicates: int = 0
+    
+    @property
+    def saved_ratio(self) -> float:
+        """Part des embeddings évités"""
+        return self.duplicates / self.chunks if self.chunks else 0.0
+    
+    def as_dict(self) -> Dict:
+        stats = {f.name: getattr(self, f.name) for f in fields(self)}
+        stats['saved_ratio'] = self.saved_ratio
+        return stats
+
+
+def shingle_hashes(text: str, size: int = SHINGLE_WORDS) -> np.ndarray:
+    """Empreintes (CRC32) des n-grammes de mots distincts d'un texte"""
+    words = text.split()
+    if len(words) <= size:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    return np.fromiter((zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+                       dtype=np.uint64, count=len(shingles))
+
+
+def minhash(text: str) -> np.ndarray:
+    """
+    Calcule la signature MinHash d'un texte
+    
+    Args:
+        text: Texte (pré-traité) du chunk
+    
+    Returns:
+        Tableau de NUM_PERM entiers (uint32)
+    """
+    hashes = shingle_hashes(text)
+    # (a * x + b) mod p tient sur 64 bits : a, b et x sont inférieurs à 2^32
+    values = ((_A[:, None] * hashes[None, :] + _B[:, None]) % _PRIME) & 0xFFFFFFFF
+    return values.min(axis=1).astype(np.uint32)
+
+
+class NearDuplicateIndex:
+    """Index LSH des représentants : retrouve le représentant d'un texte quasi-identique"""
+    
+    def __init__(self, threshold: float = 0.9, bands: int = BANDS):
+        """
+        Initialise l'index
+        
+        Args:
+            threshold: Similarité de Jaccard (estimée) minimale avec le représentant
+            bands: Nombre de bandes du LSH (diviseur de NUM_PERM)
+        """
+        if NUM_PERM % bands:
+            raise ValueError(f"Le nombre de bandes doit diviser {NUM_PERM}")
+        self.threshold = threshold
+        self.rows = NUM_PERM // bands
+        self.buckets = [{} for _ in range(bands)]
+        self.signatures = []
+        self.keys = []
+        # Représentants ayant au moins un quasi-doublon
+        self.clustered = set()
+        self.stats = DedupStats()
+    
+    def _bands(self, signature: np.ndarray) -> List[int]:
+        return [hash(signature[i:i + self.rows].tobytes()) for i in range(0, NUM_PERM, self.rows)]
+    
+    def add(self, text: str, key: Hashable) -> Optional[Hashable]:
+        """
+        Cherche le représentant d'un texte, ou l'enregistre comme nouveau représentant
+        
+        Args:
+            text: Texte (pré-traité) du chunk
+            key: Clé associée au chunk s'il devient représentant
+        
+        Returns:
+            Clé du représentant si le texte est un quasi-doublon, sinon None
+        """
+        self.stats.chunks += 1
+        signature = minhash(text)
+        bands = self._bands(signature)
+        
+        candidates = set()
+        for buckets, band in zip(self.buckets, bands):
+            candidates.update(buckets.get(band, ()))
+        
+        best, best_score = None, self.threshold
+        for candidate in candidates:
+            score = float(np.count_nonzero(self.signatures[candidate] == signature)) / NUM_PERM
+            if score >= best_score:
+                best, best_score = candidate, score
+        
+        if best is not None:
+            if best not in self.clustered:
+                self.clustered.add(best)
+                self.stats.clusters += 1
+            self.stats.duplicates += 1
+            return self.keys[best]
+        
+        position = len(self.signatures)
+        self.signatures.append(signature)
+        self.keys.append(key)
+        for buckets, band in zip(self.buckets, bands):
+            buckets.setdefault(band, []).append(position)
+        return None
+
+
+def member_reference(chunk: Dict) -> Dict:
+    """Référence d'un quasi-doublon conservée dans son représentant"""
+    return {name: chunk[name] for name in REFERENCE_FIELDS if name in chunk}
+
+
+def deduplicate_chunks(chunks: List[Dict], threshold: float = 0.9) -> Tuple[List[Dict], DedupStats]:
+    """
+    Regroupe les chunks quasi-identiques et ne conserve que leurs représentants
+    
+    Args:
+        chunks: Chunks avec 'preprocessed_content'
+        threshold: Similarité de Jaccard minimale pour regrouper deux chunks
+    
+    Returns:
+        Tuple (représentants, dans l'ordre d'origine, avec la liste 'duplicates' de
+        leurs quasi-doublons ; compteurs)
+    """
+    index = NearDuplicateIndex(threshold)
+    representatives = []
+    for chunk in chunks:
+        leader = index.add(chunk['preprocessed_content'], len(representatives))
+        if leader is None:
+            representatives.append(chunk)
+        else:
+            representatives[leader].setdefault('duplicates', []).append(member_reference(chunk))
+    return representatives, index.stats
+
+
+def format_stats(stats: DedupStats) -> str:
+    """Résumé de la déduplication pour l'affichage"""
+    return (f"🧬 Quasi-doublons: {stats.duplicates}/{stats.chunks} chunks regroupés dans "
+            f"{stats.clusters} groupes, {stats.saved_ratio:.1%} des embeddings évités")
@@ -1,11 +1,22 @@
-from sentence_transformers import SentenceTransformer
-from typing import List, Dict
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+from typing import Callable, List, Dict, Optional, Tuple
 from tqdm import tqdm
 from config import config
+from embedding_codec import encode_embedding
+from embedding_cache import EmbeddingCache
+from model_registry import get_model, get_tokenizer
+from query_cache import QueryEmbeddingCache
 
-# Charger le modèle multilingue optimisé pour le français
-print(f"Chargement du modèle d'embedding: {config.embedding_model}")
-model = SentenceTransformer(config.embedding_model)
+# Cache des embeddings de requêtes, partagé par rag et search
+query_cache = QueryEmbeddingCache(config.query_cache_size, config.query_cache_ttl)
+
+def embedding_dimension() -> int:
+    """Retourne la dimension des embeddings du modèle configuré"""
+    return get_model().get_sentence_embedding_dimension()
 
 def get_embedding(text: str) -> List[float]:
     """
@@ -13,40 +24,289 @@ def get_embedding(text: str) -> List[float]:
     
     Args:
         text: Le texte à vectoriser
-        
+    
+    Returns:
+        Liste des valeurs de l'embedding
+    """
+    return get_model().encode(text).tolist()
+
+def get_query_embedding(query: str) -> List[float]:
+    """
+    Génère l'embedding d'une requête utilisateur en passant par le cache LRU
+    
+    Args:
+        query: La requête à vectoriser
+    
     Returns:
         Liste des valeurs de l'embedding
     """
-    return model.encode(text).tolist()
+    model_key = f"{config.embedding_model}:{config.embedding_backend}"
+    return query_cache.get_or_compute(query, model_key, lambda text: get_model().encode(text)).tolist()
+
+def query_cache_stats() -> Dict:
+    """Retourne les compteurs du cache des embeddings de requêtes"""
+    return query_cache.stats()
+
+def token_lengths(texts: List[str]) -> List[int]:
+    """
+    Calcule la longueur en tokens de chaque texte
+    
+    La tokenisation s'arrête un token au-delà de la fenêtre du modèle : une
+    longueur supérieure à model_token_window() signale un texte tronqué.
+    
+    Args:
+        texts: Textes à mesurer
+    
+    Returns:
+        Nombre de tokens de chaque texte
+    """
+    encoded = get_tokenizer()[0](
+        texts,
+        add_special_tokens=False,
+        truncation=True,
+        max_length=model_token_window() + 1,
+        return_attention_mask=False,
+        return_token_type_ids=False
+    )
+    return [len(ids) for ids in encoded['input_ids']]
+
+def model_token_window() -> int:
+    """Nombre de tokens de texte que le modèle encode (fenêtre moins les tokens spéciaux)"""
+    # Tokenizer seul : le découpage en tokens ne charge pas le modèle
+    tokenizer, max_seq_length = get_tokenizer()
+    return max_seq_length - tokenizer.num_special_tokens_to_add()
+
+def token_offsets(texts: List[str]) -> List[List[Tuple[int, int]]]:
+    """
+    Tokenise des textes sans troncature et retourne la position de chaque token
+    
+    Args:
+        texts: Textes à tokeniser (un seul appel au tokenizer rapide)
+    
+    Returns:
+        Pour chaque texte, liste des couples (début, fin) de ses tokens dans le texte
+    """
+    tokenizer = get_tokenizer()[0]
+    if not tokenizer.is_fast:
+        raise ValueError("Le découpage en tokens nécessite un tokenizer rapide (offsets)")
+    encoded = tokenizer(
+        texts,
+        add_special_tokens=False,
+        return_offsets_mapping=True,
+        return_attention_mask=False,
+        return_token_type_ids=False,
+        verbose=False
+    )
+    return encoded['offset_mapping']
 
-def process_chunks_embeddings(chunks: List[Dict]) -> List[Dict]:
+def _length_sorted_batches(lengths: List[int], batch_size: int) -> List[np.ndarray]:
+    """Découpe les positions des textes en lots triés par longueur (tokens ou caractères)"""
+    order = np.argsort(lengths, kind='stable')
+    return [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+
+def _record_truncation(lengths: List[int], stats: Optional[Dict], window: Optional[int] = None):
+    """Ajoute aux compteurs les textes encodés et ceux qui dépassent la fenêtre du modèle"""
+    if stats is None:
+        return
+    window = window or model_token_window()
+    stats['window'] = window
+    stats['encoded'] = stats.get('encoded', 0) + len(lengths)
+    stats['truncated'] = stats.get('truncated', 0) + sum(1 for length in lengths if length > window)
+
+def encode_texts(texts: List[str], batch_size: Optional[int] = None, show_progress: bool = True,
+                 on_batch: Optional[Callable[[np.ndarray, np.ndarray], None]] = None,
+                 stats: Optional[Dict] = None) -> np.ndarray:
+    """
+    Encode une liste de textes par lots de longueurs homogènes
+    
+    Les textes sont triés par longueur en tokens pour que chaque lot contienne
+    des séquences de tailles proches (peu de padding), puis les embeddings sont
+    replacés dans l'ordre d'origine.
+    
+    Args:
+        texts: Textes à vectoriser
+        batch_size: Taille des lots (par défaut config.embedding_batch_size)
+        show_progress: Afficher une barre de progression
+        on_batch: Appelée avec (positions, embeddings) après chaque lot
+        stats: Compteurs complétés (encoded, truncated, window), mesurés sur les longueurs du tri
+    
+    Returns:
+        Matrice (len(texts), dimension) des embeddings, dans l'ordre des textes
+    """
+    batch_size = batch_size or config.embedding_batch_size
+    embeddings = np.empty((len(texts), embedding_dimension()), dtype=np.float32)
+    if not texts:
+        return embeddings
+    
+    lengths = token_lengths(texts)
+    _record_truncation(lengths, stats)
+    batches = _length_sorted_batches(lengths, batch_size)
+    for indices in tqdm(batches, desc="Embedding", unit="lot", disable=not show_progress):
+        embeddings[indices] = _encode_batch([texts[i] for i in indices])
+        if on_batch is not None:
+            on_batch(indices, embeddings[indices])
+    
+    return embeddings
+
+def _encode_batch(texts: List[str]) -> np.ndarray:
+    """Encode un lot de textes en un seul appel au modèle"""
+    return get_model().encode(texts, batch_size=len(texts), convert_to_numpy=True, show_progress_bar=False)
+
+def _encode_measured_batch(texts: List[str]) -> Tuple[np.ndarray, List[int], int]:
+    """Encode un lot dans un processus d'encodage et mesure la longueur en tokens de ses textes"""
+    return _encode_batch(texts), token_lengths(texts), model_token_window()
+
+def _init_worker(torch_threads: int):
+    """Initialise un processus d'encodage : threads torch bornés et modèle chargé"""
+    import torch
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    torch.set_num_threads(torch_threads)
+    # Charger le modèle du processus avant le premier lot
+    get_model()
+
+def encode_texts_parallel(texts: List[str], workers: int, batch_size: Optional[int] = None,
+                          torch_threads: Optional[int] = None, show_progress: bool = True,
+                          on_batch: Optional[Callable[[np.ndarray, np.ndarray], None]] = None,
+                          max_restarts: int = 2, stats: Optional[Dict] = None) -> np.ndarray:
+    """
+    Encode une liste de textes en répartissant les lots sur plusieurs processus
+    
+    Chaque processus charge son propre modèle avec un nombre de threads torch
+    contrôlé ; le processus parent n'en charge aucun : les textes sont triés
+    par longueur en caractères et la dimension est celle du premier lot
+    terminé. Les lots terminés sont conservés (et transmis à on_batch dès leur
+    arrivée) : si un processus plante, seuls les lots non terminés sont
+    resoumis à un nouveau pool.
+    
+    Args:
+        texts: Textes à vectoriser
+        workers: Nombre de processus d'encodage
+        batch_size: Taille des lots (par défaut config.embedding_batch_size)
+        torch_threads: Threads torch par processus (défaut: cœurs disponibles / workers)
+        show_progress: Afficher une barre de progression
+        on_batch: Appelée avec (positions, embeddings) après chaque lot terminé
+        max_restarts: Nombre de recréations du pool après un plantage
+        stats: Compteurs complétés (encoded, truncated, window), mesurés par les processus d'encodage
+    
+    Returns:
+        Matrice (len(texts), dimension) des embeddings, dans l'ordre des textes
+        (matrice vide sans colonne si texts est vide)
+    """
+    batch_size = batch_size or config.embedding_batch_size
+    torch_threads = torch_threads or config.embedding_torch_threads or max(1, (os.cpu_count() or 1) // workers)
+    if not texts:
+        return np.empty((0, 0), dtype=np.float32)
+    
+    # La longueur en caractères suffit à grouper des séquences de tailles proches
+    batches = _length_sorted_batches([len(text) for text in texts], batch_size)
+    embeddings = None
+    pending = set(range(len(batches)))
+    context = multiprocessing.get_context("spawn")
+    
+    with tqdm(total=len(batches), desc=f"Embedding ({workers} workers)", unit="lot",
+              disable=not show_progress) as progress:
+        for attempt in range(max_restarts + 1):
+            try:
+                with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                         initializer=_init_worker, initargs=(torch_threads,)) as pool:
+                    futures = {
+                        pool.submit(_encode_measured_batch, [texts[i] for i in batches[b]]): b
+                        for b in sorted(pending)
+                    }
+                    for future in as_completed(futures):
+                        b = futures[future]
+                        indices = batches[b]
+                        vectors, lengths, window = future.result()
+                        if embeddings is None:
+                            embeddings = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+                        embeddings[indices] = vectors
+                        _record_truncation(lengths, stats, window)
+                        pending.discard(b)
+                        progress.update(1)
+                        if on_batch is not None:
+                            on_batch(indices, embeddings[indices])
+                break
+            except BrokenProcessPool as e:
+                print(f"⚠️  Processus d'encodage interrompu ({e}), "
+                      f"{len(pending)} lot(s) restant(s) sur {len(batches)}")
+                if attempt == max_restarts:
+                    raise RuntimeError(
+                        f"Encodage abandonné après {max_restarts + 1} tentatives: "
+                        f"{len(batches) - len(pending)} lot(s) terminé(s), {len(pending)} perdu(s)"
+                    ) from e
+    
+    return embeddings
+
+def process_chunks_embeddings(chunks: List[Dict], cache: Optional[EmbeddingCache] = None,
+                              workers: Optional[int] = None, show_progress: bool = True,
+                              stats: Optional[Dict] = None) -> List[Dict]:
     """
     Génère les embeddings pour tous les chunks en utilisant le contenu prétraité
     mais en conservant le contenu original pour la base de données
     
     Args:
         chunks: Liste des chunks de documents avec 'content' (original) et 'preprocessed_content'
-        
+        cache: Cache persistant consulté avant l'encodage (optionnel)
+        workers: Nombre de processus d'encodage (par défaut config.embedding_workers)
+        show_progress: Afficher la progression (désactivé par le mode streaming, lot par lot)
+        stats: Compteurs complétés pour les textes réellement encodés (encoded, truncated, window)
+    
     Returns:
         Liste des chunks avec leurs embeddings et le contenu original dans 'content'
     """
-    print(f"Génération des embeddings pour {len(chunks)} chunks...")
+    workers = workers or config.embedding_workers
+    if show_progress:
+        print(f"Génération des embeddings pour {len(chunks)} chunks "
+              f"(lots de {config.embedding_batch_size}, {workers} processus)...")
+    
+    # Utiliser le contenu prétraité pour générer les embeddings
+    texts = [chunk.get('preprocessed_content', chunk['content']) for chunk in chunks]
+    
+    # Ne ré-encoder que les textes absents du cache
+    cached = {}
+    if cache is not None:
+        cached = cache.get_many(texts)
+    missing = [i for i in range(len(texts)) if i not in cached]
+    if cache is not None and show_progress:
+        print(f"Cache d'embeddings: {len(cached)} trouvés, {len(missing)} à encoder")
+    
+    encoded = None
+    if missing:
+        missing_texts = [texts[i] for i in missing]
+        
+        # Les lots terminés sont mis en cache au fil de l'eau : un arrêt en cours
+        # de route ne fait pas perdre le travail déjà effectué
+        on_batch = None
+        if cache is not None:
+            def on_batch(indices, vectors):
+                cache.put_many([(missing_texts[i], vector) for i, vector in zip(indices, vectors)])
+        
+        if workers > 1:
+            encoded = encode_texts_parallel(missing_texts, workers, show_progress=show_progress,
+                                            on_batch=on_batch, stats=stats)
+        else:
+            encoded = encode_texts(missing_texts, show_progress=show_progress, on_batch=on_batch,
+                                   stats=stats)
+    
+    # Dimension prise des vecteurs obtenus : un cache complet ne charge pas le modèle
+    dimension = encoded.shape[1] if encoded is not None else len(next(iter(cached.values()), ()))
+    embeddings = np.empty((len(texts), dimension), dtype=np.float32)
+    for i, vector in cached.items():
+        embeddings[i] = vector
+    if encoded is not None:
+        embeddings[missing] = encoded
     
     processed_chunks = []
     
-    for chunk in tqdm(chunks, desc="Embedding"):
-        # Récupérer le contenu original et prétraité avant toute modification
+    for chunk, embedding in zip(chunks, embeddings):
+        # Récupérer le contenu original avant toute modification
         original_content = chunk.get('original_content', chunk['content'])
-        preprocessed_content = chunk.get('preprocessed_content', chunk['content'])
-        
-        # Utiliser le contenu prétraité pour générer l'embedding
-        embedding = get_embedding(preprocessed_content)
         
         # Créer le chunk final avec le contenu original et l'embedding
         chunk_with_embedding = chunk.copy()
         # S'assurer que 'content' contient le texte original NON prétraité
         chunk_with_embedding['content'] = original_content
-        chunk_with_embedding['embedding'] = embedding
+        chunk_with_embedding['embedding'] = encode_embedding(embedding)
         
         # Nettoyer les champs temporaires
         if 'preprocessed_content' in chunk_with_embedding:
@@ -56,5 +316,6 @@ def process_chunks_embeddings(chunks: List[Dict]) -> List[Dict]:
         
         processed_chunks.append(chunk_with_embedding)
     
-    print(f"✓ {len(processed_chunks)} embeddings générés")
-    return processed_chunks
\ No newline at end of file
+    if show_progress:
+        print(f"✓ {len(processed_chunks)} embeddings générés")
+    return processed_chunks
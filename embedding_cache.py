@@ -0,0 +1,188 @@
+"""
+Cache persistant des embeddings, adressé par contenu
+
+Chaque entrée est indexée par le hash de (modèle, version du pré-traitement,
+texte prétraité) : une relance de la pipeline ne ré-encode que les chunks dont
+le texte a réellement changé. Les vecteurs sont stockés en float32 compact
+(même format binaire que embedding_codec) dans une base SQLite, avec une
+éviction LRU lorsque la taille maximale est dépassée.
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+import numpy as np
+from typing import Dict, List, Sequence, Tuple
+from embedding_codec import decode_embedding, encode_embedding
+
+# Nombre maximal de paramètres par requête SQLite
+_SQL_CHUNK = 500
+
+
+class EmbeddingCache:
+    """Cache SQLite d'embeddings avec éviction LRU par taille"""
+    
+    def __init__(self, path: str, model_name: str, preprocessing_version: str, max_mb: int = 1024):
+        """
+        Ouvre (ou crée) le cache
+        
+        Args:
+            path: Chemin du fichier SQLite
+            model_name: Nom du modèle d'embedding (fait partie de la clé)
+            preprocessing_version: Version du pré-traitement (fait partie de la clé)
+            max_mb: Taille maximale du cache en mégaoctets
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self.path = path
+        self.max_bytes = max_mb * 1024 * 1024
+        self._prefix = f"{model_name}\0{preprocessing_version}\0".encode("utf-8")
+        
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON embeddings(last_used)")
+        self.connection.commit()
+        
+        # Taille cumulée tenue à jour en mémoire pour éviter un SUM à chaque insertion
+        self._total_bytes = self.connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM embeddings"
+        ).fetchone()[0]
+    
+    def key(self, text: str) -> str:
+        """Calcule la clé de cache d'un texte prétraité"""
+        return hashlib.sha256(self._prefix + text.encode("utf-8")).hexdigest()
+    
+    def _existing_keys(self, keys: Sequence[str]) -> set:
+        """Retourne les clés déjà présentes dans le cache"""
+        existing = set()
+        for start in range(0, len(keys), _SQL_CHUNK):
+            batch = keys[start:start + _SQL_CHUNK]
+            placeholders = ",".join("?" * len(batch))
+            rows = self.connection.execute(
+                f"SELECT key FROM embeddings WHERE key IN ({placeholders})", batch
+            )
+            existing.update(key for (key,) in rows)
+        return existing
+    
+    def get_many(self, texts: Sequence[str]) -> Dict[int, np.ndarray]:
+        """
+        Recherche les embeddings de plusieurs textes
+        
+        Args:
+            texts: Textes prétraités
+        
+        Returns:
+            Dictionnaire position -> embedding pour les textes présents dans le cache
+        """
+        keys = [self.key(text) for text in texts]
+        found = {}
+        
+        unique_keys = list(dict.fromkeys(keys))
+        for start in range(0, len(unique_keys), _SQL_CHUNK):
+            batch = unique_keys[start:start + _SQL_CHUNK]
+            placeholders = ",".join("?" * len(batch))
+            rows = self.connection.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+            )
+            found.update({key: decode_embedding(vector) for key, vector in rows})
+        
+        # Rafraîchir la date d'utilisation des entrées trouvées (politique LRU)
+        if found:
+            now = time.time()
+            self.connection.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                [(now, key) for key in found]
+            )
+            self.connection.commit()
+        
+        results = {i: found[key] for i, key in enumerate(keys) if key in found}
+        self.hits += len(results)
+        self.misses += len(texts) - len(results)
+        return results
+    
+    def put_many(self, items: List[Tuple[str, np.ndarray]]):
+        """
+        Ajoute des embeddings au cache puis applique l'éviction si nécessaire
+        
+        Args:
+            items: Couples (texte prétraité, embedding)
+        """
+        if not items:
+            return
+        
+        now = time.time()
+        rows = {}
+        for text, vector in items:
+            key = self.key(text)
+            blob = bytes(encode_embedding(vector, "float32"))
+            rows[key] = (key, blob, len(key) + len(blob), now)
+        
+        # Les clés étant adressées par contenu, une entrée existante est déjà à jour
+        for key in self._existing_keys(list(rows)):
+            del rows[key]
+        if not rows:
+            return
+        
+        self.connection.executemany(
+            "INSERT INTO embeddings (key, vector, size, last_used) VALUES (?, ?, ?, ?)",
+            rows.values()
+        )
+        self.connection.commit()
+        self._total_bytes += sum(row[2] for row in rows.values())
+        self.evict()
+    
+    def total_bytes(self) -> int:
+        """Taille cumulée des entrées du cache"""
+        return self._total_bytes
+    
+    def evict(self):
+        """Supprime les entrées les moins récemment utilisées au-delà de la taille maximale"""
+        total = self._total_bytes
+        if total <= self.max_bytes:
+            return
+        
+        # Descendre à 90% de la limite pour ne pas évincer à chaque insertion
+        target = int(self.max_bytes * 0.9)
+        to_free = total - target
+        freed = 0
+        removed = []
+        
+        for key, size in self.connection.execute("SELECT key, size FROM embeddings ORDER BY last_used ASC"):
+            removed.append((key,))
+            freed += size
+            if freed >= to_free:
+                break
+        
+        self.connection.executemany("DELETE FROM embeddings WHERE key = ?", removed)
+        self.connection.commit()
+        self.evicted += len(removed)
+        self._total_bytes -= freed
+    
+    def stats(self) -> Dict:
+        """Retourne les statistiques du cache"""
+        lookups = self.hits + self.misses
+        entries = self.connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evicted': self.evicted,
+            'entries': entries,
+            'size_mb': self.total_bytes() / (1024 * 1024),
+            'path': self.path
+        }
+    
+    def close(self):
+        """Ferme la base SQLite"""
+        self.connection.close()
@@ -0,0 +1,84 @@
+"""
+Encodage des embeddings pour le stockage MongoDB
+
+Deux représentations coexistent dans une collection :
+  - "array" : tableau BSON de doubles (format historique) ;
+  - "float32" / "float16" : blob Binary little-endian précédé d'un en-tête
+    de 8 octets (magic, version, type, dimension).
+
+Les lecteurs passent par decode_embedding, qui accepte les deux formats et
+décode les blobs sans copie via np.frombuffer.
+"""
+
+import struct
+import numpy as np
+from typing import List, Optional, Union
+from bson.binary import Binary
+from config import config
+
+# Formats de stockage disponibles
+STORAGE_FORMATS = ("array", "float32", "float16")
+
+# Sous-type BSON "défini par l'utilisateur" pour les blobs d'embeddings
+BINARY_SUBTYPE = 0x80
+
+# En-tête : magic (2 octets), version (1), code du type (1), dimension (uint32)
+HEADER = struct.Struct("<2sBBI")
+MAGIC = b"EV"
+VERSION = 1
+
+_DTYPE_CODES = {"float32": 1, "float16": 2}
+_DTYPES = {1: np.dtype("<f4"), 2: np.dtype("<f2")}
+
+
+def encode_embedding(vector, storage: Optional[str] = None) -> Union[List[float], Binary]:
+    """
+    Encode un embedding selon le format de stockage demandé
+    
+    Args:
+        vector: Vecteur (liste ou tableau numpy)
+        storage: Format de stockage (par défaut config.embedding_storage)
+    
+    Returns:
+        Liste de flottants pour "array", blob Binary sinon
+    """
+    storage = storage or config.embedding_storage
+    if storage not in STORAGE_FORMATS:
+        raise ValueError(f"Format de stockage inconnu: {storage} (attendu: {', '.join(STORAGE_FORMATS)})")
+    
+    if storage == "array":
+        return np.asarray(vector, dtype=np.float64).ravel().tolist()
+    
+    code = _DTYPE_CODES[storage]
+    data = np.asarray(vector, dtype=_DTYPES[code]).ravel()
+    return Binary(HEADER.pack(MAGIC, VERSION, code, data.shape[0]) + data.tobytes(), BINARY_SUBTYPE)
+
+
+def decode_embedding(value) -> np.ndarray:
+    """
+    Décode un embedding stocké, quel que soit son format
+    
+    Args:
+        value: Tableau BSON (liste) ou blob Binary produit par encode_embedding
+    
+    Returns:
+        Vecteur numpy (vue en lecture seule sur le blob pour les formats binaires)
+    """
+    if isinstance(value, bytes):
+        magic, version, code, dim = HEADER.unpack_from(value)
+        if magic != MAGIC or version != VERSION or code not in _DTYPES:
+            raise ValueError("Blob d'embedding invalide ou de version non supportée")
+        return np.frombuffer(value, dtype=_DTYPES[code], count=dim, offset=HEADER.size)
+    
+    return np.asarray(value, dtype=np.float32)
+
+
+def storage_format(value) -> str:
+    """Retourne le format de stockage d'un embedding lu depuis MongoDB"""
+    if isinstance(value, bytes):
+        _, _, code, _ = HEADER.unpack_from(value)
+        name = next((name for name, c in _DTYPE_CODES.items() if c == code), None)
+        if name is None:
+            raise ValueError(f"Code de type d'embedding inconnu: {code}")
+        return name
+    return "array"
@@ -0,0 +1,171 @@
+"""
+Lecture incrémentale des exports JSON d'appels d'offres (all_aos.json)
+
+L'export a la forme [{"content": [enregistrement, ...]}, ...] et peut peser
+plusieurs centaines de Mo. Plutôt que json.load sur tout le fichier, le lecteur
+parcourt la structure englobante caractère par caractère et ne décode d'un bloc
+(json.JSONDecoder.raw_decode, implémenté en C) que les valeurs feuilles : la
+mémoire utilisée est de l'ordre d'un enregistrement, pas du fichier.
+
+Les tableaux "content" sont parcourus récursivement ; un objet sans tableau
+"content" est un enregistrement.
+"""
+
+import json
+import re
+from typing import Any, Dict, Iterator
+
+# Taille minimale des lectures (en caractères)
+READ_SIZE = 1 << 16
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# Caractères pouvant prolonger un nombre ("0." ou "1e" en fin de tampon sont tronqués)
+_NUMBER_TAIL = re.compile(r"[0-9.eE+\-]*")
+
+
+class _JsonStreamReader:
+    """Tampon glissant sur un fichier JSON avec décodage des valeurs à la demande"""
+    
+    def __init__(self, f, read_size: int = READ_SIZE):
+        self.f = f
+        self.read_size = read_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+    
+    def _fill(self) -> bool:
+        """Lit la suite du fichier ; la taille lue double avec le tampon (coût amorti linéaire)"""
+        if self.eof:
+            return False
+        
+        data = self.f.read(max(self.read_size, len(self.buffer) - self.pos))
+        if not data:
+            self.eof = True
+            return False
+        
+        self.buffer = self.buffer[self.pos:] + data
+        self.pos = 0
+        return True
+    
+    def peek(self) -> str:
+        """Retourne le prochain caractère significatif sans le consommer ('' en fin de fichier)"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+    
+    def expect(self, char: str):
+        """Consomme le caractère attendu"""
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"JSON invalide : '{char}' attendu, '{found}' trouvé (position {self.pos})")
+        self.pos += 1
+    
+    def decode_value(self) -> Any:
+        """Décode la valeur complète qui commence à la position courante"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # Valeur coupée par la fin du tampon
+                if self._fill():
+                    continue
+                raise
+            # Un nombre qui touche la fin du tampon peut être tronqué : relire avant de conclure
+            if (isinstance(value, (int, float)) and _NUMBER_TAIL.match(self.buffer, end).end() == len(self.buffer)
+                    and self._fill()):
+                continue
+            self.pos = end
+            return value
+    
+    def walk(self) -> Iterator[Dict]:
+        """Produit les enregistrements du document"""
+        first = self.peek()
+        if first == "[":
+            yield from self._walk_array(stream_objects=True)
+        elif first == "{":
+            yield from self._walk_object()
+        elif first:
+            raise ValueError(f"JSON invalide : tableau ou objet attendu, '{first}' trouvé")
+    
+    def _walk_array(self, stream_objects: bool) -> Iterator[Dict]:
+        """
+        Parcourt un tableau
+        
+        Les objets de premier niveau sont parcourus champ par champ (ce sont les
+        conteneurs) ; les éléments des tableaux "content" sont décodés d'un bloc.
+        """
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        
+        while True:
+            if stream_objects and self.peek() == "{":
+                yield from self._walk_object()
+            else:
+                yield from _records_in(self.decode_value())
+            
+            if self.peek() == ",":
+                self.pos += 1
+            else:
+                self.expect("]")
+                return
+    
+    def _walk_object(self) -> Iterator[Dict]:
+        """Parcourt un objet : conteneur si son champ "content" est un tableau, enregistrement sinon"""
+        self.expect("{")
+        fields = {}
+        container = False
+        
+        if self.peek() == "}":
+            self.pos += 1
+        else:
+            while True:
+                key = self.decode_value()
+                self.expect(":")
+                
+                if key == "content" and self.peek() == "[":
+                    container = True
+                    yield from self._walk_array(stream_objects=False)
+                else:
+                    fields[key] = self.decode_value()
+                
+                if self.peek() == ",":
+                    self.pos += 1
+                else:
+                    self.expect("}")
+                    break
+        
+        if not container and fields:
+            yield fields
+
+
+def _records_in(value: Any) -> Iterator[Dict]:
+    """Enregistrements contenus dans une valeur déjà décodée (tableaux "content" imbriqués)"""
+    if not isinstance(value, dict):
+        return
+    if isinstance(value.get("content"), list):
+        for item in value["content"]:
+            yield from _records_in(item)
+    else:
+        yield value
+
+
+def iter_json_records(path: str, read_size: int = READ_SIZE) -> Iterator[Dict]:
+    """
+    Parcourt les enregistrements d'un export JSON sans le charger entièrement
+    
+    Args:
+        path: Chemin du fichier JSON
+        read_size: Taille minimale des lectures en caractères
+    
+    Yields:
+        Enregistrements (dictionnaires), dans l'ordre du fichier
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        yield from _JsonStreamReader(f, read_size).walk()
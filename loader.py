@@ -1,110 +1,733 @@
 import os
+import time
+import multiprocessing
+import hashlib
 import fitz
-import markdown
 import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Tuple
 from config import config
+from text_cache import TextCache, PAGE_SEPARATOR
+from json_stream import iter_json_records
+from chunker import PAGE_JOIN
+from boilerplate import CleanupStats, clean_pages, format_stats as format_cleanup_stats
+from markdown_text import markdown_to_text, MARKDOWN_TEXT_VERSION
+
+# Version du code d'extraction : à incrémenter quand le texte produit change
+# (invalide le cache disque du texte extrait)
+EXTRACTION_VERSION = "3"
+
+_text_cache = None
+
+def _pdf_page_texts(doc, first_page: int = 1, last_page: Optional[int] = None) -> Iterator[str]:
+    """
+    Extrait paresseusement le texte des pages d'un PDF ouvert
+    
+    Les pages sont chargées une à une : seule la page courante est en mémoire.
+    
+    Args:
+        doc: Document PyMuPDF
+        first_page: Première page (numérotée à partir de 1)
+        last_page: Dernière page incluse (défaut: dernière page du document)
+    
+    Yields:
+        Texte de chaque page
+    """
+    last_page = doc.page_count if last_page is None else min(last_page, doc.page_count)
+    for number in range(first_page - 1, last_page):
+        # Le saut de page est réservé à la séparation des pages
+        yield doc.load_page(number).get_text().replace(PAGE_SEPARATOR, "\n")
+
+def _extract_pdf(data: bytes) -> str:
+    """Extrait le texte de toutes les pages d'un PDF, séparées par PAGE_SEPARATOR"""
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        return PAGE_SEPARATOR.join(_pdf_page_texts(doc))
+
+def _split_pdf_text(text: str) -> Tuple[str, List[int]]:
+    """Convertit le texte extrait d'un PDF en contenu de document et positions de début des pages"""
+    page_starts = [0]
+    position = text.find(PAGE_SEPARATOR)
+    while position != -1:
+        page_starts.append(position + 1)
+        position = text.find(PAGE_SEPARATOR, position + 1)
+    return text.replace(PAGE_SEPARATOR, PAGE_JOIN), page_starts
+
+def _cleanup_chunk_size() -> Optional[int]:
+    """Taille des chunks pour le comptage du nettoyage (pas de comptage en mode tokens)"""
+    return config.chunk_size if config.chunk_unit == "chars" else None
+
+def _clean_pdf_text(text: str, stats: Optional[CleanupStats] = None) -> str:
+    """Retire les en-têtes/pieds de page répétés et les césures du texte d'un PDF (voir boilerplate.py)"""
+    if not config.pdf_cleanup:
+        return text
+    # Chunks comptés seulement si les compteurs sont demandés
+    chunk_size = _cleanup_chunk_size() if stats is not None else None
+    pages = clean_pages(text.split(PAGE_SEPARATOR), stats, chunk_size, config.chunk_overlap)
+    return PAGE_SEPARATOR.join(pages)
+
+def _extract_markdown(data: bytes) -> str:
+    """Convertit un fichier markdown en texte brut ; le texte et ses titres sont sérialisés en JSON"""
+    text, headings = markdown_to_text(data.decode("utf-8"))
+    return json.dumps({"text": text, "headings": headings}, ensure_ascii=False)
+
+def _markdown_document(extracted: str) -> Tuple[str, List[Dict]]:
+    """Texte brut et titres {level, title, offset} d'un fichier markdown extrait"""
+    document = json.loads(extracted)
+    return document["text"], document["headings"]
+
+# Extracteurs de texte par extension (résultats mis en cache sur disque)
+TEXT_EXTRACTORS = {
+    ".pdf": _extract_pdf,
+    ".md": _extract_markdown
+}
+
+def extraction_version_tag() -> str:
+    """Étiquette des versions dont dépend le texte extrait"""
+    return (f"extraction={EXTRACTION_VERSION};pymupdf={fitz.VersionBind};"
+            f"markdown_text={MARKDOWN_TEXT_VERSION}")
+
+def get_text_cache() -> Optional[TextCache]:
+    """Retourne le cache du texte extrait (None s'il est désactivé)"""
+    global _text_cache
+    
+    if not config.text_cache_enabled:
+        return None
+    
+    if _text_cache is None:
+        _text_cache = TextCache(config.text_cache_dir, extraction_version_tag())
+        _text_cache.prune_stale()
+    return _text_cache
+
+def _load_text_cached(path):
+    """Charge un fichier selon son extension (pages des PDF séparées, texte et titres des markdown en JSON)"""
+    ext = os.path.splitext(path)[-1]
+    
+    extract = TEXT_EXTRACTORS.get(ext)
+    if extract is not None:
+        with open(path, "rb") as f:
+            data = f.read()
+        
+        cache = get_text_cache()
+        if cache is None:
+            return extract(data), False
+        return cache.get_or_extract(data, ext, extract)
+    
+    if ext == ".json":
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f), False
+    
+    return None, False
+
+def load_file_cached(path):
+    """
+    Charge un fichier selon son extension, en passant par le cache du texte extrait
+    
+    Args:
+        path: Chemin du fichier
+    
+    Returns:
+        Tuple (contenu, True si le texte provient du cache)
+    """
+    content, cached = _load_text_cached(path)
+    if path.endswith(".pdf") and content is not None:
+        content = _split_pdf_text(_clean_pdf_text(content))[0]
+    elif path.endswith(".md") and content is not None:
+        content = _markdown_document(content)[0]
+    return content, cached
 
 def load_file(path):
     """Charge un fichier selon son extension"""
-    ext = os.path.splitext(path)[-1]
+    return load_file_cached(path)[0]
+
+def iter_pdf_pages(path: str) -> Iterator[str]:
+    """
+    Produit le texte des pages d'un PDF une à une, sans charger tout le document
+    
+    Passe par le cache du texte extrait : une entrée existante est relue page par
+    page, sinon elle est écrite au fur et à mesure de l'extraction.
+    
+    Args:
+        path: Chemin du PDF
+    
+    Yields:
+        Texte de chaque page
+    """
+    cache = get_text_cache()
+    if cache is None:
+        with fitz.open(path) as doc:
+            yield from _pdf_page_texts(doc)
+        return
+    
+    key = cache.key_from_digest(file_hash(path), ".pdf")
+    pages = cache.iter_pages(key)
+    if pages is not None:
+        yield from pages
+        return
+    
+    with fitz.open(path) as doc, cache.page_writer(key) as write:
+        for text in _pdf_page_texts(doc):
+            write(text)
+            yield text
+
+def load_pdf_pages(path: str, first_page: int, last_page: Optional[int] = None) -> List[str]:
+    """
+    Ré-extrait une plage de pages d'un PDF, sans passer par le cache
+    
+    Utile pour examiner un chunk suspect à partir de sa source et de ses
+    champs page_start/page_end.
+    
+    Args:
+        path: Chemin du PDF
+        first_page: Première page (numérotée à partir de 1)
+        last_page: Dernière page incluse (défaut: first_page)
+    
+    Returns:
+        Texte des pages demandées
+    """
+    with fitz.open(path) as doc:
+        return list(_pdf_page_texts(doc, first_page, last_page or first_page))
+
+def file_hash(path: str) -> str:
+    """
+    Calcule l'empreinte SHA-256 du contenu d'un fichier
+    
+    Args:
+        path: Chemin du fichier
+    
+    Returns:
+        Empreinte hexadécimale
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _extract_file(path: str) -> Dict:
+    """
+    Extrait le contenu d'un fichier en isolant les erreurs
+    
+    Exécutée dans les processus du pool : une exception (PDF corrompu, encodage
+    invalide...) est renvoyée dans le résultat au lieu d'interrompre le chargement.
+    
+    Args:
+        path: Chemin du fichier
+    
+    Returns:
+        Dictionnaire {source, content, page_starts, headings, seconds, cached, cleanup, error}
+    """
+    start = time.perf_counter()
+    page_starts = None
+    headings = None
+    cleanup = None
+    try:
+        (content, cached), error = _load_text_cached(path), None
+        if path.endswith(".md") and content is not None:
+            content, headings = _markdown_document(content)
+        elif path.endswith(".pdf") and content is not None:
+            cleanup = CleanupStats() if config.pdf_cleanup else None
+            content, page_starts = _split_pdf_text(_clean_pdf_text(content, cleanup))
+    except Exception as e:
+        content, cached, error = None, False, f"{type(e).__name__}: {e}"
+    return {
+        "source": path,
+        "content": content,
+        "page_starts": page_starts,
+        "headings": headings,
+        "seconds": time.perf_counter() - start,
+        "cached": cached,
+        "cleanup": cleanup,
+        "error": error
+    }
+
+def _extract_in_pool(paths: List[str], workers: int) -> Dict[str, Dict]:
+    """Extrait des fichiers dans un pool de processus (fichiers perdus si le pool casse)"""
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_extract_file, path): path for path in paths}
+        for future in as_completed(futures):
+            try:
+                results[futures[future]] = future.result()
+            except BrokenProcessPool:
+                pass
+    return results
+
+def _extract_isolated(path: str) -> Dict:
+    """Extrait un fichier seul dans un processus dédié (reprise après un crash du pool)"""
+    result = _extract_in_pool([path], 1).get(path)
+    if result is None:
+        result = {
+            "source": path,
+            "content": None,
+            "page_starts": None,
+            "headings": None,
+            "seconds": 0.0,
+            "cached": False,
+            "cleanup": None,
+            "error": "Le processus d'extraction s'est arrêté brutalement"
+        }
+    return result
+
+def _resolve_workers(workers: Optional[int], file_count: int) -> int:
+    """Nombre effectif de processus d'extraction"""
+    if workers is None:
+        workers = config.loader_workers
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return min(workers, file_count)
+
+def extract_files(paths: List[str], workers: Optional[int] = None) -> List[Dict]:
+    """
+    Extrait le contenu d'une liste de fichiers, en parallèle si demandé
+    
+    L'ordre des résultats suit celui de `paths` quel que soit l'ordre de fin des
+    processus. Si un processus meurt (crash natif de PyMuPDF), les fichiers non
+    terminés sont repris chacun dans un pool dédié afin d'isoler le coupable.
+    
+    Args:
+        paths: Chemins des fichiers à extraire
+        workers: Nombre de processus (défaut: config.loader_workers, 0 = nombre de cœurs)
+    
+    Returns:
+        Liste de dictionnaires {source, content, seconds, error}, dans l'ordre de `paths`
+    """
+    workers = _resolve_workers(workers, len(paths))
+    
+    if workers <= 1:
+        return [_extract_file(path) for path in paths]
+    
+    results = _extract_in_pool(paths, workers)
+    
+    lost = [path for path in paths if path not in results]
+    if lost:
+        print(f"⚠️ Processus d'extraction interrompu, reprise isolée de {len(lost)} fichiers")
+        for path in lost:
+            results[path] = _extract_isolated(path)
+    
+    return [results[path] for path in paths]
+
+def _init_spawned_worker(parent_config):
+    """Initialise un processus d'extraction lancé en spawn avec la configuration du parent"""
+    config.__dict__.update(vars(parent_config))
+
+def iter_extracted_files(paths: List[str], workers: Optional[int] = None,
+                         window: Optional[int] = None) -> Iterator[Dict]:
+    """
+    Variante paresseuse de extract_files pour le mode streaming
+    
+    Au plus `window` fichiers sont en cours d'extraction ou en attente de lecture :
+    la mémoire ne dépend pas du nombre de fichiers. Les résultats sont produits
+    dans l'ordre de `paths`.
+    
+    Les processus sont lancés en mode spawn : en streaming, le pool est créé
+    dans un thread alors que d'autres threads exécutent torch, et un fork
+    pourrait hériter d'un verrou tenu (interblocage).
+    
+    Args:
+        paths: Chemins des fichiers à extraire
+        workers: Nombre de processus (défaut: config.loader_workers, 0 = nombre de cœurs)
+        window: Nombre maximal de fichiers en vol (défaut: 2 x workers)
+    
+    Yields:
+        Dictionnaires {source, content, seconds, error}
+    """
+    workers = _resolve_workers(workers, len(paths))
+    
+    if workers <= 1:
+        for path in paths:
+            yield _extract_file(path)
+        return
+    
+    window = window or 2 * workers
+    pending = deque()
+    position = 0
     
-    if ext == ".pdf":
-        doc = fitz.open(path)
-        return "\n".join(page.get_text() for page in doc)
+    context = multiprocessing.get_context("spawn")
     
-    with open(path, "r", encoding="utf-8") as f:
-        if ext == ".md":
-            return markdown.markdown(f.read())
-        elif ext == ".json":
-            return json.load(f)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_spawned_worker, initargs=(config,)) as executor:
+        while position < len(paths) or pending:
+            while position < len(paths) and len(pending) < window:
+                pending.append((paths[position], executor.submit(_extract_file, paths[position])))
+                position += 1
+            
+            try:
+                result = pending[0][1].result()
+            except BrokenProcessPool:
+                break
+            pending.popleft()
+            yield result
     
-    return None
+    if pending:
+        # Pool cassé : fichiers en vol repris isolément, puis un nouveau pool pour la suite
+        print(f"⚠️ Processus d'extraction interrompu, reprise isolée de {len(pending)} fichiers")
+        for path, _ in pending:
+            yield _extract_isolated(path)
+        yield from iter_extracted_files(paths[position:], workers, window)
 
-def process_markdown_files():
-    """Charge tous les fichiers markdown du dossier kiwiXlegal"""
+def _report_entry(source: str, seconds: float, cached: bool = False,
+                  cleanup: Optional[CleanupStats] = None, error: Optional[str] = None) -> Dict:
+    """Entrée du bilan d'extraction d'un fichier (sans son texte : le bilan vit jusqu'à la fin de l'exécution)"""
+    return {
+        "source": source,
+        "seconds": seconds,
+        "cached": cached,
+        "cleanup": cleanup,
+        "error": error
+    }
+
+def _to_documents(results: List[Dict], report: List[Dict]) -> List[Dict]:
+    """Convertit les résultats d'extraction en documents et complète le rapport"""
+    documents = []
+    for result in results:
+        report.append(_report_entry(result["source"], result["seconds"], result["cached"],
+                                    result["cleanup"], result["error"]))
+        if result["error"]:
+            print(f"❌ Erreur lors de l'extraction de {result['source']}: {result['error']}")
+        elif result["content"]:
+            document = {
+                "source": result["source"],
+                "content": result["content"]
+            }
+            if result.get("page_starts") is not None:
+                document["page_starts"] = result["page_starts"]
+            if result.get("headings"):
+                document["headings"] = result["headings"]
+            documents.append(document)
+    return documents
+
+def list_markdown_files() -> List[str]:
+    """Liste les fichiers markdown du dossier kiwiXlegal, triés par nom"""
     data_dir = config.get_data_dir()
     markdown_dir = os.path.join(data_dir, config.markdown_subdir)
-    markdown_data = []
-    
-    if os.path.exists(markdown_dir):
-        for filename in os.listdir(markdown_dir):
-            if filename.endswith(".md"):
-                file_path = os.path.join(markdown_dir, filename)
-                content = load_file(file_path)
-                if content:
-                    markdown_data.append({
-                        "source": file_path,
-                        "content": content
-                    })
-    
-    return markdown_data
-
-def process_pdf_files():
-    """Charge tous les fichiers PDF en parcourant récursivement le dossier root"""
+    
+    if not os.path.exists(markdown_dir):
+        return []
+    
+    return [
+        os.path.join(markdown_dir, filename)
+        for filename in sorted(os.listdir(markdown_dir))
+        if filename.endswith(".md")
+    ]
+
+def list_pdf_files() -> List[str]:
+    """Liste récursivement les fichiers PDF du dossier root, dans un ordre stable"""
     data_dir = config.get_data_dir()
     root_dir = os.path.join(data_dir, config.pdf_subdir)
-    pdf_data = []
+    pdf_files = []
     
     if os.path.exists(root_dir):
         for root, dirs, files in os.walk(root_dir):
-            for filename in files:
+            dirs.sort()
+            for filename in sorted(files):
                 if filename.endswith(".pdf"):
-                    file_path = os.path.join(root, filename)
-                    content = load_file(file_path)
-                    if content:
-                        pdf_data.append({
-                            "source": file_path,
-                            "content": content
-                        })
-    
-    return pdf_data
-
-def process_json_file():
-    """Charge le fichier JSON dans le dossier data"""
-    data_dir = config.get_data_dir()
-    json_filename = config.get_json_filename()
-    json_file_path = os.path.join(data_dir, json_filename)
+                    pdf_files.append(os.path.join(root, filename))
+    
+    return pdf_files
+
+def process_markdown_files(workers: Optional[int] = None, report: Optional[List[Dict]] = None) -> List[Dict]:
+    """
+    Charge tous les fichiers markdown du dossier kiwiXlegal
+    
+    Args:
+        workers: Nombre de processus d'extraction (défaut: config.loader_workers)
+        report: Liste complétée avec le résultat d'extraction de chaque fichier
+    
+    Returns:
+        Liste des documents {source, content}
+    """
+    results = extract_files(list_markdown_files(), workers)
+    return _to_documents(results, report if report is not None else [])
+
+def process_pdf_files(workers: Optional[int] = None, report: Optional[List[Dict]] = None) -> List[Dict]:
+    """
+    Charge tous les fichiers PDF en parcourant récursivement le dossier root
+    
+    Args:
+        workers: Nombre de processus d'extraction (défaut: config.loader_workers)
+        report: Liste complétée avec le résultat d'extraction de chaque fichier
+    
+    Returns:
+        Liste des documents {source, content}
+    """
+    results = extract_files(list_pdf_files(), workers)
+    return _to_documents(results, report if report is not None else [])
+
+def list_json_files() -> List[str]:
+    """Liste le fichier JSON du dossier data (liste vide s'il est absent)"""
+    json_file_path = os.path.join(config.get_data_dir(), config.get_json_filename())
+    return [json_file_path] if os.path.exists(json_file_path) else []
+
+def list_source_files() -> List[str]:
+    """Liste tous les fichiers sources (markdown, PDF puis JSON)"""
+    return list_markdown_files() + list_pdf_files() + list_json_files()
+
+def load_documents(paths: List[str], workers: Optional[int] = None,
+                   report: Optional[List[Dict]] = None) -> List[Dict]:
+    """
+    Charge une liste explicite de fichiers (ingestion incrémentale)
+    
+    Args:
+        paths: Chemins des fichiers à charger
+        workers: Nombre de processus d'extraction (défaut: config.loader_workers)
+        report: Liste complétée avec le résultat d'extraction de chaque fichier
+    
+    Returns:
+        Liste des documents {source, content}, dans l'ordre de `paths`
+    """
+    report = report if report is not None else []
+    start = time.perf_counter()
+    
+    # Les exports JSON sont lus au fil de l'eau, un document par appel d'offres
+    json_paths = [path for path in paths if path.endswith(".json")]
+    file_paths = [path for path in paths if not path.endswith(".json")]
+    
+    documents = _to_documents(extract_files(file_paths, workers), report)
+    for path in json_paths:
+        documents.extend(_iter_json_documents_safe(path, report))
+    
+    print_extraction_report(report, time.perf_counter() - start)
+    return documents
+
+def render_ao_record(record: Dict) -> str:
+    """
+    Rendu texte compact d'un appel d'offres
+    
+    Args:
+        record: Enregistrement de l'export JSON
+    
+    Returns:
+        Texte (titre, budget, client, compétences puis description)
+    """
+    metadata = ao_record_metadata(record)
+    lines = []
+    
+    if metadata["title"]:
+        lines.append(f"Titre : {metadata['title']}")
+    if metadata["budget"]:
+        lines.append(f"Budget : {metadata['budget']}")
+    if metadata["client"]:
+        client_type = f" ({metadata['client_type']})" if metadata["client_type"] else ""
+        lines.append(f"Client : {metadata['client']}{client_type}")
+    if metadata["skills"]:
+        lines.append(f"Compétences : {', '.join(metadata['skills'])}")
+    if record.get("description"):
+        lines.append(f"Description : {record['description']}")
+    
+    return "\n".join(lines)
+
+def ao_record_metadata(record: Dict) -> Dict:
+    """
+    Métadonnées structurées d'un appel d'offres, recopiées dans chacun de ses chunks
+    
+    Args:
+        record: Enregistrement de l'export JSON
+    
+    Returns:
+        Dictionnaire {type, ao_id, title, budget, client, client_type, skills, skill_categories}
+    """
+    client = record.get("client")
+    if isinstance(client, dict):
+        client_type = client.get("entrepriseType")
+        client_type = client_type.get("name") if isinstance(client_type, dict) else client_type
+        client = client.get("name")
+    else:
+        client_type = None
     
-    if os.path.exists(json_file_path):
-        content = load_file(json_file_path)
+    skills = [skill if isinstance(skill, dict) else {"name": skill} for skill in record.get("skills") or []]
+    
+    return {
+        "type": "appel_offres",
+        "ao_id": record.get("id"),
+        "title": record.get("title"),
+        "budget": record.get("budget"),
+        "client": client,
+        "client_type": client_type,
+        "skills": [skill["name"] for skill in skills if skill.get("name")],
+        "skill_categories": sorted({skill["category"] for skill in skills if skill.get("category")})
+    }
+
+def iter_json_documents(path: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Produit un document par appel d'offres, en lisant le fichier JSON au fil de l'eau
+    
+    Args:
+        path: Chemin du fichier JSON (défaut: fichier JSON du répertoire de données)
+    
+    Yields:
+        Documents {source, content, metadata}
+    """
+    if path is None:
+        paths = list_json_files()
+        if not paths:
+            return
+        path = paths[0]
+    
+    for record in iter_json_records(path):
+        content = render_ao_record(record)
         if content:
-            return {
-                "source": json_file_path,
-                "content": content
+            yield {
+                "source": path,
+                "content": content,
+                "metadata": ao_record_metadata(record)
             }
+
+def _iter_json_documents_safe(path: str, report: List[Dict]) -> Iterator[Dict]:
+    """Variante de iter_json_documents qui consigne une erreur de lecture au lieu de la propager"""
+    start = time.perf_counter()
+    error = None
+    try:
+        yield from iter_json_documents(path)
+    except (OSError, ValueError) as e:
+        error = f"{type(e).__name__}: {e}"
+        print(f"❌ Erreur lors de la lecture de {path}: {error}")
+    
+    report.append(_report_entry(path, time.perf_counter() - start, error=error))
+
+def process_json_file(report: Optional[List[Dict]] = None) -> List[Dict]:
+    """
+    Charge les appels d'offres du fichier JSON dans le dossier data (un document par enregistrement)
+    
+    Args:
+        report: Liste complétée avec le résultat de lecture du fichier (une erreur y est consignée)
+    
+    Returns:
+        Documents {source, content, metadata} ; ceux lus avant une erreur sont conservés
+    """
+    report = report if report is not None else []
+    documents = []
+    for path in list_json_files():
+        documents.extend(_iter_json_documents_safe(path, report))
+    return documents
+
+def iter_documents(workers: Optional[int] = None, report: Optional[List[Dict]] = None) -> Iterator[Dict]:
+    """
+    Produit les documents un par un (markdown, PDF puis JSON) pour le mode streaming
+    
+    Args:
+        workers: Nombre de processus d'extraction (défaut: config.loader_workers)
+        report: Liste complétée avec le résultat d'extraction de chaque fichier
+    
+    Les PDF sont produits sous forme paresseuse ({source, pages}) : leurs pages
+    sont extraites une à une pendant le découpage.
+    
+    Yields:
+        Documents {source, content} (et metadata pour les appels d'offres) ou {source, pages}
+    """
+    report = report if report is not None else []
+    
+    for result in iter_extracted_files(list_markdown_files(), workers):
+        yield from _to_documents([result], report)
+    
+    for path in list_pdf_files():
+        yield {
+            "source": path,
+            "pages": _iter_pdf_pages_safe(path, report)
+        }
     
-    return None
+    for path in list_json_files():
+        yield from _iter_json_documents_safe(path, report)
 
-def load_all_documents():
-    """Charge tous les documents de tous les formats"""
+def _iter_pdf_pages_safe(path: str, report: List[Dict]) -> Iterator[str]:
+    """
+    Variante de iter_pdf_pages qui consigne une erreur d'extraction au lieu de la propager
+    
+    Les pages sont nettoyées (config.pdf_cleanup) et le bilan du fichier est
+    ajouté au rapport une fois toutes ses pages produites.
+    """
+    start = time.perf_counter()
+    error = None
+    cleanup = None
+    try:
+        if config.pdf_cleanup:
+            cleanup = CleanupStats()
+            yield from clean_pages(iter_pdf_pages(path), cleanup, _cleanup_chunk_size(), config.chunk_overlap)
+        else:
+            yield from iter_pdf_pages(path)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        print(f"❌ Erreur lors de l'extraction de {path}: {error}")
+    
+    report.append(_report_entry(path, time.perf_counter() - start, cleanup=cleanup, error=error))
+
+def print_extraction_report(report: List[Dict], elapsed: float, slowest: int = 5):
+    """
+    Affiche le bilan de l'extraction : durée totale, fichiers les plus lents, échecs
+    
+    Args:
+        report: Bilan d'extraction {source, seconds, cached, cleanup, error} de chaque fichier
+        elapsed: Durée réelle de l'extraction (secondes)
+        slowest: Nombre de fichiers les plus lents à afficher
+    """
+    if not report:
+        return
+    
+    cumulated = sum(result["seconds"] for result in report)
+    failures = [result for result in report if result["error"]]
+    cached = sum(1 for result in report if result.get("cached"))
+    print(f"⏱️ Extraction: {len(report)} fichiers en {elapsed:.2f}s "
+          f"(cumul {cumulated:.2f}s, x{cumulated / elapsed if elapsed else 1:.1f}, "
+          f"{cached} depuis le cache texte)")
+    
+    for result in sorted(report, key=lambda r: r["seconds"], reverse=True)[:slowest]:
+        print(f"   • {result['seconds']:.2f}s  {result['source']}")
+    
+    cleanup = cleanup_totals(report)
+    if cleanup.documents:
+        print(format_cleanup_stats(cleanup))
+    
+    if failures:
+        print(f"⚠️ {len(failures)} fichiers en échec")
+
+def cleanup_totals(report: List[Dict]) -> CleanupStats:
+    """Cumule les compteurs de nettoyage des PDF d'un bilan d'extraction"""
+    totals = CleanupStats()
+    for result in report:
+        if result.get("cleanup") is not None:
+            totals.add(result["cleanup"])
+    return totals
+
+def load_all_documents(workers: Optional[int] = None):
+    """
+    Charge tous les documents de tous les formats
+    
+    Args:
+        workers: Nombre de processus d'extraction (défaut: config.loader_workers, 0 = nombre de cœurs)
+    """
     mode_text = "MODE TEST" if config.test_mode else "MODE PRODUCTION"
     data_dir = config.get_data_dir()
     print(f"Démarrage du chargement des documents - {mode_text}")
     print(f"Répertoire de données: {data_dir}")
     
+    report = []
+    start = time.perf_counter()
+    
     # Charger les fichiers markdown
     print("Chargement des fichiers markdown...")
-    markdown_data = process_markdown_files()
+    markdown_data = process_markdown_files(workers, report)
     print(f"✓ {len(markdown_data)} fichiers markdown chargés")
     
     # Charger les fichiers PDF
     print("Chargement des fichiers PDF...")
-    pdf_data = process_pdf_files()
+    pdf_data = process_pdf_files(workers, report)
     print(f"✓ {len(pdf_data)} fichiers PDF chargés")
     
     # Charger le fichier JSON
     print("Chargement du fichier JSON...")
-    json_data = process_json_file()
+    json_data = process_json_file(report)
     if json_data:
-        print("Fichier JSON chargé")
-    else:
+        print(f"✓ {len(json_data)} appels d'offres chargés depuis le fichier JSON")
+    elif not list_json_files():
         print("Aucun fichier JSON trouvé")
     
+    print_extraction_report(report, time.perf_counter() - start)
+    
     # Combiner toutes les données
     all_documents = []
     all_documents.extend(markdown_data)
     all_documents.extend(pdf_data)
-    if json_data:
-        all_documents.append(json_data)
+    all_documents.extend(json_data)
     
     return all_documents
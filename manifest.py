@@ -0,0 +1,192 @@
+"""
+Ingestion incrémentale : manifeste (chemin, taille, mtime, empreinte) → chunks
+
+Le manifeste est conservé dans une collection annexe de MongoDB. À chaque
+exécution en mode incrémental, les fichiers sources sont comparés au manifeste :
+  - inchangés (même taille et mtime, ou même empreinte) : ignorés ;
+  - nouveaux ou modifiés : extraits, encodés puis insérés, leurs anciens chunks supprimés ;
+  - supprimés du disque : leurs chunks sont supprimés ;
+  - copies exactes d'un autre fichier : ignorées (seul le fichier canonique est indexé).
+
+Un changement des paramètres de découpage, du modèle, de son backend, du format
+de stockage des embeddings ou du pré-traitement rend toutes les entrées
+obsolètes : tout est alors ré-ingéré.
+"""
+
+import os
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+import mongo
+from config import config
+from loader import file_hash, list_source_files
+from chunker import CHUNKER_VERSION
+from preprocessor import PREPROCESSING_VERSION
+from boilerplate import CLEANUP_VERSION
+from markdown_text import MARKDOWN_TEXT_VERSION
+
+
+def ingestion_settings() -> Dict:
+    """Paramètres dont dépend le contenu des chunks et de leurs embeddings"""
+    return {
+        'chunker': CHUNKER_VERSION,
+        'chunk_size': config.chunk_size,
+        'chunk_overlap': config.chunk_overlap,
+        'chunk_unit': config.chunk_unit,
+        'chunk_tokens': ([config.chunk_max_tokens, config.chunk_overlap_tokens]
+                         if config.chunk_unit == "tokens" else None),
+        'embedding_model': config.embedding_model,
+        'embedding_backend': config.embedding_backend,
+        'embedding_storage': config.embedding_storage,
+        'preprocessing_version': PREPROCESSING_VERSION,
+        'pdf_cleanup': CLEANUP_VERSION if config.pdf_cleanup else None,
+        'markdown_text': MARKDOWN_TEXT_VERSION
+    }
+
+
+@dataclass
+class IngestionPlan:
+    """Résultat de la comparaison entre les fichiers sources et le manifeste"""
+    
+    # Fichiers à (ré)ingérer, dans l'ordre du parcours
+    to_ingest: List[str] = field(default_factory=list)
+    # Fichiers nouveaux parmi to_ingest
+    new: Set[str] = field(default_factory=set)
+    # Fichiers déjà indexés et inchangés
+    unchanged: List[str] = field(default_factory=list)
+    # Copies exactes : chemin -> chemin du fichier canonique indexé
+    duplicates: Dict[str, str] = field(default_factory=dict)
+    # Fichiers présents dans le manifeste mais plus sur le disque
+    removed: List[str] = field(default_factory=list)
+    # (taille, mtime, empreinte) des fichiers présents
+    signatures: Dict[str, Dict] = field(default_factory=dict)
+    # Manifeste avant cette exécution
+    previous: Dict[str, Dict] = field(default_factory=dict)
+    settings: Dict = field(default_factory=dict)
+
+
+def build_plan(paths: Optional[List[str]] = None) -> IngestionPlan:
+    """
+    Compare les fichiers sources au manifeste
+    
+    L'empreinte n'est recalculée que si la taille ou le mtime a changé.
+    
+    Args:
+        paths: Fichiers sources (défaut: tous les fichiers du répertoire de données)
+    
+    Returns:
+        Plan d'ingestion
+    """
+    paths = list_source_files() if paths is None else paths
+    plan = IngestionPlan(previous=mongo.load_manifest(), settings=ingestion_settings())
+    
+    unchanged = set()
+    for path in paths:
+        stat = os.stat(path)
+        entry = plan.previous.get(path)
+        valid = entry is not None and entry.get('settings') == plan.settings
+        
+        if valid and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime:
+            content_hash = entry['hash']
+        else:
+            content_hash = file_hash(path)
+        
+        plan.signatures[path] = {'size': stat.st_size, 'mtime': stat.st_mtime, 'hash': content_hash}
+        if valid and entry['hash'] == content_hash:
+            unchanged.add(path)
+    
+    # Regrouper les copies exactes ; le fichier canonique est de préférence un fichier déjà indexé
+    by_hash = defaultdict(list)
+    for path in paths:
+        by_hash[plan.signatures[path]['hash']].append(path)
+    
+    for group in by_hash.values():
+        indexed = [path for path in group
+                   if path in unchanged and not plan.previous[path].get('duplicate_of')]
+        canonical = indexed[0] if indexed else group[0]
+        
+        for path in group:
+            if path != canonical:
+                plan.duplicates[path] = canonical
+        
+        if canonical in indexed:
+            plan.unchanged.append(canonical)
+        else:
+            plan.to_ingest.append(canonical)
+            if canonical not in plan.previous:
+                plan.new.add(canonical)
+    
+    # Conserver l'ordre du parcours pour une extraction déterministe
+    order = {path: i for i, path in enumerate(paths)}
+    plan.to_ingest.sort(key=order.get)
+    plan.unchanged.sort(key=order.get)
+    
+    plan.removed = sorted(set(plan.previous) - set(paths))
+    return plan
+
+
+def format_plan(plan: IngestionPlan) -> str:
+    """Résumé du plan d'ingestion pour l'affichage"""
+    changed = len(plan.to_ingest) - len(plan.new)
+    return (f"Manifeste: {len(plan.new)} nouveaux, {changed} modifiés, "
+            f"{len(plan.unchanged)} inchangés, {len(plan.duplicates)} doublons, "
+            f"{len(plan.removed)} supprimés")
+
+
+def apply_plan(plan: IngestionPlan, inserted_chunks: List[Dict], failed: Optional[Set[str]] = None) -> Dict:
+    """
+    Met à jour la collection et le manifeste après l'insertion des nouveaux chunks
+    
+    Les anciens chunks d'un fichier réingéré ne sont supprimés qu'après l'insertion
+    des nouveaux ; un fichier dont l'extraction a échoué garde ses anciens chunks et
+    son ancienne entrée, il sera retenté à la prochaine exécution. Il en va de même
+    des copies d'un fichier canonique en échec : leur contenu resterait sans chunks.
+    
+    Args:
+        plan: Plan d'ingestion
+        inserted_chunks: Chunks insérés (avec leur '_id') pour les fichiers de plan.to_ingest
+        failed: Fichiers dont l'extraction a échoué
+    
+    Returns:
+        Statistiques {deleted_chunks, manifest_entries}
+    """
+    failed = failed or set()
+    mongo.ensure_source_index()
+    
+    ids_by_source = defaultdict(list)
+    for chunk in inserted_chunks:
+        ids_by_source[chunk['source']].append(chunk['_id'])
+    
+    entries = []
+    deleted = 0
+    
+    for path in plan.to_ingest:
+        if path in failed:
+            continue
+        chunk_ids = ids_by_source.get(path, [])
+        deleted += mongo.delete_chunks_by_source(path, keep_ids=chunk_ids)
+        entries.append(dict(plan.signatures[path], path=path, settings=plan.settings, chunk_ids=chunk_ids))
+    
+    for path in plan.unchanged:
+        entries.append(dict(plan.previous[path], **plan.signatures[path]))
+    
+    for path, canonical in plan.duplicates.items():
+        if canonical in failed:
+            continue
+        # Un fichier devenu doublon perd ses propres chunks, une fois le fichier canonique indexé
+        if plan.previous.get(path, {}).get('chunk_ids'):
+            deleted += mongo.delete_chunks_by_source(path)
+        entries.append(dict(plan.signatures[path], path=path, settings=plan.settings,
+                            chunk_ids=[], duplicate_of=canonical))
+    
+    for path in plan.removed:
+        deleted += mongo.delete_chunks_by_source(path)
+    
+    mongo.save_manifest_entries(entries)
+    if plan.removed:
+        mongo.delete_manifest_entries(plan.removed)
+    
+    if deleted:
+        mongo.bump_content_version()
+    
+    return {'deleted_chunks': deleted, 'manifest_entries': len(entries)}
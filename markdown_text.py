@@ -0,0 +1,158 @@
+"""
+Conversion directe Markdown → texte brut
+
+Le rendu HTML complet (markdown.markdown) laissait des balises dans le texte
+indexé et coûtait une passe de rendu complète par fichier. Ici le balisage est
+retiré ligne à ligne avec des expressions régulières : titres, emphase, liens,
+images, code, citations, listes à puces, tableaux et balises HTML. La structure
+des titres est conservée à part, avec la position de chaque titre dans le texte
+produit, pour rattacher chaque chunk à sa section.
+"""
+
+import html
+import re
+from typing import Dict, List, Tuple
+
+# Version de la conversion (fait partie des paramètres d'ingestion du manifeste)
+MARKDOWN_TEXT_VERSION = "1"
+
+_ATX_HEADING = re.compile(r"^ {0,3}(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$")
+_SETEXT_UNDERLINE = re.compile(r"^ {0,3}(=+|-+)[ \t]*$")
+_FENCE = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+_RULE = re.compile(r"^ {0,3}([-*_])(?:[ \t]*\1){2,}[ \t]*$")
+_BLOCKQUOTE = re.compile(r"^ {0,3}(?:>[ \t]?)+")
+_BULLET = re.compile(r"^([ \t]*)[-*+][ \t]+")
+_TABLE_SEPARATOR = re.compile(r"^[ \t]*\|?[ \t]*:?-+:?[ \t]*(?:\|[ \t]*:?-+:?[ \t]*)+\|?[ \t]*$")
+_REFERENCE_DEFINITION = re.compile(r"^ {0,3}\[[^\]]+\]:[ \t]+\S+")
+
+# Caractères pouvant introduire du balisage en ligne (les lignes sans aucun sont laissées telles quelles)
+_INLINE_MARKUP = re.compile(r"[\\`*_\[<&~]")
+_ESCAPE = re.compile(r"\\([\\`*_{}\[\]()#+\-.!|>~])")
+_IMAGE = re.compile(r"!\[([^\]]*)\]\([^)]*\)")
+_LINK = re.compile(r"\[([^\]]+)\](?:\([^)]*\)|\[[^\]]*\])")
+_AUTOLINK = re.compile(r"<((?:https?|ftp)://[^>\s]+|[^>\s@]+@[^>\s@]+)>")
+_HTML_COMMENT = re.compile(r"<!--.*?-->")
+_HTML_TAG = re.compile(r"</?[A-Za-z][^>]*>")
+_CODE_SPAN = re.compile(r"(`+)(.+?)\1")
+_STRONG = re.compile(r"(\*\*|__)(?=\S)(.+?)(?<=\S)\1")
+_EMPHASIS_STAR = re.compile(r"\*(?=\S)(.+?)(?<=\S)\*")
+_EMPHASIS_UNDERSCORE = re.compile(r"(?<!\w)_(?=\S)(.+?)(?<=\S)_(?!\w)")
+_STRIKETHROUGH = re.compile(r"~~(?=\S)(.+?)(?<=\S)~~")
+
+# Caractères échappés mis de côté pendant le retrait de l'emphase (zone à usage privé)
+_ESCAPED_BASE = 0xE000
+_UNESCAPE = {_ESCAPED_BASE + ord(c): c for c in "\\`*_{}[]()#+-.!|>~"}
+
+
+def strip_inline(line: str) -> str:
+    """
+    Retire le balisage en ligne d'une ligne de Markdown
+    
+    Args:
+        line: Ligne de Markdown (hors blocs de code)
+    
+    Returns:
+        Texte de la ligne sans balisage
+    """
+    if not _INLINE_MARKUP.search(line):
+        return line
+    
+    line, escaped = _ESCAPE.subn(lambda m: chr(_ESCAPED_BASE + ord(m.group(1))), line)
+    
+    line = _HTML_COMMENT.sub("", line)
+    line = _IMAGE.sub(r"\1", line)
+    line = _LINK.sub(r"\1", line)
+    line = _AUTOLINK.sub(r"\1", line)
+    line = _HTML_TAG.sub("", line)
+    line = _CODE_SPAN.sub(lambda m: m.group(2).strip(), line)
+    line = _STRONG.sub(r"\2", line)
+    line = _EMPHASIS_STAR.sub(r"\1", line)
+    line = _EMPHASIS_UNDERSCORE.sub(r"\1", line)
+    line = _STRIKETHROUGH.sub(r"\1", line)
+    
+    if escaped:
+        line = line.translate(_UNESCAPE)
+    return html.unescape(line) if "&" in line else line
+
+
+def _table_row(line: str) -> str:
+    """Ligne de tableau : cellules séparées par ' | ', sans les barres de bord"""
+    cells = line.strip().strip("|").split("|")
+    return " | ".join(cell.strip() for cell in cells)
+
+
+def markdown_to_text(text: str) -> Tuple[str, List[Dict]]:
+    """
+    Convertit un document Markdown en texte brut
+    
+    Args:
+        text: Contenu Markdown
+    
+    Returns:
+        Tuple (texte brut, titres) ; chaque titre est un dictionnaire
+        {level, title, offset} où offset est la position du titre dans le texte brut
+    """
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    output = []
+    headings = []
+    length = 0
+    
+    def emit(line: str):
+        nonlocal length
+        # Une seule ligne vide entre deux paragraphes, aucune en début de texte
+        if not line and (not output or not output[-1]):
+            return
+        output.append(line)
+        length += len(line) + 1
+    
+    def heading(level: int, title: str):
+        title = strip_inline(title).strip()
+        if title:
+            headings.append({'level': level, 'title': title, 'offset': length})
+            emit(title)
+    
+    fence = None
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        i += 1
+        
+        # Blocs de code : contenu conservé tel quel, délimiteurs retirés
+        match = _FENCE.match(line)
+        if fence is not None:
+            if match and match.group(1)[0] == fence[0] and len(match.group(1)) >= len(fence):
+                fence = None
+            else:
+                emit(line)
+            continue
+        if match:
+            fence = match.group(1)
+            continue
+        
+        line = _BLOCKQUOTE.sub("", line)
+        
+        match = _ATX_HEADING.match(line)
+        if match:
+            heading(len(match.group(1)), match.group(2) or "")
+            continue
+        
+        if _REFERENCE_DEFINITION.match(line):
+            continue
+        
+        # Titre souligné (===, ---) : la ligne suivante est le soulignement
+        if line.strip() and i < len(lines) and not _BULLET.match(line):
+            underline = _SETEXT_UNDERLINE.match(lines[i])
+            if underline:
+                heading(1 if underline.group(1)[0] == "=" else 2, line)
+                i += 1
+                continue
+        
+        if _RULE.match(line) or _TABLE_SEPARATOR.match(line):
+            continue
+        
+        line = _BULLET.sub(r"\1", line)
+        if "|" in line and line.strip().startswith("|"):
+            line = _table_row(line)
+        emit(strip_inline(line).rstrip())
+    
+    return "\n".join(output).rstrip(), headings
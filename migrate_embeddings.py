@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Migration du format de stockage des embeddings d'une collection existante
+
+Convertit les embeddings de la collection courante vers le format demandé
+("array", "float32" ou "float16"). Les documents déjà au bon format sont
+ignorés, ce qui permet de relancer la migration sans risque.
+
+Usage:
+    python migrate_embeddings.py --to float32 --test
+    python migrate_embeddings.py --to float16 --prod
+    python migrate_embeddings.py --to array --dry-run
+"""
+
+import os
+import sys
+import argparse
+
+# Vérifier l'argument --test au démarrage pour configurer l'environnement
+if "--test" in sys.argv:
+    os.environ["TEST_MODE"] = "true"
+    print("🧪 Mode TEST activé via argument --test")
+elif "--prod" in sys.argv or "--production" in sys.argv:
+    os.environ["TEST_MODE"] = "false"
+    print("🏭 Mode PRODUCTION activé via argument --prod/--production")
+
+from pymongo import UpdateOne
+from tqdm import tqdm
+import mongo
+from config import config
+from embedding_codec import STORAGE_FORMATS, decode_embedding, encode_embedding, storage_format
+
+
+def migrate_embeddings(target: str, batch_size: int = None, dry_run: bool = False) -> dict:
+    """
+    Convertit tous les embeddings de la collection vers le format cible
+    
+    Args:
+        target: Format de stockage cible
+        batch_size: Nombre de mises à jour par bulk_write (défaut: config.batch_size)
+        dry_run: Si True, compte les documents à convertir sans rien écrire
+    
+    Returns:
+        Statistiques de migration (convertis, ignorés, octets avant/après)
+    """
+    if target not in STORAGE_FORMATS:
+        raise ValueError(f"Format de stockage inconnu: {target}")
+    mongo.ensure_connection()
+    
+    batch_size = batch_size or config.batch_size
+    stats = {'converted': 0, 'skipped': 0, 'bytes_before': 0, 'bytes_after': 0}
+    pending = []
+    
+    def flush():
+        if pending and not dry_run:
+            mongo.collection.bulk_write(pending, ordered=False)
+        pending.clear()
+    
+    total = mongo.collection.count_documents({"embedding": {"$exists": True}})
+    cursor = mongo.collection.find({"embedding": {"$exists": True}}, {"embedding": 1})
+    
+    for doc in tqdm(cursor, total=total, desc=f"Migration vers {target}"):
+        value = doc['embedding']
+        if storage_format(value) == target:
+            stats['skipped'] += 1
+            continue
+        
+        encoded = encode_embedding(decode_embedding(value), target)
+        stats['converted'] += 1
+        stats['bytes_before'] += _stored_size(value)
+        stats['bytes_after'] += _stored_size(encoded)
+        pending.append(UpdateOne({"_id": doc['_id']}, {"$set": {"embedding": encoded}}))
+        
+        if len(pending) >= batch_size:
+            flush()
+    
+    flush()
+    
+    # Les index en mémoire doivent être reconstruits avec le nouveau format
+    if stats['converted'] and not dry_run:
+        mongo.bump_content_version()
+    
+    return stats
+
+
+def _stored_size(value) -> int:
+    """Taille approximative en BSON du champ embedding"""
+    if isinstance(value, bytes):
+        return len(value) + 5
+    # Chaque élément : type (1) + clé décimale terminée par NUL + double (8)
+    return 5 + sum(1 + len(str(i)) + 1 + 8 for i in range(len(value)))
+
+
+def main():
+    """Point d'entrée principal avec arguments en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Migration du format de stockage des embeddings")
+    parser.add_argument("--to", dest="target", required=True, choices=STORAGE_FORMATS,
+                       help="Format de stockage cible")
+    parser.add_argument("--batch-size", type=int, default=None,
+                       help="Nombre de mises à jour par lot (défaut: BATCH_SIZE)")
+    parser.add_argument("--dry-run", action="store_true",
+                       help="Compter les documents à convertir sans écrire")
+    parser.add_argument("--test", action="store_true",
+                       help="Migrer la base de test")
+    parser.add_argument("--prod", "--production", action="store_true",
+                       help="Migrer la base de production (explicite)")
+    
+    args = parser.parse_args()
+    
+    stats = migrate_embeddings(args.target, batch_size=args.batch_size, dry_run=args.dry_run)
+    
+    print(f"\n{'[DRY RUN] ' if args.dry_run else ''}Migration vers {args.target}")
+    print(f"Documents convertis: {stats['converted']}")
+    print(f"Documents déjà au format: {stats['skipped']}")
+    if stats['bytes_before']:
+        ratio = stats['bytes_after'] / stats['bytes_before']
+        print(f"Taille des embeddings: {stats['bytes_before'] / 1e6:.1f} Mo -> "
+              f"{stats['bytes_after'] / 1e6:.1f} Mo ({ratio:.0%})")
+
+
+if __name__ == "__main__":
+    main()
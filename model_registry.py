@@ -0,0 +1,223 @@
+"""
+Registre des modèles d'embedding partagé par tout le processus
+
+Chaque modèle est chargé paresseusement au premier encodage puis réutilisé
+par embedder, search et rag : un processus qui utilise ces trois modules ne
+garde qu'une copie du modèle en mémoire, et les commandes qui n'encodent
+rien (par exemple pipeline.py --stats-only) ne paient pas son chargement.
+
+Le tokenizer et la fenêtre d'un modèle (get_tokenizer) sont disponibles sans
+charger ses poids : le découpage en tokens ne charge pas le modèle.
+
+Le backend d'inférence est choisi via config.embedding_backend :
+  - "torch" : PyTorch fp32 (comportement historique) ;
+  - "torch-int8" : PyTorch avec quantification dynamique int8 des couches linéaires ;
+  - "onnx" : graphe ONNX exécuté par onnxruntime, exporté une seule fois puis
+    réutilisé depuis config.onnx_cache_dir.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from config import config
+
+# Backends d'inférence disponibles
+BACKENDS = ("torch", "torch-int8", "onnx")
+
+_models = {}
+_stats = {}
+_tokenizers = {}
+_lock = threading.Lock()
+
+
+def _rss_mb() -> Optional[float]:
+    """Mémoire résidente actuelle du processus en Mo (None si indisponible)"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        import resource
+        return pages * resource.getpagesize() / (1024 * 1024)
+    except (OSError, ImportError, ValueError, IndexError):
+        return None
+
+
+def _onnx_export_dir(name: str) -> str:
+    """Répertoire où est conservé l'export ONNX d'un modèle"""
+    return os.path.join(config.onnx_cache_dir, re.sub(r"[^A-Za-z0-9._-]+", "__", name))
+
+
+def _load(name: str, backend: str):
+    """Charge un modèle avec le backend demandé"""
+    # Import différé : torch n'est importé que si un modèle est réellement utilisé
+    from sentence_transformers import SentenceTransformer
+    
+    if backend == "torch":
+        return SentenceTransformer(name)
+    
+    if backend == "torch-int8":
+        import torch
+        model = SentenceTransformer(name, device="cpu")
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    
+    # backend == "onnx"
+    try:
+        import onnxruntime  # noqa: F401
+    except ImportError as e:
+        raise ImportError(
+            "Le backend 'onnx' nécessite onnxruntime et optimum : "
+            "pip install \"sentence-transformers[onnx]\""
+        ) from e
+    
+    export_dir = _onnx_export_dir(name)
+    if os.path.exists(os.path.join(export_dir, "onnx", "model.onnx")):
+        return SentenceTransformer(export_dir, backend="onnx")
+    
+    print(f"Export ONNX du modèle {name} vers {export_dir}")
+    model = SentenceTransformer(name, backend="onnx")
+    model.save(export_dir)
+    return model
+
+
+def _model_file(name: str, filename: str, subfolder: str = "") -> Optional[str]:
+    """Chemin local d'un fichier du modèle (dossier ou dépôt Hugging Face), None s'il n'existe pas"""
+    from transformers.utils import cached_file
+    return cached_file(name, filename, subfolder=subfolder, _raise_exceptions_for_missing_entries=False)
+
+
+def _load_tokenizer(name: str):
+    """Charge le tokenizer d'un modèle sentence-transformers et sa fenêtre, sans ses poids"""
+    from transformers import AutoConfig, AutoTokenizer
+    
+    # Dossier du module Transformer (racine du modèle, ou 0_Transformer pour les anciens modèles)
+    subfolder = ""
+    modules_file = _model_file(name, "modules.json")
+    if modules_file:
+        with open(modules_file, encoding="utf-8") as f:
+            for module in json.load(f):
+                if module["type"].endswith(".Transformer"):
+                    subfolder = module["path"]
+                    break
+    
+    tokenizer = AutoTokenizer.from_pretrained(name, subfolder=subfolder)
+    
+    # Même règle que sentence-transformers : sentence_bert_config.json, sinon les limites du modèle
+    max_seq_length = None
+    settings_file = _model_file(name, "sentence_bert_config.json", subfolder)
+    if settings_file:
+        with open(settings_file, encoding="utf-8") as f:
+            max_seq_length = json.load(f).get("max_seq_length")
+    if max_seq_length is None:
+        model_config = AutoConfig.from_pretrained(name, subfolder=subfolder)
+        max_seq_length = min(getattr(model_config, "max_position_embeddings", tokenizer.model_max_length),
+                             tokenizer.model_max_length)
+    return tokenizer, max_seq_length
+
+
+def _key(name: Optional[str], backend: Optional[str]) -> Tuple[str, str]:
+    """Clé du registre pour un couple (modèle, backend)"""
+    backend = backend or config.embedding_backend
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend d'inférence inconnu: {backend} (attendu: {', '.join(BACKENDS)})")
+    return name or config.embedding_model, backend
+
+
+def get_model(name: Optional[str] = None, backend: Optional[str] = None):
+    """
+    Retourne le modèle d'embedding demandé, chargé au premier appel
+    
+    Args:
+        name: Nom ou chemin du modèle (par défaut config.embedding_model)
+        backend: Backend d'inférence (par défaut config.embedding_backend)
+    
+    Returns:
+        Instance SentenceTransformer partagée
+    """
+    key = _key(name, backend)
+    model = _models.get(key)
+    if model is not None:
+        return model
+    
+    with _lock:
+        # Un autre thread a pu charger le modèle pendant l'attente du verrou
+        if key in _models:
+            return _models[key]
+        
+        print(f"Chargement du modèle d'embedding: {key[0]} (backend {key[1]})")
+        rss_before = _rss_mb()
+        start = time.perf_counter()
+        
+        model = _load(*key)
+        
+        load_time = time.perf_counter() - start
+        rss_after = _rss_mb()
+        
+        # Le graphe ONNX n'expose pas de paramètres torch
+        try:
+            parameters_bytes = sum(p.numel() * p.element_size() for p in model.parameters())
+        except (AttributeError, RuntimeError):
+            parameters_bytes = None
+        
+        _models[key] = model
+        _stats[key] = {
+            'load_time_s': load_time,
+            'parameters_mb': parameters_bytes / (1024 * 1024) if parameters_bytes is not None else None,
+            'rss_delta_mb': rss_after - rss_before if rss_before is not None and rss_after is not None else None
+        }
+        return model
+
+
+def get_tokenizer(name: Optional[str] = None):
+    """
+    Retourne le tokenizer d'un modèle et sa fenêtre, sans charger le modèle
+    
+    Le tokenizer d'un modèle déjà chargé (quel que soit son backend) est réutilisé.
+    
+    Args:
+        name: Nom ou chemin du modèle (par défaut config.embedding_model)
+    
+    Returns:
+        Tuple (tokenizer, max_seq_length)
+    """
+    name = name or config.embedding_model
+    for (model_name, _), model in list(_models.items()):
+        if model_name == name:
+            return model.tokenizer, model.max_seq_length
+    
+    with _lock:
+        if name not in _tokenizers:
+            _tokenizers[name] = _load_tokenizer(name)
+        return _tokenizers[name]
+
+
+def is_loaded(name: Optional[str] = None, backend: Optional[str] = None) -> bool:
+    """Indique si un modèle est déjà chargé dans le processus"""
+    return _key(name, backend) in _models
+
+
+def get_stats() -> Dict[str, Dict]:
+    """
+    Retourne les statistiques des modèles chargés
+    
+    Returns:
+        Dictionnaire "modèle (backend)" -> {load_time_s, parameters_mb, rss_delta_mb}
+    """
+    return {f"{name} ({backend})": dict(stats) for (name, backend), stats in _stats.items()}
+
+
+def format_stats() -> str:
+    """Formate les statistiques des modèles chargés pour l'affichage"""
+    if not _stats:
+        return "Aucun modèle chargé"
+    
+    lines = []
+    for name, stats in get_stats().items():
+        details = [f"chargé en {stats['load_time_s']:.1f}s"]
+        if stats['parameters_mb'] is not None:
+            details.append(f"{stats['parameters_mb']:.1f} Mo de paramètres")
+        if stats['rss_delta_mb'] is not None:
+            details.append(f"+{stats['rss_delta_mb']:.0f} Mo RSS")
+        lines.append(f"{name}: {', '.join(details)}")
+    return "\n".join(lines)
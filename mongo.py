@@ -1,10 +1,14 @@
 """
 Module de connexion et d'opérations MongoDB pour la vectorisation
+
+La connexion est ouverte au premier accès à la base (ensure_connection) et non à
+l'import : les processus d'encodage, qui ré-importent le script principal, ne se
+connectent pas à MongoDB.
 """
 
-from pymongo import MongoClient
+from pymongo import MongoClient, ReplaceOne, UpdateOne
 from pymongo.errors import ServerSelectionTimeoutError, OperationFailure
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from tqdm import tqdm
 from config import config
 
@@ -13,6 +17,12 @@ client = None
 db = None
 collection = None
 
+# Collection annexe contenant les compteurs de version du contenu
+META_COLLECTION_NAME = "_meta"
+
+# Collection annexe contenant le manifeste de l'ingestion incrémentale
+MANIFEST_COLLECTION_NAME = "_manifest"
+
 def init_connection():
     """Initialise la connexion à MongoDB"""
     global client, db, collection
@@ -40,6 +50,11 @@ def init_connection():
         print(f"Erreur de connexion: {e}")
         raise
 
+def ensure_connection():
+    """Ouvre la connexion à MongoDB si elle ne l'est pas encore"""
+    if collection is None:
+        init_connection()
+
 def insert_chunks_batch(chunks_data: List[Dict], batch_size: int = None):
     """
     Insère les chunks dans MongoDB par lots
@@ -57,36 +72,158 @@ def insert_chunks_batch(chunks_data: List[Dict], batch_size: int = None):
     
     print(f"Insertion de {len(chunks_data)} chunks en lots de {batch_size}")
     
-    # Vérifier la connexion
-    if collection is None:
-        raise ConnectionError("Connexion MongoDB non initialisée")
+    # Ouvrir la connexion si besoin
+    ensure_connection()
     
     total_inserted = 0
     
     # Insertion par lots
-    for i in tqdm(range(0, len(chunks_data), batch_size), desc="Insertion des chunks"):
-        batch = chunks_data[i:i + batch_size]
-        
-        try:
-            result = collection.insert_many(batch)
-            total_inserted += len(result.inserted_ids)
-        except Exception as e:
-            print(f"Erreur lors de l'insertion du lot {i//batch_size + 1}: {e}")
-            raise
+    try:
+        for i in tqdm(range(0, len(chunks_data), batch_size), desc="Insertion des chunks"):
+            batch = chunks_data[i:i + batch_size]
+            
+            try:
+                result = collection.insert_many(batch)
+                total_inserted += len(result.inserted_ids)
+            except Exception as e:
+                print(f"Erreur lors de l'insertion du lot {i//batch_size + 1}: {e}")
+                raise
+    finally:
+        # Signaler aux index en mémoire que le contenu a changé, même en cas d'insertion partielle
+        bump_content_version()
     
     print(f"{total_inserted} chunks insérés avec succès dans MongoDB")
 
+def bump_content_version():
+    """Incrémente le compteur de version du contenu de la collection"""
+    ensure_connection()
+    
+    db[META_COLLECTION_NAME].update_one(
+        {"_id": collection.name},
+        {"$inc": {"content_version": 1}},
+        upsert=True
+    )
+
+def get_content_version() -> Tuple:
+    """
+    Retourne une empreinte du contenu de la collection
+    
+    L'empreinte combine le compteur mis à jour par les écritures de la pipeline,
+    le nombre de documents et le dernier _id inséré, ce qui détecte aussi les
+    modifications faites hors de ce module.
+    
+    Returns:
+        Tuple comparable, différent dès que le contenu de la collection change
+    """
+    ensure_connection()
+    
+    meta = db[META_COLLECTION_NAME].find_one({"_id": collection.name}) or {}
+    last_doc = collection.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+    
+    return (
+        db.name,
+        collection.name,
+        meta.get("content_version", 0),
+        collection.estimated_document_count(),
+        last_doc["_id"] if last_doc else None
+    )
+
+def delete_chunks_by_source(source: str, keep_ids: Optional[List] = None) -> int:
+    """
+    Supprime les chunks d'un fichier source
+    
+    Args:
+        source: Chemin du fichier source
+        keep_ids: _id des chunks à conserver (ceux qui viennent d'être insérés)
+    
+    Returns:
+        Nombre de chunks supprimés
+    """
+    ensure_connection()
+    
+    query = {"source": source}
+    if keep_ids:
+        query["_id"] = {"$nin": list(keep_ids)}
+    return collection.delete_many(query).deleted_count
+
+def add_chunk_duplicates(duplicates: Dict) -> int:
+    """
+    Ajoute des références de quasi-doublons à leurs représentants déjà insérés
+    
+    Args:
+        duplicates: Références à ajouter à la liste 'duplicates', par _id du représentant
+    
+    Returns:
+        Nombre de représentants mis à jour
+    """
+    ensure_connection()
+    
+    operations = [UpdateOne({"_id": chunk_id}, {"$push": {"duplicates": {"$each": references}}})
+                  for chunk_id, references in duplicates.items()]
+    for start in range(0, len(operations), config.batch_size):
+        collection.bulk_write(operations[start:start + config.batch_size], ordered=False)
+    return len(operations)
+
+def ensure_source_index():
+    """Crée l'index sur le champ source (suppressions par fichier)"""
+    ensure_connection()
+    
+    collection.create_index("source")
+
+def load_manifest() -> Dict[str, Dict]:
+    """
+    Charge le manifeste d'ingestion de la collection
+    
+    Returns:
+        Dictionnaire chemin -> entrée du manifeste
+    """
+    ensure_connection()
+    
+    entries = db[MANIFEST_COLLECTION_NAME].find({"collection": collection.name})
+    return {entry["path"]: entry for entry in entries}
+
+def save_manifest_entries(entries: List[Dict]):
+    """
+    Enregistre (ou remplace) des entrées du manifeste
+    
+    Args:
+        entries: Entrées contenant au moins 'path'
+    """
+    ensure_connection()
+    
+    if not entries:
+        return
+    
+    operations = []
+    for entry in entries:
+        document = dict(entry, collection=collection.name)
+        document["_id"] = f"{collection.name}:{entry['path']}"
+        operations.append(ReplaceOne({"_id": document["_id"]}, document, upsert=True))
+    db[MANIFEST_COLLECTION_NAME].bulk_write(operations, ordered=False)
+
+def delete_manifest_entries(paths: Optional[List[str]] = None):
+    """
+    Supprime des entrées du manifeste
+    
+    Args:
+        paths: Chemins à retirer (None : tout le manifeste de la collection)
+    """
+    ensure_connection()
+    
+    query = {"collection": collection.name}
+    if paths is not None:
+        query["path"] = {"$in": list(paths)}
+    db[MANIFEST_COLLECTION_NAME].delete_many(query)
+
 def count_documents() -> int:
     """Retourne le nombre de documents dans la collection"""
-    if collection is None:
-        raise ConnectionError("Connexion MongoDB non initialisée")
+    ensure_connection()
     
     return collection.count_documents({})
 
 def get_collection_stats() -> Dict:
     """Retourne des statistiques sur la collection"""
-    if collection is None:
-        raise ConnectionError("Connexion MongoDB non initialisée")
+    ensure_connection()
     
     stats = {
         'total_documents': collection.count_documents({}),
@@ -109,10 +246,12 @@ def get_collection_stats() -> Dict:
 
 def clear_collection():
     """Vide la collection (utile pour les tests)"""
-    if collection is None:
-        raise ConnectionError("Connexion MongoDB non initialisée")
+    ensure_connection()
     
     result = collection.delete_many({})
+    # Le manifeste ne décrit plus rien : la prochaine ingestion incrémentale repart de zéro
+    delete_manifest_entries()
+    bump_content_version()
     print(f"{result.deleted_count} documents supprimés de la collection")
     return result.deleted_count
 
@@ -124,8 +263,7 @@ def test_connection() -> bool:
         True si la connexion fonctionne, False sinon
     """
     try:
-        if client is None:
-            return False
+        ensure_connection()
         
         # Test simple de ping
         client.admin.command('ping')
@@ -139,10 +277,3 @@ def close_connection():
     if client:
         client.close()
         print("Connexion MongoDB fermée")
-
-# Initialisation automatique de la connexion
-try:
-    init_connection()
-except Exception as e:
-    print(f"Impossible d'initialiser la connexion MongoDB: {e}")
-    raise
@@ -20,29 +20,44 @@ MODES D'UTILISATION :
 2. Découpage en chunks avec chevauchement
 3. Génération des embeddings (multilingual-e5-small)
 4. Insertion en MongoDB par lots
+
+Avec --incremental, seuls les fichiers nouveaux ou modifiés depuis la dernière
+exécution sont traités (voir manifest.py).
+Avec --stream, ces étapes s'enchaînent en flux à mémoire bornée (voir streaming.py).
 """
 
 import os
 import argparse
 import sys
-from typing import Optional
+from typing import Dict, List, Optional, Set, Tuple
 
 # Vérifier l'argument --test au démarrage pour configurer l'environnement
-if "--test" in sys.argv:
+# (pas dans les processus d'encodage, qui ré-importent ce script et héritent de TEST_MODE)
+if __name__ == "__main__" and "--test" in sys.argv:
     os.environ["TEST_MODE"] = "true"
     print("🧪 Mode TEST activé via argument --test")
-elif "--prod" in sys.argv or "--production" in sys.argv:
+elif __name__ == "__main__" and ("--prod" in sys.argv or "--production" in sys.argv):
     os.environ["TEST_MODE"] = "false"
     print("🏭 Mode PRODUCTION activé via argument --prod/--production")
 
-from loader import load_all_documents
+from loader import load_all_documents, load_documents
 from chunker import process_documents_chunks
-from embedder import process_chunks_embeddings
+from embedder import process_chunks_embeddings, model_token_window
+from embedding_cache import EmbeddingCache
+from model_registry import format_stats as format_model_stats
 from mongo import insert_chunks_batch, clear_collection, get_collection_stats
 from config import config
-from preprocessor import preprocess_text
+from preprocessor import preprocess_batch, cache_stats as preprocess_cache_stats, format_cache_stats, PREPROCESSING_VERSION
+from streaming import run_streaming, peak_rss_mb
+from manifest import IngestionPlan, build_plan, format_plan, apply_plan
+from boilerplate import format_stats as format_cleanup_stats
+from dedup import deduplicate_chunks, format_stats as format_dedup_stats
 
-def run_pipeline(chunk_size: int = 1000, overlap: int = 200, clear_db: bool = False, test_mode: bool = False):
+def run_pipeline(chunk_size: int = 1000, overlap: int = 200, clear_db: bool = False, test_mode: bool = False,
+                 use_embedding_cache: Optional[bool] = None, embed_workers: Optional[int] = None,
+                 loader_workers: Optional[int] = None, stream: bool = False, incremental: bool = False,
+                 chunk_unit: Optional[str] = None, dedup: Optional[bool] = None,
+                 preprocess_workers: Optional[int] = None):
     """
     Exécute la pipeline complète de traitement des documents
     
@@ -51,29 +66,87 @@ def run_pipeline(chunk_size: int = 1000, overlap: int = 200, clear_db: bool = Fa
         overlap: Chevauchement entre les chunks
         clear_db: Si True, vide la base de données avant l'insertion
         test_mode: Si True, utilise les données de test (./data_test/)
+        use_embedding_cache: Réutiliser les embeddings déjà calculés (défaut: config.embedding_cache_enabled)
+        embed_workers: Nombre de processus d'encodage (défaut: config.embedding_workers)
+        loader_workers: Nombre de processus d'extraction des fichiers (défaut: config.loader_workers)
+        stream: Si True, enchaîne les étapes en flux à mémoire bornée (voir streaming.py)
+        incremental: Si True, n'ingère que les fichiers nouveaux ou modifiés (voir manifest.py)
+        chunk_unit: "chars" ou "tokens" (défaut: config.chunk_unit) ; en mode tokens, la taille
+            et le chevauchement des chunks viennent de config.chunk_max_tokens/chunk_overlap_tokens
+        dedup: Si True, n'encode qu'un représentant par groupe de chunks quasi-identiques
+            (défaut: config.chunk_dedup, voir dedup.py)
+        preprocess_workers: Nombre de processus de pré-traitement (défaut: config.preprocess_workers)
     """
     # Mise à jour de la configuration globale
     config.test_mode = test_mode
     config.chunk_size = chunk_size
     config.chunk_overlap = overlap
+    config.chunk_unit = chunk_unit or config.chunk_unit
+    if config.chunk_unit == "tokens":
+        chunk_size, overlap = resolve_token_chunking()
+    
+    if use_embedding_cache is None:
+        use_embedding_cache = config.embedding_cache_enabled
+    if dedup is None:
+        dedup = config.chunk_dedup
+    if preprocess_workers is None:
+        preprocess_workers = config.preprocess_workers
     
     mode_text = "MODE TEST" if test_mode else "MODE PRODUCTION"
     print("=" * 60)
     print(f"{mode_text} - PIPELINE DE VECTORISATION")
     print("=" * 60)
     
+    embedding_cache = None
+    if use_embedding_cache:
+        embedding_cache = EmbeddingCache(
+            config.embedding_cache_path,
+            # Le backend fait partie de la clé : ses vecteurs diffèrent légèrement (int8, onnx)
+            model_name=f"{config.embedding_model}:{config.embedding_backend}",
+            preprocessing_version=PREPROCESSING_VERSION,
+            max_mb=config.embedding_cache_max_mb
+        )
+    
     try:
         # Optionnel : vider la base de données
         if clear_db:
             print("\nNettoyage de la base de données...")
             clear_collection()
         
+        # Un fichier réingéré ou supprimé emporterait les quasi-doublons rattachés à ses chunks
+        if dedup and incremental:
+            print("⚠️ Mode incrémental : déduplication des chunks désactivée")
+            dedup = False
+        
+        if stream and incremental:
+            print("⚠️ Mode incrémental : étapes exécutées séquentiellement (--stream ignoré)")
+        elif stream:
+            if embed_workers and embed_workers > 1:
+                print("⚠️ Mode streaming : encodage dans le processus courant (--embed-workers ignoré)")
+            if preprocess_workers != 1:
+                print("⚠️ Mode streaming : pré-traitement au fil du découpage (--preprocess-workers ignoré)")
+            run_streaming_pipeline(chunk_size, overlap, embedding_cache, loader_workers, config.chunk_unit, dedup)
+            return
+        
         # Étape 1: Chargement des documents
         print("\nETAPE 1: Chargement des documents")
         print("-" * 40)
-        documents = load_all_documents()
+        plan = None
+        failed_files = set()
+        if incremental:
+            plan = build_plan()
+            print(format_plan(plan))
+            report = []
+            documents = load_documents(plan.to_ingest, workers=loader_workers, report=report)
+            failed_files = {result['source'] for result in report if result['error']}
+        else:
+            documents = load_all_documents(workers=loader_workers)
         
         if not documents:
+            if plan is not None:
+                apply_incremental_plan(plan, [], failed_files)
+                print("Aucun fichier nouveau ou modifié.")
+                return
             print("Aucun document trouvé. Arrêt de la pipeline.")
             return
         
@@ -82,41 +155,73 @@ def run_pipeline(chunk_size: int = 1000, overlap: int = 200, clear_db: bool = Fa
         # Étape 2: Découpage en chunks
         print(f"\nETAPE 2: Découpage en chunks")
         print("-" * 40)
-        print(f"Paramètres: chunk_size={chunk_size}, overlap={overlap}")
-        chunks = process_documents_chunks(documents, chunk_size, overlap)
+        print(f"Paramètres: chunk_size={chunk_size}, overlap={overlap} ({config.chunk_unit})")
+        chunks = process_documents_chunks(documents, chunk_size, overlap, config.chunk_unit)
         
         if not chunks:
+            if plan is not None:
+                apply_incremental_plan(plan, [], failed_files)
             print("Aucun chunk créé. Arrêt de la pipeline.")
             return
         
         print(f"{len(chunks)} chunks créés avec succès")
         
         # Étape 2.2: Pré-traitement des chunks
-        print(f"\nETAPE 2.2: Pré-traitement des chunks")
+        print(f"\nETAPE 2.2: Pré-traitement des chunks{' (stemming)' if config.preprocess_stemming else ''}")
         print("-" * 40)
-        for chunk in chunks:
+        preprocessed = preprocess_batch([chunk['content'] for chunk in chunks], workers=preprocess_workers)
+        for chunk, text in zip(chunks, preprocessed):
             # Stocker le contenu original
             chunk['original_content'] = chunk['content']
             # Créer le contenu prétraité pour les embeddings
-            chunk['preprocessed_content'] = preprocess_text(chunk['content'])
+            chunk['preprocessed_content'] = text
         print("Pré-traitement des chunks terminé")
+        # Compteurs du processus courant (vides si le pré-traitement a été réparti)
+        cache_counters = preprocess_cache_stats()
+        if any(counters['hits'] + counters['misses'] for counters in cache_counters.values()):
+            print(format_cache_stats(cache_counters))
+        
+        # Étape 2.3: Regroupement des chunks quasi-identiques
+        to_embed = chunks
+        dedup_stats = None
+        if dedup:
+            print(f"\nETAPE 2.3: Regroupement des chunks quasi-identiques (seuil {config.dedup_threshold})")
+            print("-" * 40)
+            to_embed, dedup_stats = deduplicate_chunks(chunks, config.dedup_threshold)
+            print(format_dedup_stats(dedup_stats))
         
         # Étape 3: Génération des embeddings
         print(f"\nETAPE 3: Génération des embeddings")
         print("-" * 40)
-        chunks_with_embeddings = process_chunks_embeddings(chunks)
+        embed_stats = {'encoded': 0, 'truncated': 0}
+        chunks_with_embeddings = process_chunks_embeddings(to_embed, cache=embedding_cache, workers=embed_workers,
+                                                           stats=embed_stats)
+        print(format_truncation(embed_stats))
         
         # Étape 4: Insertion dans MongoDB
         print(f"\nETAPE 4: Insertion dans MongoDB")
         print("-" * 40)
         insert_chunks_batch(chunks_with_embeddings, batch_size=config.batch_size)
         
+        if plan is not None:
+            apply_incremental_plan(plan, chunks_with_embeddings, failed_files)
+        
         # Statistiques finales
         print(f"\nSTATISTIQUES FINALES")
         print("-" * 40)
         print(f"Documents traités: {len(documents)}")
         print(f"Chunks créés: {len(chunks)}")
+        if dedup_stats is not None:
+            print(format_dedup_stats(dedup_stats))
         print(f"Embeddings générés: {len(chunks_with_embeddings)}")
+        print(format_truncation(embed_stats))
+        if embedding_cache is not None:
+            cache_stats = embedding_cache.stats()
+            print(f"Cache d'embeddings: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                  f"({cache_stats['hit_rate']:.0%}), {cache_stats['entries']} entrées, "
+                  f"{cache_stats['size_mb']:.1f} Mo, {cache_stats['evicted']} évincées")
+        print(f"Modèle d'embedding: {format_model_stats()}")
+        print(f"Pic mémoire (RSS): {peak_rss_mb():.0f} Mo")
         
         stats = get_collection_stats()
         print(f"Documents en base: {stats['total_documents']}")
@@ -124,10 +229,103 @@ def run_pipeline(chunk_size: int = 1000, overlap: int = 200, clear_db: bool = Fa
         print("\n" + "=" * 60)
         print("PIPELINE TERMINÉE AVEC SUCCÈS")
         print("=" * 60)
-        
+    
     except Exception as e:
         print(f"\nERREUR DANS LA PIPELINE: {str(e)}")
         raise
+    finally:
+        if embedding_cache is not None:
+            embedding_cache.close()
+
+def resolve_token_chunking() -> Tuple[int, int]:
+    """
+    Taille et chevauchement des chunks en mode tokens, bornés par la fenêtre du modèle
+    
+    Returns:
+        Tuple (tokens par chunk, chevauchement en tokens)
+    """
+    window = model_token_window()
+    max_tokens = config.chunk_max_tokens or window
+    if max_tokens > window:
+        print(f"⚠️ CHUNK_MAX_TOKENS={max_tokens} dépasse la fenêtre du modèle, ramené à {window}")
+        max_tokens = window
+    # Valeur effective, reprise dans les paramètres d'ingestion du manifeste
+    config.chunk_max_tokens = max_tokens
+    return max_tokens, min(config.chunk_overlap_tokens, max_tokens // 2)
+
+def format_truncation(stats: Dict) -> str:
+    """Nombre de textes encodés dépassant la fenêtre du modèle (leur fin est ignorée)"""
+    if not stats['encoded']:
+        # Tous les embeddings venaient du cache : rien n'a été tokenisé
+        return "✂️ Chunks tronqués par le modèle: aucun texte encodé"
+    ratio = stats['truncated'] / stats['encoded']
+    return (f"✂️ Chunks tronqués par le modèle (> {stats['window']} tokens): "
+            f"{stats['truncated']}/{stats['encoded']} ({ratio:.1%})")
+
+def apply_incremental_plan(plan: IngestionPlan, inserted_chunks: List[Dict], failed_files: Set[str]):
+    """
+    Supprime les chunks obsolètes et met à jour le manifeste (mode incrémental)
+    
+    Args:
+        plan: Plan d'ingestion calculé avant le chargement
+        inserted_chunks: Chunks insérés pendant cette exécution
+        failed_files: Fichiers dont l'extraction a échoué (conservés tels quels)
+    """
+    print(f"\nMise à jour du manifeste")
+    print("-" * 40)
+    result = apply_plan(plan, inserted_chunks, failed_files)
+    print(f"{result['deleted_chunks']} chunks obsolètes supprimés, "
+          f"{result['manifest_entries']} fichiers dans le manifeste")
+
+def run_streaming_pipeline(chunk_size: int, overlap: int, embedding_cache: Optional[EmbeddingCache],
+                           loader_workers: Optional[int], chunk_unit: str = "chars", dedup: bool = False):
+    """
+    Exécute les étapes 1 à 4 en mode streaming et affiche les statistiques finales
+    
+    Args:
+        chunk_size: Taille maximale des chunks en caractères
+        overlap: Chevauchement entre les chunks
+        embedding_cache: Cache persistant des embeddings (optionnel)
+        loader_workers: Nombre de processus d'extraction des fichiers
+        chunk_unit: Unité de chunk_size et overlap : "chars" ou "tokens"
+        dedup: Si True, n'encode qu'un représentant par groupe de chunks quasi-identiques
+    """
+    print(f"\nETAPES 1-4: Chargement, découpage, embeddings et insertion en streaming")
+    print("-" * 40)
+    print(f"Paramètres: chunk_size={chunk_size}, overlap={overlap} ({chunk_unit}), "
+          f"lots de {config.stream_batch_size} chunks, files de {config.stream_queue_size}")
+    
+    stream_stats = run_streaming(chunk_size, overlap, cache=embedding_cache, loader_workers=loader_workers,
+                                 unit=chunk_unit, dedup=dedup)
+    
+    # Statistiques finales
+    print(f"\nSTATISTIQUES FINALES")
+    print("-" * 40)
+    print(f"Documents traités: {stream_stats['documents']}")
+    if stream_stats['failed_files']:
+        print(f"Fichiers en échec: {stream_stats['failed_files']}")
+    print(f"Chunks créés: {stream_stats['chunks']}")
+    if stream_stats['cleanup'].documents:
+        print(format_cleanup_stats(stream_stats['cleanup']))
+    if stream_stats['dedup'] is not None:
+        print(format_dedup_stats(stream_stats['dedup']))
+    print(f"Embeddings générés: {stream_stats['embeddings']}")
+    print(format_truncation(stream_stats))
+    print(f"Chunks insérés: {stream_stats['inserted']} en {stream_stats['seconds']:.1f}s")
+    if embedding_cache is not None:
+        cache_stats = embedding_cache.stats()
+        print(f"Cache d'embeddings: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+              f"({cache_stats['hit_rate']:.0%}), {cache_stats['entries']} entrées, "
+              f"{cache_stats['size_mb']:.1f} Mo, {cache_stats['evicted']} évincées")
+    print(f"Modèle d'embedding: {format_model_stats()}")
+    print(f"Pic mémoire (RSS): {stream_stats['peak_rss_mb']:.0f} Mo")
+    
+    stats = get_collection_stats()
+    print(f"Documents en base: {stats['total_documents']}")
+    
+    print("\n" + "=" * 60)
+    print("PIPELINE TERMINÉE AVEC SUCCÈS")
+    print("=" * 60)
 
 def main():
     """Point d'entrée principal avec arguments en ligne de commande"""
@@ -136,8 +334,25 @@ def main():
                        help="Taille maximale des chunks en caractères (défaut: 1000)")
     parser.add_argument("--overlap", type=int, default=200,
                        help="Chevauchement entre chunks en caractères (défaut: 200)")
+    parser.add_argument("--chunk-unit", choices=["chars", "tokens"], default=None,
+                       help="Unité du découpage : caractères ou tokens du modèle, chunks remplissant "
+                            "sa fenêtre (défaut: CHUNK_UNIT ou chars)")
+    parser.add_argument("--dedup", action="store_true", default=None,
+                       help="N'encoder qu'un chunk par groupe de chunks quasi-identiques (défaut: CHUNK_DEDUP)")
     parser.add_argument("--clear-db", action="store_true",
                        help="Vider la base de données avant l'insertion")
+    parser.add_argument("--loader-workers", type=int, default=None,
+                       help="Nombre de processus d'extraction PDF/markdown (défaut: LOADER_WORKERS, 0 = nombre de cœurs)")
+    parser.add_argument("--preprocess-workers", type=int, default=None,
+                       help="Nombre de processus de pré-traitement des chunks (défaut: PREPROCESS_WORKERS, 0 = nombre de cœurs)")
+    parser.add_argument("--embed-workers", type=int, default=None,
+                       help="Nombre de processus d'encodage des embeddings (défaut: EMBEDDING_WORKERS ou 1)")
+    parser.add_argument("--no-embedding-cache", action="store_true",
+                       help="Ré-encoder tous les chunks sans consulter le cache d'embeddings")
+    parser.add_argument("--incremental", action="store_true",
+                       help="N'ingérer que les fichiers nouveaux ou modifiés, supprimer les chunks des fichiers disparus")
+    parser.add_argument("--stream", action="store_true",
+                       help="Mode streaming : étapes enchaînées en flux, mémoire bornée quelle que soit la taille du corpus")
     parser.add_argument("--stats-only", action="store_true",
                        help="Afficher uniquement les statistiques de la DB")
     parser.add_argument("--test", action="store_true",
@@ -167,7 +382,15 @@ def main():
         chunk_size=args.chunk_size,
         overlap=args.overlap,
         clear_db=args.clear_db,
-        test_mode=test_mode
+        test_mode=test_mode,
+        use_embedding_cache=False if args.no_embedding_cache else None,
+        embed_workers=args.embed_workers,
+        loader_workers=args.loader_workers,
+        stream=args.stream,
+        incremental=args.incremental,
+        chunk_unit=args.chunk_unit,
+        dedup=args.dedup,
+        preprocess_workers=args.preprocess_workers
     )
 
 if __name__ == "__main__":
@@ -1,37 +1,111 @@
 """
 Module de pré-traitement des données textuelles
+
+NLTK (plusieurs secondes d'import : scipy, scikit-learn) n'est importé qu'à la
+création du premier préprocesseur ; l'instance par défaut n'est créée qu'au
+premier texte traité. Les stop words et le tokenizer (punkt_tab) français sont
+fournis avec le projet (./nltk_data) : aucun téléchargement n'est tenté, et
+NLTK_OFFLINE=true interdit ceux d'autres langues (hôtes sans accès réseau).
 """
 
+import os
 import re
 import unicodedata
-from typing import List, Set, Optional
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from nltk.stem import SnowballStemmer
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Set, Optional
+from config import config
+
+# Version du pré-traitement : à incrémenter à chaque changement du texte produit
+# (invalide les embeddings mis en cache pour l'ancienne version). Le stemming activé
+# par PREPROCESS_STEMMING change le texte produit : il fait partie de la version.
+# Version 2 : punkt_tab fourni, word_tokenize toujours disponible (contractions anglaises séparées)
+PREPROCESSING_VERSION = "2" + ("-stem" if config.preprocess_stemming else "")
 
-# Télécharger les ressources NLTK nécessaires
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
+# Ressources NLTK fournies avec le projet, cherchées après celles de l'hôte
+VENDORED_NLTK_DATA = str(Path(__file__).resolve().parent / "nltk_data")
+# Ressources NLTK utilisées : (chemin, paquet à télécharger) ; word_tokenize lit punkt_tab depuis NLTK 3.9
+NLTK_RESOURCES = (('tokenizers/punkt_tab', 'punkt_tab'), ('corpora/stopwords', 'stopwords'))
 
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
+_nltk_loaded = False
+
+def load_nltk() -> None:
+    """
+    Importe NLTK et rend ses ressources disponibles (une seule fois par processus)
+    
+    Les ressources sont cherchées chez l'hôte puis dans le répertoire fourni, qui
+    les contient : le téléchargement (sauf config.nltk_offline) ne sert que si ce
+    répertoire a été retiré.
+    """
+    global _nltk_loaded
+    if _nltk_loaded:
+        return
+    
+    import nltk
+    if VENDORED_NLTK_DATA not in nltk.data.path:
+        nltk.data.path.append(VENDORED_NLTK_DATA)
+    
+    for resource, package in NLTK_RESOURCES:
+        try:
+            nltk.data.find(resource)
+        except LookupError:
+            if config.nltk_offline:
+                print(f"⚠️ Ressource NLTK {resource} absente, non téléchargée (NLTK_OFFLINE)")
+            else:
+                nltk.download(package)
+    _nltk_loaded = True
+
+# Mode rapide : ponctuation et espaces retirés en une seule passe (\W regroupe [^\w\s] et \s)
+_NON_WORD = re.compile(r'\W+')
+# Mode rapide : contractions anglaises séparées par le tokenizer Treebank de NLTK, seules
+# règles qui s'appliquent à un texte nettoyé (lettres, chiffres et espaces simples)
+_CONTRACTIONS = {'cannot': 'can not', 'gimme': 'gim me', 'gonna': 'gon na',
+                 'gotta': 'got ta', 'lemme': 'lem me', 'wanna': 'wan na'}
+_CONTRACTION_PATTERN = re.compile(r'\b(?:' + '|'.join(_CONTRACTIONS) + r')\b')
+# Mode rapide : tokens de plus de 2 caractères (filtre de tokenize)
+_TOKEN_PATTERN = re.compile(r'\S{3,}')
+
+class _AccentTable(dict):
+    """Table de str.translate retirant les accents, complétée à la première rencontre de chaque caractère"""
+    
+    def __missing__(self, code: int) -> str:
+        nfd = unicodedata.normalize('NFD', chr(code))
+        value = ''.join(char for char in nfd if unicodedata.category(char) != 'Mn')
+        self[code] = value
+        return value
+
+# Partagée par toutes les instances : elle ne dépend que d'Unicode
+_accent_table = _AccentTable()
 
 class TextPreprocessor:
     """Classe pour le pré-traitement des textes"""
     
-    def __init__(self, language: str = 'french'):
+    def __init__(self, language: str = 'french', fast: bool = False, cache_size: int = 65536):
         """
         Initialise le préprocesseur
         
         Args:
             language: Langue pour les stop words et le stemming ('french', 'english')
+            fast: Utiliser l'implémentation rapide (même résultat : nettoyage en deux
+                passes, table de traduction pour les accents, tokenisation par regex)
+            cache_size: Nombre maximal de formes gardées en mémoire par cache (stems,
+                test des stop words) ; 0 désactive les caches
         """
         self.language = language
+        self.fast = fast
+        self.cache_size = cache_size
+        # Le texte juridique répète sans cesse les mêmes formes : stems et test des stop words
+        # (forme en minuscules) sont mémorisés par forme, dans des caches LRU bornés
+        self._is_stop_word = lru_cache(maxsize=cache_size)(self._lookup_stop_word)
+        # Mode rapide : word_tokenize utilisable (ressource punkt_tab présente), vérifié au premier texte
+        self._word_tokenize_available = None
+        
+        load_nltk()
+        from nltk.corpus import stopwords
+        from nltk.stem import SnowballStemmer
+        from nltk.tokenize import word_tokenize
+        self._word_tokenize = word_tokenize
         
         # Stop words
         try:
@@ -56,6 +130,7 @@ class TextPreprocessor:
         except ValueError:
             print(f"Stemmer pour {language} non disponible, utilisation du stemmer anglais")
             self.stemmer = SnowballStemmer('english')
+        self._stem = lru_cache(maxsize=cache_size)(self.stemmer.stem)
         
         # Motifs de nettoyage
         self.url_pattern = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
@@ -69,6 +144,45 @@ class TextPreprocessor:
         self.legal_references_pattern = re.compile(r'(art\.|article)\s*\d+(?:-\d+)?', re.IGNORECASE)
         self.date_pattern = re.compile(r'\b\d{1,2}[/\-\.]\d{1,2}[/\-\.]\d{2,4}\b')
     
+    @property
+    def stop_words(self) -> Set[str]:
+        """Stop words filtrés par remove_stop_words"""
+        return self._stop_words
+    
+    @stop_words.setter
+    def stop_words(self, words: Set[str]) -> None:
+        self._stop_words = words
+        self._is_stop_word.cache_clear()
+    
+    def _lookup_stop_word(self, token: str) -> bool:
+        return token.lower() in self._stop_words
+    
+    def cache_stats(self) -> Dict:
+        """
+        Retourne les compteurs des caches de formes
+        
+        Returns:
+            Dictionnaire {'stems': ..., 'stop_words': ...} avec pour chaque cache
+            hits, misses, hit_rate, size et max_size
+        """
+        stats = {}
+        for name, cached in (('stems', self._stem), ('stop_words', self._is_stop_word)):
+            info = cached.cache_info()
+            lookups = info.hits + info.misses
+            stats[name] = {
+                'hits': info.hits,
+                'misses': info.misses,
+                'hit_rate': info.hits / lookups if lookups else 0.0,
+                'size': info.currsize,
+                'max_size': info.maxsize
+            }
+        return stats
+    
+    def clear_caches(self) -> None:
+        """Vide les caches de formes (stems et test des stop words)"""
+        self._stem.cache_clear()
+        self._is_stop_word.cache_clear()
+    
     def remove_accents(self, text: str) -> str:
         """
         Supprime les accents d'un texte
@@ -118,6 +232,35 @@ class TextPreprocessor:
         
         return text.strip()
     
+    def _clean_text_fast(self, text: str) -> str:
+        """Équivalent de clean_text : motifs rares appliqués seulement si leur marqueur est présent"""
+        text = text.lower()
+        if '://' in text:
+            text = self.url_pattern.sub(' ', text)
+        if '@' in text:
+            text = self.email_pattern.sub(' ', text)
+        text = self.phone_pattern.sub(' ', text)
+        return _NON_WORD.sub(' ', text).strip()
+    
+    @staticmethod
+    def _remove_accents_fast(text: str) -> str:
+        """Équivalent de remove_accents par une table de traduction caractère par caractère"""
+        return text if text.isascii() else text.translate(_accent_table)
+    
+    def _tokenize_fast(self, text: str) -> List[str]:
+        """Équivalent de tokenize sur un texte nettoyé (mots séparés par des espaces simples)"""
+        if self._word_tokenize_available is None:
+            try:
+                self._word_tokenize("a", language=self.language)
+                self._word_tokenize_available = True
+            except LookupError:
+                self._word_tokenize_available = False
+        
+        # Sans punkt_tab, tokenize se replie sur split() : pas de contractions séparées
+        if self._word_tokenize_available and ('nn' in text or 'mme' in text or 'tta' in text):
+            text = _CONTRACTION_PATTERN.sub(lambda match: _CONTRACTIONS[match.group()], text)
+        return _TOKEN_PATTERN.findall(text)
+    
     def remove_stop_words(self, tokens: List[str]) -> List[str]:
         """
         Supprime les stop words d'une liste de tokens
@@ -128,7 +271,8 @@ class TextPreprocessor:
         Returns:
             Liste de tokens sans stop words
         """
-        return [token for token in tokens if token.lower() not in self.stop_words]
+        is_stop_word = self._is_stop_word
+        return [token for token in tokens if not is_stop_word(token)]
     
     def stem_tokens(self, tokens: List[str]) -> List[str]:
         """
@@ -140,7 +284,8 @@ class TextPreprocessor:
         Returns:
             Liste de tokens après stemming
         """
-        return [self.stemmer.stem(token) for token in tokens]
+        stem = self._stem
+        return [stem(token) for token in tokens]
     
     def tokenize(self, text: str) -> List[str]:
         """
@@ -153,7 +298,7 @@ class TextPreprocessor:
             Liste de tokens
         """
         try:
-            tokens = word_tokenize(text, language=self.language)
+            tokens = self._word_tokenize(text, language=self.language)
         except LookupError:
             # Fallback vers une tokenisation simple
             tokens = text.split()
@@ -185,6 +330,10 @@ class TextPreprocessor:
         if not text or not isinstance(text, str):
             return ""
         
+        if self.fast:
+            return self._preprocess_text_fast(text, remove_accents, remove_stop_words, apply_stemming,
+                                              min_token_length)
+        
         # Nettoyage initial
         processed_text = self.clean_text(text)
         
@@ -208,6 +357,57 @@ class TextPreprocessor:
         
         return ' '.join(tokens)
     
+    def _preprocess_text_fast(self, text: str, remove_accents: bool, remove_stop_words: bool,
+                              apply_stemming: bool, min_token_length: int) -> str:
+        """Pipeline de preprocess_text en mode rapide, filtres regroupés en une passe"""
+        processed_text = self._clean_text_fast(text)
+        if remove_accents:
+            processed_text = self._remove_accents_fast(processed_text)
+        
+        tokens = self._tokenize_fast(processed_text)
+        if min_token_length > 3:
+            tokens = [token for token in tokens if len(token) >= min_token_length]
+        if remove_stop_words:
+            is_stop_word = self._is_stop_word
+            tokens = [token for token in tokens if not is_stop_word(token)]
+        if apply_stemming:
+            stem = self._stem
+            tokens = [stem(token) for token in tokens]
+        
+        return ' '.join(tokens)
+    
+    def preprocess_batch(self, texts: List[str], workers: int = 1, batch_size: int = 256, **kwargs) -> List[str]:
+        """
+        Préprocesse une liste de textes, répartie sur plusieurs processus
+        
+        Chaque processus crée une fois son propre préprocesseur (mêmes langue et
+        stop words que cette instance) puis traite des lots de textes. Les textes
+        vides après traitement sont conservés : le résultat correspond position
+        par position à `texts`.
+        
+        Args:
+            texts: Textes à traiter
+            workers: Nombre de processus (1 = dans le processus courant, 0 = nombre de cœurs)
+            batch_size: Textes envoyés à un processus par tâche
+            **kwargs: Arguments pour preprocess_text
+        
+        Returns:
+            Textes préprocessés, dans l'ordre de `texts`
+        """
+        if workers <= 0:
+            workers = os.cpu_count() or 1
+        batches = [texts[start:start + batch_size] for start in range(0, len(texts), batch_size)]
+        workers = min(workers, len(batches))
+        
+        if workers <= 1:
+            return [self.preprocess_text(text, **kwargs) for text in texts]
+        
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self.language, self.stop_words, self.fast, self.cache_size)) as pool:
+            # map conserve l'ordre des lots
+            results = pool.map(_preprocess_in_worker, batches, [kwargs] * len(batches))
+            return [text for batch in results for text in batch]
+    
     def preprocess_document_chunks(self, 
                                   chunks: List[str], 
                                   **kwargs) -> List[str]:
@@ -238,6 +438,7 @@ class TextPreprocessor:
             words: Ensemble de mots à ajouter aux stop words
         """
         self.stop_words.update(words)
+        self._is_stop_word.cache_clear()
     
     def remove_custom_stop_words(self, words: Set[str]) -> None:
         """
@@ -247,15 +448,42 @@ class TextPreprocessor:
             words: Ensemble de mots à supprimer des stop words
         """
         self.stop_words.difference_update(words)
+        self._is_stop_word.cache_clear()
 
 
-# Instance par défaut
-default_preprocessor = TextPreprocessor()
+# Préprocesseur d'un processus de preprocess_batch (créé par _init_worker)
+_worker_preprocessor = None
+
+def _init_worker(language: str, stop_words: Set[str], fast: bool, cache_size: int):
+    """Initialise un processus de pré-traitement avec les réglages du préprocesseur appelant"""
+    global _worker_preprocessor
+    _worker_preprocessor = TextPreprocessor(language, fast, cache_size)
+    _worker_preprocessor.stop_words = set(stop_words)
+
+def _preprocess_in_worker(texts: List[str], options: Dict) -> List[str]:
+    """Préprocesse un lot de textes dans un processus de preprocess_batch"""
+    return [_worker_preprocessor.preprocess_text(text, **options) for text in texts]
+
+# Instance par défaut, créée au premier usage (voir get_default_preprocessor)
+_default_preprocessor = None
+
+def get_default_preprocessor() -> TextPreprocessor:
+    """Retourne l'instance par défaut, créée (avec le chargement de NLTK) au premier appel"""
+    global _default_preprocessor
+    if _default_preprocessor is None:
+        _default_preprocessor = TextPreprocessor(fast=config.preprocess_fast, cache_size=config.preprocess_cache_size)
+    return _default_preprocessor
+
+def __getattr__(name: str):
+    # preprocessor.default_preprocessor reste disponible, sans être créé à l'import
+    if name == 'default_preprocessor':
+        return get_default_preprocessor()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def preprocess_text(text: str, 
                    remove_accents: bool = True,
                    remove_stop_words: bool = True,
-                   apply_stemming: bool = False,
+                   apply_stemming: Optional[bool] = None,
                    min_token_length: int = 2) -> str:
     """
     Fonction wrapper pour préprocesser un texte avec l'instance par défaut
@@ -264,16 +492,42 @@ def preprocess_text(text: str,
         text: Texte à traiter
         remove_accents: Supprimer les accents
         remove_stop_words: Supprimer les stop words
-        apply_stemming: Appliquer le stemming
+        apply_stemming: Appliquer le stemming (None = config.preprocess_stemming)
         min_token_length: Longueur minimale des tokens
         
     Returns:
         Texte préprocessé
     """
-    return default_preprocessor.preprocess_text(
+    return get_default_preprocessor().preprocess_text(
         text=text,
         remove_accents=remove_accents,
         remove_stop_words=remove_stop_words,
-        apply_stemming=apply_stemming,
+        apply_stemming=config.preprocess_stemming if apply_stemming is None else apply_stemming,
         min_token_length=min_token_length
     )
+
+def preprocess_batch(texts: List[str], workers: int = 1, **kwargs) -> List[str]:
+    """
+    Fonction wrapper pour préprocesser une liste de textes avec l'instance par défaut
+    
+    Args:
+        texts: Textes à traiter
+        workers: Nombre de processus (1 = dans le processus courant, 0 = nombre de cœurs)
+        **kwargs: Arguments pour preprocess_text (apply_stemming par défaut :
+            config.preprocess_stemming)
+    
+    Returns:
+        Textes préprocessés, dans l'ordre de `texts`
+    """
+    kwargs.setdefault('apply_stemming', config.preprocess_stemming)
+    return get_default_preprocessor().preprocess_batch(texts, workers=workers, **kwargs)
+
+def cache_stats() -> Dict:
+    """Compteurs des caches de formes de l'instance par défaut (voir TextPreprocessor.cache_stats)"""
+    return get_default_preprocessor().cache_stats()
+
+def format_cache_stats(stats: Dict) -> str:
+    """Résumé des caches de formes pour l'affichage"""
+    parts = [f"{name} {counters['hit_rate']:.1%} ({counters['size']} formes)"
+             for name, counters in stats.items() if counters['hits'] + counters['misses']]
+    return "🧠 Caches du pré-traitement: " + ", ".join(parts)
@@ -0,0 +1,124 @@
+"""
+Cache LRU des embeddings de requêtes
+
+Les questions posées au chatbot se répètent souvent à l'identique ; ce cache
+borné (avec expiration optionnelle) évite une passe complète du transformer
+pour chaque répétition. La clé combine la requête normalisée et le modèle
+utilisé.
+"""
+
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional
+import numpy as np
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalise une requête pour la mise en cache
+    
+    Seules les différences sans effet sur le sens sont gommées : forme Unicode
+    (NFC), espaces en début/fin et espaces multiples.
+    
+    Args:
+        query: Requête brute
+    
+    Returns:
+        Requête normalisée
+    """
+    return " ".join(unicodedata.normalize("NFC", query).split())
+
+
+class QueryEmbeddingCache:
+    """Cache LRU borné, avec TTL optionnel, des embeddings de requêtes"""
+    
+    def __init__(self, max_size: int = 1024, ttl_seconds: Optional[float] = None):
+        """
+        Initialise le cache
+        
+        Args:
+            max_size: Nombre maximal de requêtes conservées (0 désactive le cache)
+            ttl_seconds: Durée de validité d'une entrée (None ou 0 : pas d'expiration)
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds or None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+    
+    def get(self, key: Hashable) -> Optional[np.ndarray]:
+        """Retourne l'embedding en cache pour une clé, ou None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            vector, created = entry
+            if self.ttl_seconds is not None and time.monotonic() - created > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+    
+    def put(self, key: Hashable, vector) -> None:
+        """Ajoute un embedding au cache en évinçant l'entrée la moins récente si besoin"""
+        if self.max_size <= 0:
+            return
+        
+        vector = np.array(vector, dtype=np.float32)
+        vector.setflags(write=False)
+        
+        with self._lock:
+            self._entries[key] = (vector, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def get_or_compute(self, query: str, model_name: str, compute: Callable[[str], object]) -> np.ndarray:
+        """
+        Retourne l'embedding d'une requête, calculé seulement en cas d'absence
+        
+        Args:
+            query: Requête brute
+            model_name: Identifiant du modèle (fait partie de la clé)
+            compute: Fonction d'encodage appelée avec la requête normalisée
+        
+        Returns:
+            Embedding de la requête (tableau en lecture seule)
+        """
+        normalized = normalize_query(query)
+        key = (model_name, normalized)
+        
+        vector = self.get(key)
+        if vector is None:
+            vector = np.array(compute(normalized), dtype=np.float32)
+            vector.setflags(write=False)
+            self.put(key, vector)
+        return vector
+    
+    def clear(self) -> None:
+        """Vide le cache (les compteurs sont conservés)"""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict:
+        """Retourne les compteurs du cache"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'expirations': self.expirations,
+            'size': len(self._entries),
+            'max_size': self.max_size
+        }
@@ -2,10 +2,12 @@ from pymongo import MongoClient
 from pymongo.errors import ServerSelectionTimeoutError, OperationFailure
 from os import getenv
 import os
-from sklearn.neighbors import NearestNeighbors
-from embedder import get_embedding
-from mongo import init_connection, client, db, collection
+from typing import List
+import mongo
+from embedder import get_query_embedding
+from mongo import init_connection
 from config import config
+from vector_index import VectorIndex
 
 def make_vector(user_request:str):
     """
@@ -18,7 +20,88 @@ def make_vector(user_request:str):
         Un vecteur représentant la requête de l'utilisateur.
     """
     
-    return get_embedding(user_request)
+    return get_query_embedding(user_request)
+
+class ContextRetriever:
+    """
+    Index de contexte persistant pour le RAG.
+    
+    L'index est construit une seule fois par processus et réutilisé pour chaque
+    question. Il n'est reconstruit que lorsque la version du contenu de la
+    collection change (insertion, suppression, changement de base).
+    """
+    
+    def __init__(self):
+        self.index = None
+        self.version = None
+    
+    def _get_collection(self):
+        """Retourne la collection courante en initialisant la connexion si besoin"""
+        if mongo.collection is None:
+            init_connection()
+        
+        # Vérifier que la collection est disponible
+        if mongo.collection is None:
+            raise ConnectionError("Collection MongoDB non initialisée")
+        
+        return mongo.collection
+    
+    def refresh(self, force: bool = False) -> VectorIndex:
+        """
+        Reconstruit l'index si le contenu de la collection a changé
+        
+        Args:
+            force: Si True, reconstruit l'index sans vérifier la version
+        
+        Returns:
+            L'index à jour
+        """
+        collection = self._get_collection()
+        version = mongo.get_content_version()
+        
+        if force or self.index is None or version != self.version:
+            self.index = VectorIndex.from_collection(collection)
+            self.version = version
+            
+            # Afficher des informations de debug avec les bons noms de base/collection
+            mode_info = "TEST" if config.test_mode else "PROD"
+            print(f"📊 [{mode_info}] Index construit: {len(self.index)} vecteurs dans '{version[0]}.{version[1]}'")
+        
+        return self.index
+    
+    def query(self, request_vector, k: int) -> List[str]:
+        """
+        Récupère le contenu des k documents les plus proches du vecteur de requête
+        
+        Args:
+            request_vector: Le vecteur de requête pour la recherche.
+            k: Le nombre de vecteurs à récupérer.
+        
+        Returns:
+            Une liste du contenu des k documents les plus proches.
+        """
+        index = self.refresh()
+        
+        if len(index) == 0:
+            print("⚠️  Aucun vecteur trouvé dans la collection.")
+            return []
+        
+        # search() borne k au nombre de vecteurs disponibles
+        positions, _ = index.search(request_vector, k)
+        
+        # Seul le contenu des k gagnants est lu depuis MongoDB
+        documents = index.fetch_documents(self._get_collection(), positions, fields=("content",))
+        return [doc['content'] for doc in documents]
+
+# Instance partagée par tous les appels du processus
+_retriever = None
+
+def get_retriever() -> ContextRetriever:
+    """Retourne le retriever partagé du processus, créé au premier appel"""
+    global _retriever
+    if _retriever is None:
+        _retriever = ContextRetriever()
+    return _retriever
 
 def k_context_vectors(request_vector, k:int):
     """
@@ -31,40 +114,9 @@ def k_context_vectors(request_vector, k:int):
     Returns:
         Une liste du contenu des k documents les plus proches.
     """
-    # S'assurer que la connexion est initialisée
-    init_connection()
-    
-    # Vérifier que la collection est disponible
-    if collection is None:
-        raise ConnectionError("Collection MongoDB non initialisée")
-    
-    # Récupérer tous les vecteurs et leurs métadonnées
-    vectors = list(collection.find())
-    
-    # Afficher des informations de debug avec les bons noms de base/collection
-    database_name = config.get_database_name()
-    collection_name = config.get_collection_name()
-    mode_info = "TEST" if config.test_mode else "PROD"
-    
-    print(f"📊 [{mode_info}] {len(vectors)} vecteurs dans '{database_name}.{collection_name}'")
-    
-    if not vectors:
-        print("⚠️  Aucun vecteur trouvé dans la collection.")
-        return []
-    
-    # Extraire les vecteurs du champ embedding
-    vector_data = [v['embedding'] for v in vectors]
-    
-    # Utiliser NearestNeighbors pour trouver les k plus proches voisins
-    # S'assurer que k ne dépasse pas le nombre de vecteurs disponibles
-    effective_k = min(k, len(vectors))
-    nbrs = NearestNeighbors(n_neighbors=effective_k, algorithm='auto').fit(vector_data)
-    distances, indices = nbrs.kneighbors([request_vector])
-    
-    # Récupérer le contexte associé à ces vecteurs
-    closest_vectors = [vectors[i] for i in indices[0]]
-    context_texts = [v['content'] for v in closest_vectors]
+    context_texts = get_retriever().query(request_vector, k)
     
-    print(f"✅ {len(context_texts)} chunks de contexte récupérés")
+    if context_texts:
+        print(f"✅ {len(context_texts)} chunks de contexte récupérés")
     
-    return context_texts
\ No newline at end of file
+    return context_texts
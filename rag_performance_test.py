@@ -3,6 +3,7 @@ import os
 import sys
 from groq import Groq
 from rag import k_context_vectors, make_vector
+from embedder import query_cache_stats
 from mongo import init_connection
 
 # Vérifier l'argument --test au démarrage
@@ -67,6 +68,14 @@ def rag_generate_response(question):
     reponse = chat_completion.choices[0].message.content
     return reponse
 
+def format_query_cache_stats():
+    """
+    Formate les compteurs du cache des embeddings de requêtes.
+    """
+    stats = query_cache_stats()
+    return (f"Cache des requêtes: {stats['hits']} hits / {stats['misses']} misses "
+            f"({stats['hit_rate']:.1%}), {stats['size']}/{stats['max_size']} entrées")
+
 def calculate_pcc(samples):
     """
     Calcule le pourcentage de réponses correctes (PCC) pour un ensemble d'échantillons.
@@ -218,6 +227,7 @@ def run_performance_test():
     print(f"   • Questions passées: {skipped_questions}")
     print(f"   • Réponses correctes: {correct_count}")
     print(f"   • Pourcentage de réussite (PCC): {pcc:.1f}%")
+    print(f"   • {format_query_cache_stats()}")
     print(f"{'='*60}")
     
     return pcc
@@ -255,6 +265,7 @@ def run_automatic_performance_test():
     print(f"📊 RÉSULTATS FINAUX (AUTOMATIQUE):")
     print(f"   • Questions correctes: {correct_count}/{total_questions}")
     print(f"   • Pourcentage de réussite (PCC): {pcc:.1f}%")
+    print(f"   • {format_query_cache_stats()}")
     print(f"   ⚠️  Note: Ce test utilise une vérification automatique simple")
     print(f"{'='*60}")
     
@@ -5,9 +5,11 @@ Module de recherche sémantique dans la base de données vectorisée
 import os
 import numpy as np
 from typing import List, Dict, Tuple
-from sentence_transformers import SentenceTransformer
 from mongo import client, use_fallback, db, collection
 from config import config
+from vector_index import VectorIndex
+from model_registry import get_model
+from embedder import get_query_embedding
 import sqlite3
 import pickle
 from sklearn.metrics.pairwise import cosine_similarity
@@ -17,47 +19,67 @@ class SemanticSearch:
     """Classe pour effectuer des recherches sémantiques"""
     
     def __init__(self):
-        """Initialise le modèle d'embedding et la connexion DB"""
-        print(f"Chargement du modèle d'embedding: {config.embedding_model}")
-        self.model = SentenceTransformer(config.embedding_model)
+        """Initialise la connexion DB (le modèle est chargé au premier encodage)"""
         self.use_fallback = use_fallback
+        self.index = None
+    
+    @property
+    def model(self):
+        """Modèle d'embedding partagé du processus"""
+        return get_model()
+    
+    def load_index(self, force: bool = False) -> VectorIndex:
+        """
+        Charge les embeddings de MongoDB dans un index résident
         
+        Args:
+            force: Si True, recharge l'index même s'il est déjà en mémoire
+        
+        Returns:
+            L'index vectoriel chargé
+        """
+        if self.index is None or force:
+            self.index = VectorIndex.from_collection(collection)
+            print(f"📦 Index chargé: {len(self.index)} vecteurs ({self.index.nbytes / 1e6:.1f} Mo)")
+        return self.index
+    
     def generate_query_embedding(self, query: str) -> List[float]:
-        """Génère l'embedding pour une requête"""
-        return self.model.encode(query).tolist()
+        """Génère l'embedding pour une requête (mis en cache)"""
+        return get_query_embedding(query)
     
     def search_mongodb(self, query_embedding: List[float], top_k: int = 5) -> List[Dict]:
         """Recherche dans MongoDB en utilisant la similarité cosinus"""
         # MongoDB ne support pas nativement la recherche vectorielle
-        # On récupère tous les documents et calcule la similarité côté client
-        all_docs = list(collection.find({}, {"filename": 1, "content": 1, "embedding": 1, "chunk_index": 1}))
+        # Les embeddings sont chargés une fois dans un index résident
+        index = self.load_index()
         
-        if not all_docs:
+        if len(index) == 0:
             return []
         
-        # Calcul des similarités
-        similarities = []
-        query_vector = np.array(query_embedding).reshape(1, -1)
+        positions, scores = index.search(query_embedding, top_k)
         
-        for doc in all_docs:
-            doc_vector = np.array(doc['embedding']).reshape(1, -1)
-            similarity = cosine_similarity(query_vector, doc_vector)[0][0]
-            
-            # Format standardisé pour la compatibilité avec search_sqlite
-            similarities.append({
+        # Seconde phase : contenu des seuls gagnants, en une requête $in
+        documents = index.fetch_documents(
+            collection, positions, fields=("filename", "source", "content", "chunk_index", "duplicates")
+        )
+        scores_by_id = {index.ids[position]: score for position, score in zip(positions, scores)}
+        
+        # Format standardisé pour la compatibilité avec search_sqlite
+        results = []
+        for doc in documents:
+            results.append({
                 'document': {
                     'id': str(doc['_id']),
-                    'filename': doc['filename'],
+                    'filename': doc.get('filename') or doc.get('source'),
                     'content': doc['content'],
-                    'chunk_index': doc.get('chunk_index', 0)
+                    'chunk_index': doc.get('chunk_index', 0),
+                    # Fichiers des chunks quasi-identiques regroupés avec celui-ci (voir dedup.py)
+                    'duplicate_sources': sorted({ref['source'] for ref in doc.get('duplicates', [])})
                 },
-                'similarity': similarity
+                'similarity': float(scores_by_id[doc['_id']])
             })
         
-        # Tri par similarité décroissante
-        similarities.sort(key=lambda x: x['similarity'], reverse=True)
-        
-        return similarities[:top_k]
+        return results
     
     def search_sqlite(self, query_embedding: List[float], top_k: int = 5) -> List[Dict]:
         """Recherche dans SQLite en utilisant la similarité cosinus"""
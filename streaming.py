@@ -0,0 +1,233 @@
+"""
+Mode streaming de la pipeline : chargement → découpage → pré-traitement →
+embeddings → insertion, à mémoire bornée
+
+Chaque étape est un générateur ; les étapes sont reliées par des files bornées
+et tournent dans des threads distincts, de sorte que l'encodage du lot N se
+fait pendant l'insertion du lot N-1 (torch, PyMuPDF et le driver MongoDB
+relâchent le GIL). Seuls quelques documents et quelques lots sont en mémoire
+à un instant donné : le pic de RSS ne dépend pas de la taille du corpus.
+"""
+
+import queue
+import resource
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional
+from bson import ObjectId
+from tqdm import tqdm
+import mongo
+from config import config
+from loader import iter_documents, cleanup_totals
+from chunker import iter_document_chunks
+from preprocessor import preprocess_text
+from embedder import process_chunks_embeddings
+from embedding_cache import EmbeddingCache
+from dedup import NearDuplicateIndex, member_reference
+
+_END = object()
+
+
+class _StageError:
+    """Exception levée dans un thread d'étape, transmise au consommateur"""
+    
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def threaded(iterable: Iterable, maxsize: int, name: str) -> Iterator:
+    """
+    Consomme un itérable dans un thread dédié et en restitue les éléments via une file bornée
+    
+    Le producteur se bloque quand la file est pleine (contre-pression). Une
+    exception du producteur est relancée chez le consommateur ; si le consommateur
+    s'arrête, le producteur est arrêté et l'itérable amont fermé.
+    
+    Args:
+        iterable: Étape amont (générateur)
+        maxsize: Nombre maximal d'éléments en attente
+        name: Nom du thread
+    
+    Yields:
+        Éléments de l'itérable, dans l'ordre
+    """
+    items = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+    
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def produce():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+            put(_END)
+        except BaseException as e:
+            put(_StageError(e))
+        finally:
+            close = getattr(iterable, "close", None)
+            if close is not None:
+                close()
+    
+    thread = threading.Thread(target=produce, name=name, daemon=True)
+    thread.start()
+    
+    try:
+        while True:
+            item = items.get()
+            if item is _END:
+                return
+            if isinstance(item, _StageError):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+def chunk_stage(documents: Iterable[Dict], chunk_size: int, overlap: int, stats: Dict,
+                unit: str = "chars", run_id: Optional[ObjectId] = None) -> Iterator[Dict]:
+    """
+    Découpe les documents au fil de l'eau et prépare le contenu prétraité de chaque chunk
+    
+    Le nombre de chunks des documents paresseux (PDF lus page par page) n'est
+    connu qu'après leur découpage : il est relevé dans stats['pending_totals'],
+    et leurs chunks portent l'identifiant de l'exécution (stream_run) pour que
+    seul leur total_chunks soit renseigné ensuite.
+    """
+    for document in documents:
+        stats['documents'] += 1
+        count = 0
+        for chunk in iter_document_chunks(document, chunk_size, overlap, unit):
+            # Contenu original conservé pour la base, contenu prétraité pour les embeddings
+            chunk['original_content'] = chunk['content']
+            chunk['preprocessed_content'] = preprocess_text(chunk['content'])
+            if run_id is not None and chunk.get('total_chunks') is None:
+                chunk['stream_run'] = run_id
+            stats['chunks'] += 1
+            count += 1
+            yield chunk
+        if 'pages' in document and count:
+            stats['pending_totals'][document['source']] = count
+
+
+def dedup_stage(chunks: Iterable[Dict], index: NearDuplicateIndex, duplicates: Dict) -> Iterator[Dict]:
+    """
+    Ne transmet que les représentants des chunks quasi-identiques (voir dedup.py)
+    
+    L'_id des représentants est attribué ici : les références de leurs
+    quasi-doublons, relevées dans `duplicates`, leur sont ajoutées après insertion.
+    """
+    for chunk in chunks:
+        chunk_id = ObjectId()
+        leader = index.add(chunk['preprocessed_content'], chunk_id)
+        if leader is None:
+            chunk['_id'] = chunk_id
+            yield chunk
+        else:
+            duplicates.setdefault(leader, []).append(member_reference(chunk))
+
+
+def batch_stage(items: Iterable, batch_size: int) -> Iterator[List]:
+    """Regroupe les éléments en lots de taille fixe (le dernier peut être plus petit)"""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def embed_stage(batches: Iterable[List[Dict]], cache: Optional[EmbeddingCache], stats: Dict) -> Iterator[List[Dict]]:
+    """Calcule les embeddings lot par lot et compte les textes encodés tronqués par le modèle"""
+    for batch in batches:
+        embedded = process_chunks_embeddings(batch, cache=cache, workers=1, show_progress=False, stats=stats)
+        stats['embeddings'] += len(embedded)
+        yield embedded
+
+
+def peak_rss_mb() -> float:
+    """Pic de mémoire résidente du processus en Mo"""
+    # ru_maxrss est exprimé en Ko sous Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_streaming(chunk_size: int, overlap: int, cache: Optional[EmbeddingCache] = None,
+                  loader_workers: Optional[int] = None, batch_size: Optional[int] = None,
+                  queue_size: Optional[int] = None, unit: str = "chars", dedup: bool = False) -> Dict:
+    """
+    Exécute la pipeline en mode streaming
+    
+    Args:
+        chunk_size: Taille maximale des chunks (en caractères ou en tokens selon unit)
+        overlap: Chevauchement entre les chunks
+        cache: Cache persistant des embeddings (optionnel)
+        loader_workers: Nombre de processus d'extraction (défaut: config.loader_workers)
+        batch_size: Chunks par lot d'encodage/insertion (défaut: config.stream_batch_size)
+        queue_size: Éléments en attente entre deux étapes (défaut: config.stream_queue_size)
+        unit: Unité de chunk_size et overlap : "chars" ou "tokens"
+        dedup: Si True, n'encode qu'un représentant par groupe de chunks quasi-identiques
+    
+    Returns:
+        Statistiques {documents, chunks, embeddings, encoded, truncated, inserted, failed_files, cleanup,
+        dedup, seconds, peak_rss_mb} ; dedup vaut None sans déduplication
+    """
+    mongo.ensure_connection()
+    
+    batch_size = batch_size or config.stream_batch_size
+    queue_size = queue_size or config.stream_queue_size
+    
+    stats = {'documents': 0, 'chunks': 0, 'embeddings': 0, 'encoded': 0, 'truncated': 0, 'inserted': 0,
+             'pending_totals': {}}
+    report = []
+    start = time.perf_counter()
+    # Marqueur des chunks de cette exécution dont le total n'est connu qu'en fin de document
+    run_id = ObjectId()
+    
+    documents = threaded(iter_documents(loader_workers, report), queue_size, "stream-load")
+    chunks = chunk_stage(documents, chunk_size, overlap, stats, unit, run_id)
+    index = None
+    duplicates = {}
+    if dedup:
+        index = NearDuplicateIndex(config.dedup_threshold)
+        chunks = dedup_stage(chunks, index, duplicates)
+    chunks = threaded(chunks, queue_size * batch_size, "stream-chunk")
+    embedded = threaded(embed_stage(batch_stage(chunks, batch_size), cache, stats), queue_size, "stream-embed")
+    
+    try:
+        with tqdm(desc="Chunks insérés", unit=" chunks") as progress:
+            for batch in embedded:
+                result = mongo.collection.insert_many(batch)
+                stats['inserted'] += len(result.inserted_ids)
+                progress.update(len(batch))
+        
+        # Renseigner total_chunks des PDF découpés page par page, pour les seuls chunks de cette
+        # exécution (ceux laissés par une exécution interrompue gardent leur propre marqueur)
+        for source, total in stats.pop('pending_totals').items():
+            mongo.collection.update_many({'source': source, 'total_chunks': None, 'stream_run': run_id},
+                                         {'$set': {'total_chunks': total}, '$unset': {'stream_run': ""}})
+        
+        # Références des quasi-doublons, une fois leurs représentants insérés
+        if duplicates:
+            mongo.add_chunk_duplicates(duplicates)
+    finally:
+        embedded.close()
+        # Signaler aux index en mémoire que le contenu a changé, même en cas d'insertion partielle
+        if stats['inserted']:
+            mongo.bump_content_version()
+    
+    stats['failed_files'] = sum(1 for result in report if result['error'])
+    stats['cleanup'] = cleanup_totals(report)
+    stats['dedup'] = index.stats if index is not None else None
+    stats['seconds'] = time.perf_counter() - start
+    stats['peak_rss_mb'] = peak_rss_mb()
+    return stats
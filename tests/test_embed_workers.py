@@ -0,0 +1,52 @@
+"""
+Encodage multi-processus lancé depuis pipeline.py, sans serveur MongoDB joignable
+
+Les processus d'encodage (contexte spawn) ré-importent le script principal : ils ne
+doivent ni se connecter à MongoDB ni répéter les messages de démarrage. La
+pipeline doit donc atteindre l'insertion (étape 4), où seul le processus principal
+échoue faute de serveur.
+
+Usage:
+    EMBEDDING_MODEL=<modèle local> python -m pytest tests/test_embed_workers.py
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope="module")
+def embedding_model():
+    """Modèle configuré, ignoré s'il ne peut pas être chargé sur cet hôte"""
+    pytest.importorskip("sentence_transformers")
+    from model_registry import get_model
+    try:
+        get_model()
+    except Exception as e:
+        pytest.skip(f"Modèle d'embedding indisponible: {e}")
+
+
+def test_pipeline_embed_workers_without_mongo(embedding_model, tmp_path):
+    env = dict(os.environ,
+               MONGO_URI="mongodb://127.0.0.1:1",
+               TEXT_CACHE="false",
+               EMBEDDING_TORCH_THREADS="1")
+    result = subprocess.run(
+        [sys.executable, "pipeline.py", "--test", "--embed-workers", "2", "--no-embedding-cache",
+         "--loader-workers", "1", "--preprocess-workers", "1"],
+        cwd=PROJECT_DIR, env=env, capture_output=True, text=True, timeout=600
+    )
+    output = result.stdout + result.stderr
+    
+    # Les lots ont tous été encodés par les processus, sans plantage ni relance
+    assert "interrompu" not in output and "Encodage abandonné" not in output, output
+    assert "ETAPE 4" in output, output
+    # Seul le processus principal a lu les arguments et tenté la connexion
+    assert output.count("Mode TEST activé") == 1, output
+    assert output.count("Erreur de connexion MongoDB") == 1, output
+    assert result.returncode != 0
@@ -0,0 +1,31 @@
+"""
+Encodage des embeddings : formats de stockage et blobs invalides
+
+Usage:
+    python -m pytest tests/test_embedding_codec.py
+"""
+
+import numpy as np
+import pytest
+
+from embedding_codec import HEADER, MAGIC, STORAGE_FORMATS, VERSION, decode_embedding, encode_embedding, storage_format
+
+
+@pytest.mark.parametrize("storage", STORAGE_FORMATS)
+def test_round_trip(storage):
+    vector = np.linspace(-1, 1, 8, dtype=np.float32)
+    encoded = encode_embedding(vector, storage)
+    assert storage_format(encoded) == storage
+    np.testing.assert_allclose(decode_embedding(encoded), vector, atol=1e-3)
+
+
+def test_unknown_dtype_code_raises_value_error():
+    blob = HEADER.pack(MAGIC, VERSION, 9, 2) + bytes(8)
+    with pytest.raises(ValueError, match="9"):
+        storage_format(blob)
+    
+    # Dans un générateur, l'erreur reste une ValueError (pas d'arrêt silencieux de l'itération)
+    formats = (storage_format(value) for value in [encode_embedding([0.5], "float16"), blob])
+    assert next(formats) == "float16"
+    with pytest.raises(ValueError):
+        next(formats)
@@ -0,0 +1,55 @@
+"""
+Chargement des documents : un export JSON illisible est consigné sans interrompre le chargement
+
+Usage:
+    python -m pytest tests/test_loader.py
+"""
+
+import json
+
+import pytest
+
+import loader
+from config import config
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Répertoire de test contenant un markdown et l'export JSON des appels d'offres"""
+    monkeypatch.setattr(config, "test_mode", True)
+    monkeypatch.setattr(config, "test_data_dir", str(tmp_path))
+    monkeypatch.setattr(config, "text_cache_enabled", False)
+    (tmp_path / config.markdown_subdir).mkdir()
+    (tmp_path / config.markdown_subdir / "article.md").write_text("# Titre\n\nTexte.\n", encoding="utf-8")
+    return tmp_path
+
+
+def _records(count):
+    return [{"id": i, "title": f"Appel d'offres {i}", "description": "Prestation de conseil."}
+            for i in range(count)]
+
+
+def test_truncated_json_is_reported(data_dir, capsys):
+    exported = json.dumps(_records(3), ensure_ascii=False)
+    (data_dir / config.test_json_filename).write_text(exported[:-20], encoding="utf-8")
+    
+    documents = loader.load_all_documents(workers=1)
+    
+    assert [document["source"].endswith(".md") for document in documents].count(True) == 1
+    assert "fichiers en échec" in capsys.readouterr().out
+
+
+def test_json_report_entry(data_dir):
+    path = data_dir / config.test_json_filename
+    path.write_text(json.dumps(_records(2)), encoding="utf-8")
+    report = []
+    
+    documents = loader.process_json_file(report)
+    
+    assert [document["metadata"]["ao_id"] for document in documents] == [0, 1]
+    assert report == [loader._report_entry(str(path), report[0]["seconds"])]
+    
+    path.write_text("[{", encoding="utf-8")
+    report = []
+    assert loader.process_json_file(report) == []
+    assert report[0]["error"]
@@ -0,0 +1,59 @@
+"""
+Ingestion incrémentale : application du plan aux chunks et au manifeste
+
+Les opérations MongoDB sont remplacées par un enregistrement des appels.
+
+Usage:
+    python -m pytest tests/test_manifest.py
+"""
+
+import pytest
+
+import manifest
+import mongo
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Appels aux opérations MongoDB utilisées par apply_plan"""
+    recorded = {'deleted': [], 'saved': []}
+    
+    def delete_chunks_by_source(source, keep_ids=None):
+        recorded['deleted'].append(source)
+        return 1
+    
+    monkeypatch.setattr(mongo, "ensure_source_index", lambda: None)
+    monkeypatch.setattr(mongo, "delete_chunks_by_source", delete_chunks_by_source)
+    monkeypatch.setattr(mongo, "save_manifest_entries", recorded['saved'].extend)
+    monkeypatch.setattr(mongo, "delete_manifest_entries", lambda paths=None: None)
+    monkeypatch.setattr(mongo, "bump_content_version", lambda: None)
+    return recorded
+
+
+def _plan():
+    """b.pdf, déjà indexé, est devenu une copie exacte de a.pdf (nouveau)"""
+    signature = {'size': 10, 'mtime': 1.0, 'hash': "h"}
+    return manifest.IngestionPlan(
+        to_ingest=["a.pdf"],
+        new={"a.pdf"},
+        duplicates={"b.pdf": "a.pdf"},
+        signatures={"a.pdf": signature, "b.pdf": signature},
+        previous={"b.pdf": dict(signature, path="b.pdf", chunk_ids=["b0"], settings={})},
+        settings={'chunker': "test"}
+    )
+
+
+def test_duplicate_chunks_dropped_once_canonical_ingested(calls):
+    manifest.apply_plan(_plan(), [{'source': "a.pdf", '_id': "a0"}])
+    
+    assert "b.pdf" in calls['deleted']
+    entries = {entry['path']: entry for entry in calls['saved']}
+    assert entries["b.pdf"]['duplicate_of'] == "a.pdf"
+    assert entries["a.pdf"]['chunk_ids'] == ["a0"]
+
+
+def test_duplicate_kept_when_canonical_fails(calls):
+    manifest.apply_plan(_plan(), [], failed={"a.pdf"})
+    
+    assert calls['deleted'] == []
+    assert calls['saved'] == []
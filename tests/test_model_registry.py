@@ -0,0 +1,41 @@
+"""
+Registre des modèles : tokenizer et fenêtre disponibles sans charger le modèle
+
+Usage:
+    EMBEDDING_MODEL=<modèle local> python -m pytest tests/test_model_registry.py
+"""
+
+import pytest
+
+import embedder
+import model_registry
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Registre vide : aucun modèle ni tokenizer chargé"""
+    pytest.importorskip("sentence_transformers")
+    monkeypatch.setattr(model_registry, "_models", {})
+    monkeypatch.setattr(model_registry, "_stats", {})
+    monkeypatch.setattr(model_registry, "_tokenizers", {})
+    try:
+        model_registry.get_tokenizer()
+    except Exception as e:
+        pytest.skip(f"Modèle d'embedding indisponible: {e}")
+    return model_registry
+
+
+def test_token_helpers_do_not_load_model(registry):
+    text = "Le contrat est conclu entre les parties pour une durée déterminée."
+    window = embedder.model_token_window()
+    offsets = embedder.token_offsets([text])
+    lengths = embedder.token_lengths([text * 200, text])
+    assert not registry.is_loaded()
+    
+    model = registry.get_model()
+    tokenizer = model.tokenizer
+    assert window == model.max_seq_length - tokenizer.num_special_tokens_to_add()
+    assert offsets == tokenizer([text], add_special_tokens=False, return_offsets_mapping=True)['offset_mapping']
+    assert lengths == [window + 1, len(tokenizer(text, add_special_tokens=False)['input_ids'])]
+    # Une fois le modèle chargé, son tokenizer est réutilisé
+    assert registry.get_tokenizer()[0] is tokenizer
@@ -0,0 +1,123 @@
+"""
+Équivalence du pré-traitement rapide (TextPreprocessor(fast=True)) avec l'implémentation de référence
+
+Compare le texte produit sur tous les chunks du corpus de test (markdown, PDF et JSON)
+et sur des cas limites, pour chaque combinaison d'options de preprocess_text, avec le
+tokenizer NLTK (punkt_tab fourni dans nltk_data/) et avec le repli sur str.split.
+
+Usage:
+    python -m pytest tests/test_preprocessor_fast.py
+"""
+
+import itertools
+import os
+import random
+
+import pytest
+
+from config import config
+from preprocessor import TextPreprocessor
+
+EDGE_CASES = [
+    "",
+    "   ",
+    "Voir https://www.legifrance.gouv.fr/codes/article_lc/LEGIARTI000006436298?x=1 et HTTP://EXEMPLE.FR.",
+    "Écrire à contact.juridique+rgpd@cabinet-avocats.fr ou au +33612345678 / 0145678901.",
+    "+33612345678abc@exemple.com, 0612345678http://a.fr",
+    "Œuvre, cœur, ﬁnancement (ligature), Ångström, İstanbul, straße, ÉLÉMENTS ÀÇÉÈÊËÎÏÔÛÙÜŸ",
+    "naïve café déjà-vu — « guillemets » … L’article L. 1234-5 du Code du travail, art. 12",
+    "Symboles 𝔘𝔫𝔦𝔠𝔬𝔡𝔢 𝟙𝟚𝟛 et emoji 📄✅ ; combinants é à ñ",
+    "We cannot, gonna, gotta, wanna, gimme, lemme; CANNOT Wanna; cannotx xcannot",
+    "under_score __init__ 3.14 1,000 10-12-2023 ½ ² ٣ 三",
+    "tabulations\tet\nretours\r\nà la ligne insécables fines",
+]
+
+OPTIONS = [
+    dict(remove_accents=accents, remove_stop_words=stop_words, apply_stemming=stemming, min_token_length=length)
+    for accents, stop_words, stemming, length in itertools.product((True, False), (True, False),
+                                                                   (False, True), (2, 4))
+]
+
+# Alphabet des textes aléatoires : contractions, séparateurs, accents, chiffres et marqueurs d'URL/e-mail
+FUZZ_PIECES = ["can", "not", "gon", "na", "got", "ta", "wan", "gim", "me", "lem", "mme", "nn", "tt",
+               " ", "  ", "-", "_", "'", ".", "@", "://", "+33", "0612345678", "é", "Œ", "ﬁ", "ß",
+               "İ", "½", "𝟙", "\n", "\t", "a", "x", "12"]
+
+
+def _matching_subdir(parent: str, name: str) -> str:
+    """Nom réel du sous-dossier `name` de `parent`, à la casse près (kiwiXlegal / kiwiXLegal)"""
+    for entry in os.listdir(parent):
+        if entry.lower() == name.lower() and os.path.isdir(os.path.join(parent, entry)):
+            return entry
+    return name
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    """Chunks du corpus de test, tous formats confondus"""
+    from chunker import process_documents_chunks
+    from loader import load_all_documents
+    
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(config, "test_mode", True)
+        patch.setattr(config, "markdown_subdir", _matching_subdir(config.test_data_dir, config.markdown_subdir))
+        patch.setattr(config, "pdf_subdir", _matching_subdir(config.test_data_dir, config.pdf_subdir))
+        chunks = process_documents_chunks(load_all_documents(workers=1))
+    return chunks
+
+
+@pytest.fixture(params=["word_tokenize", "split"])
+def preprocessors(request):
+    """Paire (référence, rapide) pour chacune des deux branches de tokenisation"""
+    reference = TextPreprocessor()
+    fast = TextPreprocessor(fast=True)
+    if request.param == "split":
+        def unavailable(text, language='english'):
+            raise LookupError("punkt_tab")
+        reference._word_tokenize = fast._word_tokenize = unavailable
+    yield reference, fast
+    expected = request.param == "word_tokenize"
+    assert fast._word_tokenize_available is expected
+    assert reference._word_tokenize_available in (None, expected)
+
+
+def _assert_equivalent(reference, fast, texts, options):
+    for text in texts:
+        expected = reference.preprocess_text(text, **options)
+        assert fast.preprocess_text(text, **options) == expected, f"{options} sur {text[:80]!r}"
+
+
+def test_corpus_covers_all_formats(corpus):
+    extensions = {os.path.splitext(chunk['source'])[1].lower() for chunk in corpus}
+    assert {".md", ".pdf", ".json"} <= extensions
+
+
+@pytest.mark.parametrize("options", OPTIONS, ids=lambda options: "-".join(
+    f"{name}={value}" for name, value in options.items()))
+def test_corpus_equivalence(preprocessors, corpus, options):
+    _assert_equivalent(*preprocessors, [chunk['content'] for chunk in corpus], options)
+
+
+@pytest.mark.parametrize("options", OPTIONS, ids=lambda options: "-".join(
+    f"{name}={value}" for name, value in options.items()))
+def test_edge_cases_equivalence(preprocessors, options):
+    _assert_equivalent(*preprocessors, EDGE_CASES, options)
+
+
+def test_random_texts_equivalence(preprocessors):
+    rng = random.Random(0)
+    texts = ["".join(rng.choices(FUZZ_PIECES, k=rng.randint(1, 30))) for _ in range(2000)]
+    _assert_equivalent(*preprocessors, texts, dict(remove_accents=False, remove_stop_words=False,
+                                                   apply_stemming=False, min_token_length=1))
+
+
+def test_contractions_follow_tokenizer(preprocessors):
+    reference, fast = preprocessors
+    options = dict(remove_stop_words=False)
+    result = fast.preprocess_text("they cannot gonna", **options)
+    assert result == reference.preprocess_text("they cannot gonna", **options)
+    # tokenize écarte les tokens de moins de 3 caractères ("na")
+    if fast._word_tokenize_available:
+        assert result == "they can not gon"
+    else:
+        assert result == "they cannot gonna"
@@ -0,0 +1,46 @@
+"""
+Cache du texte extrait : invalidation par les versions des extracteurs et convertisseurs
+
+Usage:
+    python -m pytest tests/test_text_cache.py
+"""
+
+import pytest
+
+import loader
+from config import config
+
+
+@pytest.fixture
+def text_cache_dir(tmp_path, monkeypatch):
+    """Cache du texte extrait dans un répertoire temporaire, recréé à chaque étiquette"""
+    monkeypatch.setattr(config, "text_cache_enabled", True)
+    monkeypatch.setattr(config, "text_cache_dir", str(tmp_path / "cache"))
+    monkeypatch.setattr(loader, "_text_cache", None)
+    return tmp_path
+
+
+def _reload_cache(monkeypatch):
+    # L'étiquette de version est lue à la création du cache
+    monkeypatch.setattr(loader, "_text_cache", None)
+
+
+def test_markdown_cached_until_converter_version_changes(text_cache_dir, monkeypatch):
+    path = text_cache_dir / "article.md"
+    path.write_text("# Titre\n\nUn **paragraphe** de texte.\n", encoding="utf-8")
+    
+    content, cached = loader.load_file_cached(str(path))
+    assert not cached
+    assert loader.load_file_cached(str(path)) == (content, True)
+    
+    monkeypatch.setattr(loader, "MARKDOWN_TEXT_VERSION", loader.MARKDOWN_TEXT_VERSION + "-next")
+    _reload_cache(monkeypatch)
+    assert loader.load_file_cached(str(path)) == (content, False)
+    assert loader.load_file_cached(str(path)) == (content, True)
+
+
+def test_version_tag_names_markdown_converter(monkeypatch):
+    tag = loader.extraction_version_tag()
+    assert f"markdown_text={loader.MARKDOWN_TEXT_VERSION}" in tag
+    monkeypatch.setattr(loader, "MARKDOWN_TEXT_VERSION", "next")
+    assert loader.extraction_version_tag() != tag
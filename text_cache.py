@@ -0,0 +1,195 @@
+"""
+Cache disque du texte extrait des fichiers sources
+
+L'extraction PyMuPDF des gros PDF domine le début de chaque exécution de la
+pipeline et se répète à chaque essai de découpage ou de pré-traitement. Le
+texte extrait est conservé compressé (gzip), indexé par l'empreinte SHA-256 du
+fichier source : un fichier renommé ou déplacé reste en cache, un fichier
+modifié est ré-extrait.
+
+Les entrées sont rangées dans un sous-répertoire propre à l'étiquette de
+version (versions de PyMuPDF, du code d'extraction et de la conversion
+markdown) ; les sous-répertoires d'une autre étiquette sont obsolètes et
+supprimés.
+
+Le cache ne repose que sur des fichiers écrits de façon atomique : il peut être
+partagé par les processus d'extraction sans verrou.
+"""
+
+import gzip
+import hashlib
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional, Tuple
+
+# Séparateur des pages dans le texte mis en cache (saut de page, comme pdftotext)
+PAGE_SEPARATOR = "\f"
+
+
+class TextCache:
+    """Cache compressé du texte extrait, indexé par le contenu des fichiers"""
+    
+    def __init__(self, directory: str, version_tag: str):
+        """
+        Initialise le cache
+        
+        Args:
+            directory: Répertoire racine du cache
+            version_tag: Étiquette des versions des extracteurs (invalide les entrées si elle change)
+        """
+        self.root = directory
+        self.version_tag = version_tag
+        self.directory = os.path.join(directory, hashlib.sha256(version_tag.encode("utf-8")).hexdigest()[:16])
+        
+        self.hits = 0
+        self.misses = 0
+        
+        os.makedirs(self.directory, exist_ok=True)
+        tag_file = os.path.join(self.directory, "VERSION")
+        if not os.path.exists(tag_file):
+            with open(tag_file, "w", encoding="utf-8") as f:
+                f.write(version_tag + "\n")
+    
+    @staticmethod
+    def key(data: bytes, extension: str) -> str:
+        """Clé d'un fichier : empreinte de son contenu et extension (qui choisit l'extracteur)"""
+        return TextCache.key_from_digest(hashlib.sha256(data).hexdigest(), extension)
+    
+    @staticmethod
+    def key_from_digest(digest: str, extension: str) -> str:
+        """Clé d'un fichier dont l'empreinte SHA-256 est déjà calculée"""
+        return f"{digest}{extension}"
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".gz")
+    
+    def get(self, key: str) -> Optional[str]:
+        """Retourne le texte en cache pour une clé, ou None"""
+        try:
+            with open(self._path(key), "rb") as f:
+                text = gzip.decompress(f.read()).decode("utf-8")
+        except (OSError, EOFError, UnicodeDecodeError):
+            # Absente, ou entrée tronquée/corrompue : traitée comme absente
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        return text
+    
+    def put(self, key: str, text: str):
+        """Enregistre le texte extrait (écriture atomique)"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(gzip.compress(text.encode("utf-8"), compresslevel=6))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    
+    def get_or_extract(self, data: bytes, extension: str, extract: Callable[[bytes], str]) -> Tuple[str, bool]:
+        """
+        Retourne le texte d'un fichier, extrait seulement s'il est absent du cache
+        
+        Args:
+            data: Contenu brut du fichier
+            extension: Extension du fichier (".pdf", ".md"...)
+            extract: Fonction d'extraction appelée avec le contenu brut
+        
+        Returns:
+            Tuple (texte, True si servi par le cache)
+        """
+        key = self.key(data, extension)
+        text = self.get(key)
+        if text is not None:
+            return text, True
+        
+        text = extract(data)
+        if text is not None:
+            self.put(key, text)
+        return text, False
+    
+    def iter_pages(self, key: str, block_size: int = 1 << 16) -> Optional[Iterator[str]]:
+        """
+        Relit une entrée page par page sans la décompresser entièrement
+        
+        Args:
+            key: Clé de l'entrée
+            block_size: Taille des lectures en caractères
+        
+        Returns:
+            Itérateur sur le texte des pages, ou None si l'entrée est absente
+        """
+        path = self._path(key)
+        if not os.path.exists(path):
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        return self._read_pages(path, block_size)
+    
+    @staticmethod
+    def _read_pages(path: str, block_size: int) -> Iterator[str]:
+        # newline="" : pas de conversion des fins de ligne, le texte est relu à l'identique
+        with gzip.open(path, "rt", encoding="utf-8", newline="") as f:
+            pending = ""
+            for block in iter(lambda: f.read(block_size), ""):
+                pages = (pending + block).split(PAGE_SEPARATOR)
+                pending = pages.pop()
+                yield from pages
+            yield pending
+    
+    @contextmanager
+    def page_writer(self, key: str):
+        """
+        Écrit une entrée page par page (écriture atomique à la sortie du bloc)
+        
+        Si le bloc est interrompu (exception, générateur abandonné), rien n'est
+        enregistré.
+        
+        Args:
+            key: Clé de l'entrée
+        
+        Yields:
+            Fonction write(page) à appeler pour chaque page, dans l'ordre
+        """
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as f:
+                first = True
+                
+                def write(page: str):
+                    nonlocal first
+                    f.write(page.encode("utf-8") if first else (PAGE_SEPARATOR + page).encode("utf-8"))
+                    first = False
+                
+                yield write
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    
+    def prune_stale(self) -> int:
+        """
+        Supprime les entrées créées avec une autre étiquette de version
+        
+        Returns:
+            Nombre de sous-répertoires obsolètes supprimés
+        """
+        removed = 0
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if os.path.isdir(path) and path != self.directory:
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+        return removed
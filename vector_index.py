@@ -0,0 +1,188 @@
+"""
+Index vectoriel résident en mémoire pour la recherche sémantique
+
+Les embeddings sont chargés une seule fois dans une matrice float32 contiguë,
+normalisée ligne par ligne, accompagnée d'un tableau parallèle d'identifiants.
+Une requête se résume alors à un produit matrice-vecteur suivi d'une sélection
+top-k par argpartition.
+
+La récupération se fait en deux phases : seuls '_id' et 'embedding' transitent
+lors de la construction de l'index, puis le contenu des k gagnants est lu par
+une unique requête $in (voir fetch_documents).
+"""
+
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+from embedding_codec import decode_embedding
+
+# Champs lus pour les résultats lors de la seconde phase de récupération
+DEFAULT_FETCH_FIELDS = ("content", "source", "chunk_index")
+
+
+class VectorIndex:
+    """Matrice d'embeddings pré-normalisés interrogeable par similarité cosinus"""
+    
+    def __init__(self, embeddings, ids: Sequence, documents: Optional[List[Dict]] = None):
+        """
+        Construit l'index à partir d'une matrice d'embeddings
+        
+        Args:
+            embeddings: Matrice (n, dim) ou liste de vecteurs
+            ids: Identifiants des vecteurs, dans le même ordre que les lignes
+            documents: Métadonnées associées à chaque ligne (optionnel)
+        """
+        matrix = np.array(embeddings, dtype=np.float32, order='C', ndmin=2)
+        if len(ids) != matrix.shape[0]:
+            raise ValueError(f"{len(ids)} identifiants pour {matrix.shape[0]} vecteurs")
+        if documents is not None and len(documents) != matrix.shape[0]:
+            raise ValueError(f"{len(documents)} documents pour {matrix.shape[0]} vecteurs")
+        
+        # Normalisation L2 en place : le produit scalaire devient la similarité cosinus
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix /= norms
+        
+        self.matrix = matrix
+        self.ids = np.asarray(ids, dtype=object)
+        self.documents = documents
+    
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+    
+    @property
+    def dimension(self) -> int:
+        """Dimension des vecteurs indexés"""
+        return self.matrix.shape[1]
+    
+    @property
+    def nbytes(self) -> int:
+        """Taille mémoire de la matrice d'embeddings"""
+        return self.matrix.nbytes
+    
+    def search(self, query_vector, top_k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Recherche les top_k vecteurs les plus similaires
+        
+        Args:
+            query_vector: Vecteur de la requête
+            top_k: Nombre de résultats à retourner
+        
+        Returns:
+            Tuple (positions dans l'index, scores de similarité) triés par score décroissant
+        """
+        n = len(self)
+        k = min(top_k, n)
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        
+        query = np.asarray(query_vector, dtype=np.float32).ravel()
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+        
+        scores = self.matrix @ query
+        
+        # Sélection partielle O(n) puis tri des seuls k gagnants
+        if k < n:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(n)
+        top = top[np.argsort(-scores[top], kind='stable')]
+        
+        return top, scores[top]
+    
+    @classmethod
+    def from_documents(cls, docs, payload_fields: Sequence[str] = ()) -> "VectorIndex":
+        """
+        Construit l'index en parcourant un itérable de documents MongoDB
+        
+        Le tableau est pré-alloué puis agrandi par doublement pour éviter de
+        matérialiser une liste Python de listes de flottants.
+        
+        Args:
+            docs: Itérable de documents contenant '_id' et 'embedding' (tableau ou Binary)
+            payload_fields: Champs à conserver en mémoire pour chaque document
+        
+        Returns:
+            Index construit (éventuellement vide)
+        """
+        matrix = None
+        ids = []
+        documents = [] if payload_fields else None
+        count = 0
+        
+        for doc in docs:
+            vector = decode_embedding(doc['embedding']).ravel()
+            if matrix is None:
+                matrix = np.empty((1024, vector.shape[0]), dtype=np.float32)
+            elif count == matrix.shape[0]:
+                grown = np.empty((matrix.shape[0] * 2, matrix.shape[1]), dtype=np.float32)
+                grown[:count] = matrix[:count]
+                matrix = grown
+            
+            matrix[count] = vector
+            ids.append(doc['_id'])
+            if documents is not None:
+                documents.append({field: doc.get(field) for field in payload_fields})
+            count += 1
+        
+        if matrix is None:
+            return cls(np.empty((0, 0), dtype=np.float32), [], documents)
+        
+        return cls(matrix[:count], ids, documents)
+    
+    @classmethod
+    def from_collection(cls, collection, payload_fields: Sequence[str] = ()) -> "VectorIndex":
+        """
+        Charge tous les embeddings d'une collection MongoDB
+        
+        Par défaut seuls '_id' et 'embedding' sont transférés ; le contenu est
+        récupéré après coup pour les seuls résultats via fetch_documents.
+        
+        Args:
+            collection: Collection MongoDB contenant les chunks vectorisés
+            payload_fields: Champs à conserver en mémoire pour chaque document
+        
+        Returns:
+            Index construit
+        """
+        projection = {"embedding": 1}
+        for field in payload_fields:
+            projection[field] = 1
+        
+        return cls.from_documents(collection.find({}, projection), payload_fields)
+    
+    def fetch_documents(self, collection, positions, fields: Sequence[str] = DEFAULT_FETCH_FIELDS) -> List[Dict]:
+        """
+        Matérialise les documents correspondant à des positions de l'index
+        
+        Args:
+            collection: Collection MongoDB contenant les chunks
+            positions: Positions retournées par search()
+            fields: Champs à récupérer pour chaque document
+        
+        Returns:
+            Documents dans l'ordre des positions (les documents supprimés entre-temps sont ignorés)
+        """
+        return fetch_documents(collection, [self.ids[position] for position in positions], fields)
+
+
+def fetch_documents(collection, ids: Sequence, fields: Sequence[str] = DEFAULT_FETCH_FIELDS) -> List[Dict]:
+    """
+    Récupère en une seule requête $in les documents d'une liste d'identifiants
+    
+    Args:
+        collection: Collection MongoDB contenant les chunks
+        ids: Identifiants à récupérer, dans l'ordre souhaité
+        fields: Champs à récupérer pour chaque document
+    
+    Returns:
+        Documents dans l'ordre des identifiants (les identifiants absents sont ignorés)
+    """
+    if not ids:
+        return []
+    
+    projection = {field: 1 for field in fields}
+    by_id = {doc['_id']: doc for doc in collection.find({"_id": {"$in": list(ids)}}, projection)}
+    
+    return [by_id[doc_id] for doc_id in ids if doc_id in by_id]